@@ -0,0 +1,127 @@
+"""
+Benchmark de la certification par lots : pool de threads (CertificationService,
+comme `cli.py certify --jobs N`) contre asyncio (AsyncCertificationService,
+comme `cli.py certify --async`), avec la même concurrence et la même latence d'API.
+
+Les factures certifiées sont des brouillons créés pour l'occasion, puis supprimés
+(avec leurs cumuls de TVA recalculés) à la fin. L'API FNE est simulée localement.
+Nécessite les paquets facultatifs aiomysql et httpx.
+
+Usage :
+    python benchmarks/bench_async_certification.py --host localhost --user root --database facturation_db \
+        --invoices 200 --concurrency 16 --latency-ms 150
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import harness
+
+from core.async_certification import AsyncCertificationService, run_bounded
+from core.async_db import AsyncDBManager
+from core.certification import CertificationService
+from fne_simulator import FNESimulator, SimulatorConfig
+from models.vat_rollup import ROLLUP_PERIOD_QUERY, ROLLUP_DELETE_QUERY, ROLLUP_REFRESH_QUERIES
+from run_benchmarks import BenchContext, BENCH_COMPANY, BENCH_USER, bench_invoice_create
+
+
+def report(label, count, failures, elapsed):
+    print(f"  {label:<28} {elapsed:8.2f} s  {count / elapsed:8.1f} factures/s  ({failures} échec(s))")
+
+
+def certify_with_threads(db_manager, invoice_ids, concurrency, base_url):
+    service = CertificationService(db_manager, BENCH_COMPANY, 'cle-benchmark', base_url=base_url)
+    failures = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(service.certify, invoice_id, BENCH_USER) for invoice_id in invoice_ids]
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                failures += 1
+    return time.perf_counter() - start, failures
+
+
+async def certify_with_asyncio(db_manager, invoice_ids, concurrency, base_url):
+    async_db = await AsyncDBManager(db_manager.host, db_manager.database, db_manager.user, db_manager.password,
+                                    port=db_manager.port, pool_size=concurrency).open()
+    if async_db is None:
+        raise SystemExit(1)
+    failures = 0
+    try:
+        async with AsyncCertificationService(async_db, BENCH_COMPANY, 'cle-benchmark', base_url=base_url,
+                                             max_connections=concurrency) as service:
+            start = time.perf_counter()
+            async for _, _, error in run_bounded(invoice_ids, lambda i: service.certify(i, BENCH_USER),
+                                                 concurrency):
+                failures += error is not None
+            elapsed = time.perf_counter() - start
+    finally:
+        await async_db.close()
+    return elapsed, failures
+
+
+def cleanup(ctx):
+    """Supprime les brouillons créés puis recalcule les cumuls de TVA qu'ils ont alimentés."""
+    connection = ctx.db_manager.get_connection()
+    cursor = connection.cursor()
+    periods = set()
+    for invoice_id in ctx.created_invoice_ids:
+        cursor.execute(ROLLUP_PERIOD_QUERY, (invoice_id,))
+        row = cursor.fetchone()
+        if row:
+            periods.add(row)
+    cursor.close()
+    ctx.cleanup()
+
+    cursor = connection.cursor()
+    for client_id, period, period_end in periods:
+        cursor.execute(ROLLUP_DELETE_QUERY, (period, client_id))
+        for query in ROLLUP_REFRESH_QUERIES:
+            cursor.execute(query, (period, period_end, client_id))
+    connection.commit()
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la certification par lots : threads contre asyncio.")
+    harness.add_connection_arguments(parser)
+    parser.add_argument('--invoices', type=int, default=200, help="Factures certifiées par mode")
+    parser.add_argument('--concurrency', type=int, default=16, help="Threads ou requêtes simultanées")
+    parser.add_argument('--latency-ms', type=float, default=150.0, help="Latence simulée de l'API FNE")
+    args = parser.parse_args()
+
+    db_manager = harness.connect(args)
+    # Une connexion de pool par thread, comme TenantRegistry pour `cli.py certify --jobs N`
+    db_manager.pool_size = max(db_manager.pool_size, args.concurrency)
+    db_manager.init_pool()
+    simulator = FNESimulator(config=SimulatorConfig(latency_ms=args.latency_ms)).start_in_thread()
+    ctx = BenchContext(db_manager)
+
+    try:
+        print(f"Création de {2 * args.invoices} brouillons...")
+        # bench_invoice_create en crée `iterations * 5`, plus un d'échauffement
+        bench_invoice_create(ctx, (2 * args.invoices + 4) // 5)
+        drafts = ctx.created_invoice_ids
+        threaded_ids, async_ids = drafts[:args.invoices], drafts[args.invoices:2 * args.invoices]
+
+        print(f"Certification de {args.invoices} factures, concurrence {args.concurrency}, "
+              f"latence API {args.latency_ms:.0f} ms :")
+        elapsed, failures = certify_with_threads(db_manager, threaded_ids, args.concurrency, simulator.base_url)
+        report("pool de threads", len(threaded_ids), failures, elapsed)
+        base = elapsed
+        elapsed, failures = asyncio.run(
+            certify_with_asyncio(db_manager, async_ids, args.concurrency, simulator.base_url)
+        )
+        report("asyncio", len(async_ids), failures, elapsed)
+        print(f"  -> gain : x{base / elapsed:.2f}")
+    finally:
+        cleanup(ctx)
+        simulator.shutdown()
+        db_manager.close()
+
+
+if __name__ == '__main__':
+    main()
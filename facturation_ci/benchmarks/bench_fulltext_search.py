@@ -0,0 +1,82 @@
+"""
+Benchmark de la recherche plein texte (index FULLTEXT, migration 007) contre un
+balayage `LIKE '%mot%'` sur les clients, les produits et les lignes de factures.
+
+Les mots cherchés sont tirés des données existantes ; les deux variantes lisent la
+première page de résultats. À lancer sur une base peuplée par `setup_database.py --seed`
+(par exemple --invoices 1000000) pour que l'écart soit significatif.
+
+Usage :
+    python benchmarks/bench_fulltext_search.py --host localhost --user root --database facturation_db
+"""
+import argparse
+import random
+import re
+
+import harness
+
+from models.client import ClientModel
+from models.fulltext import MIN_TOKEN_SIZE, SEARCH_PAGE_SIZE
+from models.invoice import InvoiceModel
+from models.product import ProductModel
+
+# (nom, table, colonnes recherchées, recherche plein texte du modèle)
+TARGETS = (
+    ('clients', 'clients', ('name', 'address'), lambda db: ClientModel(db).search),
+    ('products', 'products', ('name', 'description'), lambda db: ProductModel(db).search),
+    ('invoice_items', 'invoice_items', ('description',), lambda db: InvoiceModel(db).search_items),
+)
+
+
+def sample_words(cursor, table, columns, count, rng):
+    """Mots indexables (au moins MIN_TOKEN_SIZE lettres) tirés de 500 lignes de la table."""
+    cursor.execute(f"SELECT CONCAT_WS(' ', {', '.join(columns)}) FROM {table} ORDER BY RAND() LIMIT 500")
+    words = sorted({word.lower() for (text,) in cursor.fetchall()
+                    for word in re.findall(r"[^\W\d_]+", text or '') if len(word) >= MIN_TOKEN_SIZE})
+    return [rng.choice(words) for _ in range(count)] if words else []
+
+
+def bench_target(db_manager, name, table, columns, search, iterations, rng):
+    cursor = db_manager.get_connection().cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    row_count = cursor.fetchone()[0]
+    words = sample_words(cursor, table, columns, iterations, rng)
+    if not words:
+        print(f"{name} : aucune donnée, cas ignoré.")
+        cursor.close()
+        return
+
+    like_condition = " OR ".join(f"{column} LIKE %s" for column in columns)
+    like_query = f"SELECT * FROM {table} WHERE {like_condition} ORDER BY id LIMIT {SEARCH_PAGE_SIZE + 1}"
+
+    def like_scan(i):
+        cursor.execute(like_query, (f"%{words[i]}%",) * len(columns))
+        cursor.fetchall()
+
+    print(f"{name} ({row_count} lignes, {iterations} recherches) :")
+    base = harness.measure("LIKE '%mot%'", like_scan, iterations)
+    fast = harness.measure("MATCH ... AGAINST", lambda i: search(words[i]), iterations)
+    if fast['mean_ms']:
+        print(f"  -> gain : x{base['mean_ms'] / fast['mean_ms']:.2f}")
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la recherche plein texte.")
+    harness.add_connection_arguments(parser)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    db_manager = harness.connect(args)
+    rng = random.Random(args.seed)
+
+    try:
+        for name, table, columns, search in TARGETS:
+            bench_target(db_manager, name, table, columns, search(db_manager), args.iterations, rng)
+    finally:
+        db_manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark des curseurs préparés (DBManager.get_prepared_cursor) sur les chemins chauds :
+lecture d'un client par ID et insertion de lignes de facture.
+
+Compare, sur la même connexion, un curseur classique (le SQL est réanalysé à chaque appel)
+et un curseur préparé mis en cache. Les insertions sont faites dans une transaction
+annulée à la fin : la base n'est pas modifiée.
+
+Usage :
+    python benchmarks/bench_prepared_statements.py --host localhost --user root --database facturation_db
+"""
+import argparse
+import time
+
+import harness
+
+from models.client import CLIENT_BY_ID_QUERY
+from models.invoice import ITEM_INSERT_QUERY
+
+
+def timed(label, iterations, func):
+    """Exécute `func(i)` `iterations` fois et affiche la latence moyenne."""
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<40} {elapsed * 1000:10.1f} ms  ({elapsed / iterations * 1e6:8.1f} µs/appel)")
+    return elapsed
+
+
+def bench_client_lookup(db_manager, iterations):
+    connection = db_manager.get_connection()
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute("SELECT id FROM clients ORDER BY id LIMIT 1000")
+    client_ids = [row['id'] for row in cursor.fetchall()]
+    if not client_ids:
+        print("  Aucun client en base : benchmark de lecture ignoré.")
+        cursor.close()
+        return
+
+    def classic(i):
+        cursor.execute(CLIENT_BY_ID_QUERY, (client_ids[i % len(client_ids)],))
+        cursor.fetchone()
+
+    def prepared(i):
+        db_manager.fetch_prepared(CLIENT_BY_ID_QUERY, (client_ids[i % len(client_ids)],), one=True)
+
+    print(f"Lecture client par ID ({iterations} appels) :")
+    base = timed("curseur classique", iterations, classic)
+    fast = timed("curseur préparé (cache)", iterations, prepared)
+    print(f"  -> gain : x{base / fast:.2f}")
+    cursor.close()
+
+
+def bench_item_inserts(db_manager, iterations):
+    connection = db_manager.get_connection()
+    cursor = connection.cursor()
+    cursor.execute("SELECT id FROM invoices ORDER BY id LIMIT 1")
+    invoice = cursor.fetchone()
+    cursor.execute("SELECT id FROM products ORDER BY id LIMIT 1")
+    product = cursor.fetchone()
+    if not invoice or not product:
+        print("  Aucune facture ou aucun produit en base : benchmark d'insertion ignoré.")
+        cursor.close()
+        return
+
+    values = (invoice[0], product[0], "Ligne de benchmark", 1, 1000, 18)
+
+    def classic(i):
+        cursor.execute(ITEM_INSERT_QUERY, values)
+
+    def prepared(i):
+        db_manager.execute_prepared(ITEM_INSERT_QUERY, values)
+
+    print(f"Insertion de lignes de facture ({iterations} lignes, transaction annulée) :")
+    connection.start_transaction()
+    try:
+        base = timed("curseur classique", iterations, classic)
+        fast = timed("curseur préparé (cache)", iterations, prepared)
+        print(f"  -> gain : x{base / fast:.2f}")
+    finally:
+        connection.rollback()
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des instructions préparées.")
+    harness.add_connection_arguments(parser)
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    db_manager = harness.connect(args)
+
+    try:
+        bench_client_lookup(db_manager, args.iterations)
+        bench_item_inserts(db_manager, args.iterations)
+    finally:
+        db_manager.close()
+
+
+if __name__ == '__main__':
+    main()
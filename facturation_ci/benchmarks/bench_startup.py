@@ -0,0 +1,103 @@
+"""
+Profil du temps d'import au démarrage (`python -X importtime`) et budget de démarrage.
+
+Importe `main` dans un processus neuf, plusieurs fois, et vérifie :
+  - que le temps d'import cumulé (médiane) reste sous STARTUP_BUDGET_MS ;
+  - qu'aucun module lourd chargé à la demande (ReportLab, requests) n'est importé.
+Le script se termine en erreur si l'une des conditions n'est pas respectée.
+
+Usage :
+    python benchmarks/bench_startup.py [--runs 5] [--budget-ms 150] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Budget du temps d'import de `main` (PyQt6 et mysql.connector compris)
+STARTUP_BUDGET_MS = 150
+
+# Modules qui ne doivent être chargés qu'à la première impression / certification
+DEFERRED_MODULES = ('reportlab', 'requests')
+
+
+def profile_imports():
+    """
+    Importe `main` dans un sous-processus avec -X importtime.
+    :return: Liste de tuples (profondeur, module, self_us, cumulé_us) dans l'ordre de sortie.
+    """
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        print(process.stderr)
+        sys.exit(process.returncode)
+
+    entries = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def direct_children(entries, module):
+    """
+    Imports directs de `module` (niveau 0). La sortie de -X importtime est en ordre
+    postfixe : les enfants précèdent leur parent, jusqu'à l'entrée de niveau 0 précédente.
+    """
+    index = next(i for i, e in enumerate(entries) if e[0] == 0 and e[1] == module)
+    children = []
+    for entry in reversed(entries[:index]):
+        if entry[0] == 0:
+            break
+        if entry[0] == 1:
+            children.append(entry)
+    return children
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profil d'import et budget de démarrage.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=15, help="Nombre de modules les plus coûteux affichés")
+    args = parser.parse_args()
+
+    totals = []
+    entries = []
+    for _ in range(args.runs):
+        entries = profile_imports()
+        totals.append(next(cum for depth, name, _, cum in entries if name == 'main' and depth == 0) / 1000)
+
+    median_ms = statistics.median(totals)
+    print(f"Import de `main` : médiane {median_ms:.1f} ms sur {args.runs} exécutions "
+          f"(min {min(totals):.1f}, max {max(totals):.1f}) ; budget {args.budget_ms:.0f} ms.")
+
+    print("\nImports directs les plus coûteux (dernière exécution) :")
+    direct = sorted(direct_children(entries, 'main'), key=lambda e: e[3], reverse=True)
+    for depth, name, self_us, cumulative_us in direct[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    loaded = {name for _, name, _, _ in entries}
+    for module in DEFERRED_MODULES:
+        if module in loaded:
+            failures.append(f"le module différé '{module}' est importé au démarrage")
+    if median_ms > args.budget_ms:
+        failures.append(f"budget dépassé ({median_ms:.1f} ms > {args.budget_ms:.0f} ms)")
+
+    if failures:
+        print("\nÉCHEC : " + " ; ".join(failures))
+        sys.exit(1)
+    print("\nOK : démarrage dans le budget.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""
+Simulateur local de l'API FNE (endpoint de signature), pour les benchmarks
+et les tests de charge hors ligne de la certification.
+
+Implémente `POST /ws/external/invoices/sign` avec la forme de réponse attendue
+par `core.fne_client.certify_document` :
+    {"status": "success", "data": {"nim": "...", "qrCode": "..."}}
+
+Le comportement est réglable pour reproduire les conditions réelles :
+  - latence (fixe, uniforme, normale ou log-normale) ;
+  - taux d'erreurs serveur (500) et de réponses invalides ;
+  - limitation de débit (429 + Retry-After) par seau à jetons ou au hasard ;
+  - requêtes qui restent sans réponse (pour déclencher les timeouts client).
+
+Deux routes d'administration :
+  GET  /__stats   compteurs de requêtes par issue ;
+  POST /__config  modifie les réglages à chaud (corps JSON, mêmes noms que SimulatorConfig).
+
+Usage autonome :
+    python benchmarks/fne_simulator.py --port 8099 --latency-ms 120 --latency-dist lognormal \\
+        --error-rate 0.02 --rate-limit 50 --timeout-rate 0.01
+puis pointer le client sur http://127.0.0.1:8099/ws/external
+"""
+import argparse
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SIGN_PATH = "/ws/external/invoices/sign"
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal')
+
+
+class SimulatorConfig:
+    """Réglages du simulateur (latences en millisecondes, taux entre 0 et 1)."""
+
+    FIELDS = (
+        'latency_ms', 'latency_jitter_ms', 'latency_dist', 'error_rate', 'invalid_rate',
+        'throttle_rate', 'rate_limit', 'retry_after', 'timeout_rate', 'hang_seconds', 'seed',
+    )
+
+    def __init__(self, latency_ms=0.0, latency_jitter_ms=0.0, latency_dist='fixed',
+                 error_rate=0.0, invalid_rate=0.0, throttle_rate=0.0, rate_limit=None,
+                 retry_after=1, timeout_rate=0.0, hang_seconds=30.0, seed=None):
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Distribution de latence inconnue : {latency_dist}")
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_dist = latency_dist
+        self.error_rate = error_rate
+        self.invalid_rate = invalid_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit  # requêtes par seconde acceptées, None = illimité
+        self.retry_after = retry_after
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.seed = seed
+
+    def update(self, values):
+        for name, value in values.items():
+            if name not in self.FIELDS:
+                raise ValueError(f"Réglage inconnu : {name}")
+            if name == 'latency_dist' and value not in LATENCY_DISTRIBUTIONS:
+                raise ValueError(f"Distribution de latence inconnue : {value}")
+            setattr(self, name, value)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class TokenBucket:
+    """Seau à jetons thread-safe : `rate` jetons par seconde, rafale maximale de `rate`."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class FNESimulatorHandler(BaseHTTPRequestHandler):
+    server_version = "FNESimulator/1.0"
+
+    def log_message(self, format, *args):
+        # Silencieux : les benchmarks mesurent, ils n'ont pas besoin du journal HTTP
+        pass
+
+    def _send_json(self, status_code, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/__stats":
+            self._send_json(200, {'stats': self.server.stats(), 'config': self.server.config.to_dict()})
+        else:
+            self._send_json(404, {"status": "error", "message": f"Endpoint inconnu: {self.path}"})
+
+    def do_POST(self):
+        if self.path == "/__config":
+            try:
+                self.server.reconfigure(self._read_json())
+            except (ValueError, json.JSONDecodeError) as e:
+                self._send_json(400, {"status": "error", "message": str(e)})
+                return
+            self._send_json(200, {"status": "success", "config": self.server.config.to_dict()})
+            return
+
+        if self.path != SIGN_PATH:
+            self._send_json(404, {"status": "error", "message": f"Endpoint inconnu: {self.path}"})
+            return
+
+        try:
+            payload = self._read_json()
+        except json.JSONDecodeError:
+            self.server.count('bad_request')
+            self._send_json(400, {"status": "error", "message": "JSON invalide"})
+            return
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self.server.count('unauthorized')
+            self._send_json(401, {"status": "error", "message": "Clé d'API manquante"})
+            return
+
+        if not payload.get("items"):
+            self.server.count('rejected')
+            self._send_json(422, {"status": "error", "message": "La facture ne contient aucun article"})
+            return
+
+        outcome = self.server.draw_outcome()
+        if outcome == 'throttled':
+            self._send_json(429, {"status": "error", "message": "Trop de requêtes"},
+                            {"Retry-After": str(self.server.config.retry_after)})
+            return
+
+        time.sleep(self.server.draw_latency())
+
+        if outcome == 'timeout':
+            # Ne répond qu'après `hang_seconds` : le client doit abandonner avant
+            time.sleep(self.server.config.hang_seconds)
+            self._send_json(504, {"status": "error", "message": "Délai dépassé"})
+            return
+        if outcome == 'error':
+            self._send_json(500, {"status": "error", "message": "Erreur interne simulée"})
+            return
+        if outcome == 'invalid':
+            self._send_json(200, {"status": "pending"})
+            return
+
+        nim = f"SIM-{payload.get('type', 'sale').upper()}-{next(self.server.counter):010d}"
+        self._send_json(200, {
+            "status": "success",
+            "data": {"nim": nim, "qrCode": f"https://fne.simulateur.local/verify/{nim}"},
+        })
+
+
+class FNESimulator(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, config=None):
+        super().__init__((host, port), FNESimulatorHandler)
+        self.counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._apply(config or SimulatorConfig())
+
+    @property
+    def base_url(self):
+        """URL de base à passer à `certify_document(..., base_url=...)`."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/ws/external"
+
+    def reconfigure(self, values):
+        """Applique de nouveaux réglages (utilisé au démarrage et par POST /__config)."""
+        config = SimulatorConfig(**self.config.to_dict())
+        config.update(values)
+        with self._lock:
+            self._apply(config)
+
+    def _apply(self, config):
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._bucket = TokenBucket(config.rate_limit) if config.rate_limit else None
+
+    def count(self, outcome):
+        with self._lock:
+            self._stats[outcome] = self._stats.get(outcome, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def draw_outcome(self):
+        """Tire l'issue d'une requête de signature selon les taux configurés."""
+        config = self.config
+        if self._bucket and not self._bucket.try_acquire():
+            outcome = 'throttled'
+        else:
+            with self._lock:
+                roll = self._rng.random()
+            outcome = 'success'
+            threshold = 0.0
+            for name, rate in (('throttled', config.throttle_rate), ('timeout', config.timeout_rate),
+                               ('error', config.error_rate), ('invalid', config.invalid_rate)):
+                threshold += rate
+                if roll < threshold:
+                    outcome = name
+                    break
+        self.count(outcome)
+        return outcome
+
+    def draw_latency(self):
+        """Tire une latence (en secondes) selon la distribution configurée."""
+        config = self.config
+        mean, jitter = config.latency_ms, config.latency_jitter_ms
+        with self._lock:
+            if config.latency_dist == 'uniform':
+                value = self._rng.uniform(mean - jitter, mean + jitter)
+            elif config.latency_dist == 'normal':
+                value = self._rng.gauss(mean, jitter)
+            elif config.latency_dist == 'lognormal' and mean > 0:
+                # Paramètres choisis pour que la moyenne et l'écart-type valent mean et jitter
+                sigma2 = math.log(1 + (jitter / mean) ** 2)
+                value = self._rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+            else:
+                value = mean
+        return max(value, 0.0) / 1000
+
+    def start_in_thread(self):
+        """Démarre le serveur dans un thread démon et retourne l'instance."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulateur local de l'API FNE.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Latence moyenne")
+    parser.add_argument('--latency-jitter-ms', type=float, default=0.0,
+                        help="Demi-largeur (uniform) ou écart-type (normal, lognormal)")
+    parser.add_argument('--latency-dist', choices=LATENCY_DISTRIBUTIONS, default='fixed')
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Part des réponses 500")
+    parser.add_argument('--invalid-rate', type=float, default=0.0, help="Part des réponses 200 sans NIM")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Part des réponses 429 tirées au hasard")
+    parser.add_argument('--rate-limit', type=float, default=None, help="Débit max accepté (req/s) avant 429")
+    parser.add_argument('--retry-after', type=int, default=1, help="Valeur de l'en-tête Retry-After (s)")
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help="Part des requêtes laissées sans réponse")
+    parser.add_argument('--hang-seconds', type=float, default=30.0, help="Durée de blocage d'une requête 'timeout'")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms, latency_dist=args.latency_dist,
+        error_rate=args.error_rate, invalid_rate=args.invalid_rate, throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit, retry_after=args.retry_after, timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds, seed=args.seed,
+    )
+    server = FNESimulator(args.host, args.port, config)
+    print(f"Simulateur FNE à l'écoute sur {server.base_url}")
+    print(f"Réglages : {json.dumps(config.to_dict())}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Bilan : {json.dumps(server.stats())}")
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Outils communs aux benchmarks : mesure de latence, percentiles, enregistrement
+des résultats en JSON et comparaison avec une exécution de référence.
+"""
+import datetime
+import getpass
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCHMARKS_DIR, '..', 'src')
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+def percentile(sorted_values, fraction):
+    """Percentile par interpolation linéaire sur une liste déjà triée."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def summarize(samples_ms):
+    """Résumé statistique d'une série de latences (en ms)."""
+    values = sorted(samples_ms)
+    return {
+        'n': len(values),
+        'mean_ms': round(statistics.fmean(values), 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 0.50), 3),
+        'p90_ms': round(percentile(values, 0.90), 3),
+        'p99_ms': round(percentile(values, 0.99), 3),
+        'max_ms': round(values[-1], 3) if values else 0.0,
+    }
+
+
+def measure(name, func, iterations, warmup=1):
+    """
+    Exécute `func(i)` `warmup` fois sans mesurer, puis `iterations` fois en mesurant.
+    :return: Le résumé statistique, affiché au passage.
+    """
+    for i in range(warmup):
+        func(i)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        func(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    result = summarize(samples)
+    print(f"  {name:<22} n={result['n']:<5} moy={result['mean_ms']:>9.2f} ms  p50={result['p50_ms']:>9.2f}  "
+          f"p90={result['p90_ms']:>9.2f}  p99={result['p99_ms']:>9.2f}  max={result['max_ms']:>9.2f}")
+    return result
+
+
+def save_results(results, metadata, directory=RESULTS_DIR):
+    """Enregistre les résultats dans `directory/<horodatage>.json` et retourne le chemin."""
+    os.makedirs(directory, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+    filepath = os.path.join(directory, f"{timestamp}.json")
+    document = {
+        'timestamp': timestamp,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'metadata': metadata,
+        'results': results,
+    }
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, default=str)
+    return filepath
+
+
+def load_results(filepath):
+    with open(filepath, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def compare(current, baseline, tolerance=0.20, metric='p50_ms'):
+    """
+    Compare deux exécutions cas par cas et affiche l'écart sur `metric`.
+    :return: La liste des cas dont la latence dépasse la référence de plus de `tolerance`.
+    """
+    regressions = []
+    print(f"\nComparaison avec la référence ({metric}, tolérance {tolerance:.0%}) :")
+    for name, result in current.items():
+        reference = baseline.get(name)
+        if not reference or not reference.get(metric):
+            print(f"  {name:<22} (pas de référence)")
+            continue
+        ratio = result[metric] / reference[metric]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  <-- RÉGRESSION"
+            regressions.append(name)
+        print(f"  {name:<22} {reference[metric]:>9.2f} -> {result[metric]:>9.2f} ms  ({ratio - 1:+.1%}){flag}")
+    return regressions
+
+
+def add_connection_arguments(parser):
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--database', default='facturation_db')
+    parser.add_argument('--replica-dsn', help="Réplique en lecture (mysql://utilisateur:mdp@hôte:port/base)")
+
+
+def connect(args):
+    """Crée le DBManager à partir des arguments de la ligne de commande."""
+    from core.config import parse_dsn
+    from core.db_manager import DBManager
+
+    password = getpass.getpass("Mot de passe de la base de données: ")
+    db_manager = DBManager(host=args.host, database=args.database, user=args.user, password=password,
+                           replica=parse_dsn(args.replica_dsn))
+    if not db_manager.get_connection():
+        sys.exit(1)
+    return db_manager
@@ -0,0 +1,212 @@
+"""
+Suite de benchmarks des chemins critiques de l'application.
+
+À lancer sur une base peuplée par `setup_database.py --seed` :
+    python benchmarks/run_benchmarks.py --host localhost --user root --database facturation_db
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<référence>.json
+
+Chaque exécution est enregistrée dans benchmarks/results/ ; avec --compare, le script
+se termine en erreur si un cas régresse au-delà de la tolérance.
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+
+import harness
+
+from core.fne_client import certify_document
+from core.pdf_generator import generate_invoice_pdf
+from fne_simulator import FNESimulator
+from models.client import ClientModel
+from models.invoice import InvoiceModel
+from models.product import ProductModel
+from models.report import ReportModel
+
+BENCH_COMPANY = {
+    'name': 'Entreprise de Benchmark',
+    'address': 'Abidjan',
+    'tax_id': 'CI-BENCH-0001',
+}
+BENCH_USER = {'id': 1, 'full_name': 'Benchmark'}
+
+
+class BenchContext:
+    """Données partagées par les cas : modèles, échantillons d'IDs, répertoire temporaire."""
+
+    def __init__(self, db_manager, seed=42):
+        self.db_manager = db_manager
+        self.invoice_model = InvoiceModel(db_manager)
+        self.client_model = ClientModel(db_manager)
+        self.product_model = ProductModel(db_manager)
+        self.report_model = ReportModel(db_manager)
+        self.rng = random.Random(seed)
+        self.tmpdir = tempfile.mkdtemp(prefix="facturation-bench-")
+        self.created_invoice_ids = []
+
+        cursor = db_manager.get_connection().cursor()
+        cursor.execute("SELECT COUNT(*) FROM invoices")
+        self.invoice_count = cursor.fetchone()[0]
+        cursor.execute("SELECT id FROM invoices ORDER BY RAND() LIMIT 1000")
+        self.invoice_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT id FROM clients ORDER BY RAND() LIMIT 1000")
+        self.client_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT id, name, unit_price, tax_rate FROM products ORDER BY RAND() LIMIT 1000")
+        self.products = cursor.fetchall()
+        cursor.execute("SELECT id FROM users ORDER BY id LIMIT 1")
+        self.user_id = cursor.fetchone()[0]
+        cursor.close()
+
+        if not (self.invoice_ids and self.client_ids and self.products):
+            print("La base ne contient pas assez de données : lancez d'abord `setup_database.py --seed`.")
+            sys.exit(1)
+
+    def random_invoice(self):
+        return self.invoice_model.get_by_id(self.rng.choice(self.invoice_ids))
+
+    def cleanup(self):
+        """Supprime les factures créées par le cas 'invoice_create' (lignes en cascade)."""
+        if not self.created_invoice_ids:
+            return
+        connection = self.db_manager.get_connection()
+        cursor = connection.cursor()
+        cursor.executemany("DELETE FROM invoices WHERE id = %s", [(i,) for i in self.created_invoice_ids])
+        connection.commit()
+        cursor.close()
+
+
+def bench_invoice_list(ctx, iterations):
+    return harness.measure("invoice_list_load", lambda i: ctx.invoice_model.get_all_with_client_info(),
+                           iterations)
+
+
+def bench_invoice_search(ctx, iterations):
+    # Recherches filtrées (jamais en cache) : une page par client, puis par statut
+    def search(i):
+        if i % 2:
+            ctx.invoice_model.search({'client_id': ctx.rng.choice(ctx.client_ids)})
+        else:
+            ctx.invoice_model.search({'status': 'partially_paid'}, page=1 + i % 5)
+
+    return harness.measure("invoice_search", search, iterations * 5)
+
+
+def bench_dashboard_stats(ctx, iterations):
+    return harness.measure("dashboard_stats", lambda i: ctx.invoice_model.get_dashboard_stats(), iterations)
+
+
+def bench_aged_receivables(ctx, iterations):
+    return harness.measure("aged_receivables", lambda i: ctx.report_model.get_aged_receivables(), iterations)
+
+
+def bench_get_by_id(ctx, iterations):
+    return harness.measure("invoice_get_by_id", lambda i: ctx.random_invoice(), iterations * 20)
+
+
+def bench_invoice_create(ctx, iterations):
+    today = datetime.date.today()
+
+    def create(i):
+        items = []
+        for product in ctx.rng.sample(ctx.products, min(10, len(ctx.products))):
+            items.append({
+                'product_id': product[0], 'description': product[1],
+                'quantity': ctx.rng.randint(1, 10), 'unit_price': product[2], 'tax_rate': product[3],
+            })
+        invoice_id, error = ctx.invoice_model.create({
+            'details': {
+                'client_id': ctx.rng.choice(ctx.client_ids), 'user_id': ctx.user_id,
+                'issue_date': today, 'due_date': today + datetime.timedelta(days=30),
+            },
+            'items': items,
+        })
+        if error:
+            raise RuntimeError(error)
+        ctx.created_invoice_ids.append(invoice_id)
+
+    return harness.measure("invoice_create", create, iterations * 5)
+
+
+def bench_pdf_render(ctx, iterations):
+    invoices = [ctx.random_invoice() for _ in range(iterations)]
+    clients = [ctx.client_model.get_by_id(inv['details']['client_id']) for inv in invoices]
+
+    def render(i):
+        index = i % len(invoices)
+        filepath = os.path.join(ctx.tmpdir, f"bench_{index}.pdf")
+        generate_invoice_pdf(filepath, invoices[index], clients[index], BENCH_COMPANY)
+
+    return harness.measure("pdf_render", render, iterations)
+
+
+def bench_certification(ctx, iterations):
+    simulator = FNESimulator().start_in_thread()
+    invoices = [ctx.random_invoice() for _ in range(iterations)]
+    clients = [ctx.client_model.get_by_id(inv['details']['client_id']) for inv in invoices]
+
+    def certify(i):
+        index = i % len(invoices)
+        certify_document(invoices[index], BENCH_COMPANY, clients[index], BENCH_USER,
+                         'cle-de-benchmark', base_url=simulator.base_url)
+
+    try:
+        return harness.measure("fne_certification", certify, iterations * 5)
+    finally:
+        simulator.shutdown()
+        simulator.server_close()
+
+
+CASES = {
+    'invoice_list_load': bench_invoice_list,
+    'invoice_search': bench_invoice_search,
+    'dashboard_stats': bench_dashboard_stats,
+    'aged_receivables': bench_aged_receivables,
+    'invoice_get_by_id': bench_get_by_id,
+    'invoice_create': bench_invoice_create,
+    'pdf_render': bench_pdf_render,
+    'fne_certification': bench_certification,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins critiques.")
+    harness.add_connection_arguments(parser)
+    parser.add_argument('--iterations', type=int, default=20,
+                        help="Itérations de base (multipliées pour les cas rapides)")
+    parser.add_argument('--only', help="Liste de cas séparés par des virgules : " + ", ".join(CASES))
+    parser.add_argument('--compare', help="Fichier de résultats de référence")
+    parser.add_argument('--tolerance', type=float, default=0.20,
+                        help="Régression tolérée par rapport à la référence (0.20 = +20%%)")
+    args = parser.parse_args()
+
+    selected = args.only.split(',') if args.only else list(CASES)
+    unknown = [name for name in selected if name not in CASES]
+    if unknown:
+        parser.error(f"Cas inconnus : {', '.join(unknown)}")
+
+    db_manager = harness.connect(args)
+    ctx = BenchContext(db_manager)
+    print(f"Base : {ctx.invoice_count} factures. Exécution de {len(selected)} cas...\n")
+
+    results = {}
+    try:
+        for name in selected:
+            results[name] = CASES[name](ctx, args.iterations)
+    finally:
+        ctx.cleanup()
+        db_manager.close()
+
+    filepath = harness.save_results(results, {'invoice_count': ctx.invoice_count, 'iterations': args.iterations})
+    print(f"\nRésultats enregistrés : {filepath}")
+
+    if args.compare:
+        regressions = harness.compare(results, harness.load_results(args.compare), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) détectée(s).")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,10 @@
 import mysql.connector
 from mysql.connector import Error
+import argparse
+import datetime
 import getpass
+import random
+import time
 import bcrypt
 
 def create_database(cursor, db_name):
@@ -125,6 +129,190 @@ def create_tables(cursor):
                 print(f"ERREUR: {e}")
                 raise
 
+# Recalcul complet des cumuls mensuels de TVA depuis les lignes d'articles (même résultat que
+# models/vat_rollup.py, qui lit la ventilation par taux : les lignes y sont arrondies de la même façon)
+def vat_rollup_scan(suffix=""):
+    """Cumuls par mois, client et taux des factures de `invoices{suffix}` (tables courantes ou d'archive)."""
+    return (
+        "SELECT DATE_SUB(i.issue_date, INTERVAL DAYOFMONTH(i.issue_date) - 1 DAY) AS period,"
+        "       i.client_id, it.tax_rate, COUNT(DISTINCT i.id) AS invoice_count,"
+        "       SUM(IF(i.document_type = 'refund', -1, 1) * ROUND(it.quantity * it.unit_price, 2)) AS base_ht,"
+        "       SUM(IF(i.document_type = 'refund', -1, 1)"
+        "           * ROUND(it.quantity * it.unit_price * it.tax_rate / 100, 2)) AS vat"
+        f"  FROM invoices{suffix} i JOIN invoice_items{suffix} it ON it.invoice_id = i.id"
+        "  WHERE i.status IN ('certified', 'paid', 'partially_paid') AND i.document_type IN ('sale', 'refund')"
+        "  GROUP BY period, i.client_id, it.tax_rate"
+    )
+
+VAT_ROLLUP_REBUILD = [
+    "DELETE FROM `vat_monthly_rollups`",
+    "INSERT INTO `vat_monthly_rollups` (period, client_id, tax_rate, invoice_count, base_ht, vat) "
+    + vat_rollup_scan(),
+]
+
+# Après la migration 008 : les factures archivées s'ajoutent aux cumuls des tables courantes
+# (comme VatRollupModel.rebuild), sinon leur TVA disparaîtrait des totaux mensuels
+VAT_ROLLUP_REBUILD_WITH_ARCHIVE = VAT_ROLLUP_REBUILD + [
+    "INSERT INTO `vat_monthly_rollups` (period, client_id, tax_rate, invoice_count, base_ht, vat) "
+    f"SELECT * FROM ({vat_rollup_scan('_archive')}) AS s "
+    "ON DUPLICATE KEY UPDATE invoice_count = vat_monthly_rollups.invoice_count + s.invoice_count,"
+    " base_ht = vat_monthly_rollups.base_ht + s.base_ht, vat = vat_monthly_rollups.vat + s.vat",
+]
+
+# Calcul des totaux enregistrés (HT, TVA, ventilation par taux) à partir des lignes d'articles,
+# avec l'arrondi par ligne de models/invoice_totals.py. Le total TTC n'est pas modifié.
+INVOICE_TOTALS_BACKFILL = [
+    "DELETE FROM `invoice_vat_breakdown`",
+    "INSERT INTO `invoice_vat_breakdown` (invoice_id, tax_rate, base_ht, vat)"
+    "  SELECT invoice_id, tax_rate, SUM(ROUND(quantity * unit_price, 2)),"
+    "         SUM(ROUND(quantity * unit_price * tax_rate / 100, 2))"
+    "  FROM invoice_items GROUP BY invoice_id, tax_rate",
+    "UPDATE `invoices` i"
+    "  JOIN (SELECT invoice_id, SUM(base_ht) AS subtotal, SUM(vat) AS vat"
+    "        FROM invoice_vat_breakdown GROUP BY invoice_id) b ON b.invoice_id = i.id"
+    "  SET i.subtotal = b.subtotal, i.vat_amount = b.vat",
+]
+
+# Évolutions du schéma, appliquées dans l'ordre après la création des tables.
+# (version, description, instructions) ; une version appliquée ne doit plus être modifiée.
+# Depuis la version 8, une modification de `invoices`, `invoice_items`, `invoice_vat_breakdown`
+# ou `payments` doit aussi être appliquée à sa table `*_archive` (mêmes colonnes, voir models/archive.py).
+MIGRATIONS = [
+    (1, "Paiements : montant réglé et solde dénormalisés sur les factures", [
+        "ALTER TABLE `invoices`"
+        "  ADD COLUMN `amount_paid` DECIMAL(15, 2) NOT NULL DEFAULT 0.00 AFTER `total_amount`,"
+        "  ADD COLUMN `balance_due` DECIMAL(15, 2) AS (`total_amount` - `amount_paid`) STORED AFTER `amount_paid`",
+        "ALTER TABLE `payments`"
+        "  ADD COLUMN `reference` VARCHAR(100) NULL COMMENT 'Référence bancaire' AFTER `payment_method`,"
+        "  ADD INDEX `idx_payments_reference` (`reference`)",
+        # Reprise des paiements déjà saisis
+        "UPDATE `invoices` i"
+        "  JOIN (SELECT `invoice_id`, SUM(`amount`) AS `paid` FROM `payments` GROUP BY `invoice_id`) p"
+        "    ON p.`invoice_id` = i.`id`"
+        "  SET i.`amount_paid` = p.`paid`",
+    ]),
+    (2, "Rapports : index couvrant des factures ouvertes (balance âgée)", [
+        "ALTER TABLE `invoices`"
+        "  ADD INDEX `idx_invoices_open` (`status`, `client_id`, `due_date`, `issue_date`, `balance_due`)",
+    ]),
+    (3, "Rapports : cumuls mensuels de TVA par client et par taux", [
+        "CREATE TABLE `vat_monthly_rollups` ("
+        "  `period` DATE NOT NULL COMMENT 'Premier jour du mois',"
+        "  `client_id` INT NOT NULL,"
+        "  `tax_rate` DECIMAL(5, 2) NOT NULL,"
+        "  `invoice_count` INT NOT NULL,"
+        "  `base_ht` DECIMAL(17, 2) NOT NULL,"
+        "  `vat` DECIMAL(17, 2) NOT NULL,"
+        "  PRIMARY KEY (`period`, `client_id`, `tax_rate`)"
+        ") ENGINE=InnoDB",
+        # Balayage des mois partiels aux bornes d'une période
+        "ALTER TABLE `invoices` ADD INDEX `idx_invoices_issue_date` (`issue_date`, `status`)",
+    ] + VAT_ROLLUP_REBUILD),
+    (4, "Factures : totaux HT / TVA enregistrés et ventilation par taux", [
+        "ALTER TABLE `invoices`"
+        "  ADD COLUMN `subtotal` DECIMAL(15, 2) NULL COMMENT 'Total HT' AFTER `due_date`,"
+        "  ADD COLUMN `vat_amount` DECIMAL(15, 2) NULL COMMENT 'Total TVA' AFTER `subtotal`",
+        "CREATE TABLE `invoice_vat_breakdown` ("
+        "  `invoice_id` INT NOT NULL,"
+        "  `tax_rate` DECIMAL(5, 2) NOT NULL,"
+        "  `base_ht` DECIMAL(15, 2) NOT NULL,"
+        "  `vat` DECIMAL(15, 2) NOT NULL,"
+        "  PRIMARY KEY (`invoice_id`, `tax_rate`),"
+        "  FOREIGN KEY (`invoice_id`) REFERENCES `invoices`(`id`) ON DELETE CASCADE"
+        ") ENGINE=InnoDB",
+    ] + INVOICE_TOTALS_BACKFILL),
+    (5, "Factures : numéro de version et réservation pour la certification FNE", [
+        "ALTER TABLE `invoices`"
+        "  ADD COLUMN `version` INT UNSIGNED NOT NULL DEFAULT 0 COMMENT 'Incrémenté à chaque modification',"
+        "  MODIFY COLUMN `fne_status` ENUM('pending', 'processing', 'success', 'failed') DEFAULT 'pending',"
+        "  ADD COLUMN `fne_claimed_at` DATETIME NULL COMMENT 'Début de la certification en cours' AFTER `fne_status`",
+    ]),
+    (6, "Factures : index de la recherche et de la pagination de la liste", [
+        # Chaque filtre suivi de la date : la page la plus récente est lue dans l'ordre de l'index
+        # (sans filtre, idx_invoices_issue_date de la migration 003 sert déjà le tri par date)
+        "ALTER TABLE `invoices`"
+        "  ADD INDEX `idx_invoices_status_date` (`status`, `issue_date`),"
+        "  ADD INDEX `idx_invoices_fne_status_date` (`fne_status`, `issue_date`),"
+        "  ADD INDEX `idx_invoices_client_date` (`client_id`, `issue_date`),"
+        "  ADD INDEX `idx_invoices_fne_nim` (`fne_nim`)",
+        "ALTER TABLE `clients` ADD INDEX `idx_clients_name` (`name`)",
+    ]),
+    (7, "Recherche plein texte : clients, produits et lignes de factures", [
+        # InnoDB ne crée qu'un index FULLTEXT par instruction
+        "ALTER TABLE `clients` ADD FULLTEXT INDEX `ft_clients` (`name`, `address`)",
+        "ALTER TABLE `products` ADD FULLTEXT INDEX `ft_products` (`name`, `description`)",
+        "ALTER TABLE `invoice_items` ADD FULLTEXT INDEX `ft_invoice_items` (`description`)",
+    ]),
+    (8, "Archives : factures closes des années passées (tables *_archive)", [
+        # Mêmes colonnes et index, sans clés étrangères : les factures archivées ne changent plus
+        "CREATE TABLE `invoices_archive` LIKE `invoices`",
+        "CREATE TABLE `invoice_items_archive` LIKE `invoice_items`",
+        "CREATE TABLE `invoice_vat_breakdown_archive` LIKE `invoice_vat_breakdown`",
+        "CREATE TABLE `payments_archive` LIKE `payments`",
+    ]),
+    (9, "Audit : journal des actions sur les factures, en ajout seul", [
+        # Sans clé étrangère : le journal survit aux utilisateurs et aux factures (archivées ou non)
+        "CREATE TABLE `audit_log` ("
+        "  `id` BIGINT AUTO_INCREMENT PRIMARY KEY,"
+        "  `occurred_at` DATETIME(6) NOT NULL COMMENT 'Heure de l''action (poste ou serveur)',"
+        "  `recorded_at` TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),"
+        "  `user_id` INT NULL,"
+        "  `username` VARCHAR(100) NULL,"
+        "  `source` VARCHAR(20) NOT NULL COMMENT 'app ou cli',"
+        "  `action` VARCHAR(50) NOT NULL,"
+        "  `entity` VARCHAR(50) NOT NULL,"
+        "  `entity_id` INT NULL,"
+        "  `details` JSON NULL,"
+        "  INDEX `idx_audit_entity` (`entity`, `entity_id`, `occurred_at`),"
+        "  INDEX `idx_audit_occurred_at` (`occurred_at`)"
+        ") ENGINE=InnoDB",
+        # Ajout seul : toute modification ou suppression est refusée. En production, n'accorder
+        # en plus à l'utilisateur de l'application que INSERT et SELECT sur cette table.
+        "CREATE TRIGGER `audit_log_no_update` BEFORE UPDATE ON `audit_log` FOR EACH ROW "
+        "SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'audit_log est en ajout seul'",
+        "CREATE TRIGGER `audit_log_no_delete` BEFORE DELETE ON `audit_log` FOR EACH ROW "
+        "SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'audit_log est en ajout seul'",
+    ]),
+    (10, "Factures : certification FNE à rapprocher (NIM obtenu mais non enregistré)", [
+        "ALTER TABLE `invoices` MODIFY COLUMN `fne_status` "
+        "ENUM('pending', 'processing', 'success', 'failed', 'needs_reconciliation') DEFAULT 'pending'",
+        "ALTER TABLE `invoices_archive` MODIFY COLUMN `fne_status` "
+        "ENUM('pending', 'processing', 'success', 'failed', 'needs_reconciliation') DEFAULT 'pending'",
+    ]),
+]
+
+def apply_migrations(cursor, cnx):
+    """
+    Applique les migrations de MIGRATIONS absentes de la table `schema_migrations`.
+    MySQL valide implicitement chaque instruction DDL : une migration interrompue
+    doit être terminée à la main avant de relancer le script.
+    """
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS `schema_migrations` ("
+        "  `version` INT PRIMARY KEY,"
+        "  `description` VARCHAR(255) NOT NULL,"
+        "  `applied_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
+        ") ENGINE=InnoDB")
+    cursor.execute("SELECT version FROM schema_migrations")
+    applied = {row[0] for row in cursor.fetchall()}
+
+    pending = [m for m in MIGRATIONS if m[0] not in applied]
+    if not pending:
+        print("\nSchéma à jour.")
+        return
+
+    print("\nApplication des migrations...")
+    for version, description, statements in pending:
+        print(f"  - {version:03d} {description}... ", end='')
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+            (version, description)
+        )
+        cnx.commit()
+        print("OK")
+
 def insert_initial_data(cursor):
     """Insère les données initiales (rôles et admin)."""
     print("\nInsertion des données initiales...")
@@ -165,13 +353,177 @@ def insert_initial_data(cursor):
     print("  - Utilisateur 'admin' créé avec succès.")
 
 
+SEED_STATUSES = (
+    # (statut, fne_status, poids)
+    ('draft', 'pending', 10),
+    ('certified', 'success', 40),
+    ('paid', 'success', 40),
+    ('partially_paid', 'success', 5),
+    ('cancelled', 'success', 5),
+)
+
+def _seed_batches(cursor, cnx, query, rows_iter, batch_size, label, total):
+    """Insère les lignes par lots multi-lignes (executemany) avec un commit par lot."""
+    batch = []
+    done = 0
+    start = time.perf_counter()
+    for row in rows_iter:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            cursor.executemany(query, batch)
+            cnx.commit()
+            done += len(batch)
+            batch = []
+            print(f"\r  - {label}: {done}/{total} ({time.perf_counter() - start:.0f} s)", end='')
+    if batch:
+        cursor.executemany(query, batch)
+        cnx.commit()
+        done += len(batch)
+    print(f"\r  - {label}: {done}/{total} ({time.perf_counter() - start:.0f} s)")
+
+def seed_synthetic_data(cursor, cnx, n_clients, n_products, n_invoices,
+                        min_items=5, max_items=50, batch_size=2000, seed=42):
+    """
+    Génère un jeu de données synthétique réaliste pour les benchmarks
+    (clients, produits, factures sur trois ans et leurs lignes d'articles).
+    Les IDs sont attribués explicitement pour pouvoir insérer les lignes
+    d'articles par lots sans relire les IDs générés.
+    """
+    rng = random.Random(seed)
+    print("\nGénération du jeu de données synthétique...")
+
+    cursor.execute("SELECT id FROM users WHERE username = 'admin'")
+    admin = cursor.fetchone()
+    if not admin:
+        print("ERREUR: l'utilisateur 'admin' est requis pour générer des factures.")
+        return
+    user_id = admin[0]
+
+    # Accélère le chargement massif : contrôles rétablis en fin de génération
+    cursor.execute("SET SESSION unique_checks = 0")
+    cursor.execute("SET SESSION foreign_key_checks = 0")
+    try:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM clients")
+        first_client = cursor.fetchone()[0] + 1
+        _seed_batches(
+            cursor, cnx,
+            "INSERT INTO clients (id, name, address, email, phone) VALUES (%s, %s, %s, %s, %s)",
+            (
+                (first_client + i, f"Client {first_client + i} SARL",
+                 f"{rng.randint(1, 999)} Boulevard {rng.choice(['Latrille', 'VGE', 'de Marseille', 'Lagunaire'])}, Abidjan",
+                 f"contact{first_client + i}@exemple.ci", f"+225 07 {rng.randint(10000000, 99999999)}")
+                for i in range(n_clients)
+            ),
+            batch_size, "Clients", n_clients
+        )
+
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM products")
+        first_product = cursor.fetchone()[0] + 1
+        products = [
+            (first_product + i, f"Produit {first_product + i}", f"Description du produit {first_product + i}",
+             round(rng.uniform(500, 500000), 2), rng.choice((0.0, 9.0, 18.0, 18.0, 18.0)))
+            for i in range(n_products)
+        ]
+        _seed_batches(
+            cursor, cnx,
+            "INSERT INTO products (id, name, description, unit_price, tax_rate) VALUES (%s, %s, %s, %s, %s)",
+            iter(products), batch_size, "Produits", n_products
+        )
+
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM invoices")
+        first_invoice = cursor.fetchone()[0] + 1
+        statuses = [s[:2] for s in SEED_STATUSES]
+        weights = [s[2] for s in SEED_STATUSES]
+        today = datetime.date.today()
+
+        invoice_query = (
+            "INSERT INTO invoices (id, client_id, user_id, document_type, issue_date, due_date, total_amount,"
+            " amount_paid, status, fne_status, fne_nim) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+        )
+        item_query = (
+            "INSERT INTO invoice_items (invoice_id, product_id, description, quantity, unit_price, tax_rate)"
+            " VALUES (%s, %s, %s, %s, %s, %s)"
+        )
+        start = time.perf_counter()
+        invoices, items = [], []
+        for i in range(n_invoices):
+            invoice_id = first_invoice + i
+            total = 0
+            for _ in range(rng.randint(min_items, max_items)):
+                product = products[rng.randrange(n_products)]
+                quantity = rng.randint(1, 20)
+                total += quantity * product[3] * (1 + product[4] / 100)
+                items.append((invoice_id, product[0], product[1], quantity, product[3], product[4]))
+
+            status, fne_status = rng.choices(statuses, weights)[0]
+            issue_date = today - datetime.timedelta(days=rng.randint(0, 3 * 365))
+            total = round(total, 2)
+            if status == 'paid':
+                amount_paid = total
+            elif status == 'partially_paid':
+                amount_paid = round(total * rng.uniform(0.2, 0.8), 2)
+            else:
+                amount_paid = 0
+            invoices.append((
+                invoice_id, first_client + rng.randrange(n_clients), user_id, 'sale',
+                issue_date, issue_date + datetime.timedelta(days=30), total, amount_paid,
+                status, fne_status, f"NIM-SIM-{invoice_id:010d}" if status != 'draft' else None
+            ))
+
+            if len(invoices) >= batch_size or i == n_invoices - 1:
+                cursor.executemany(invoice_query, invoices)
+                cursor.executemany(item_query, items)
+                cnx.commit()
+                invoices, items = [], []
+                print(f"\r  - Factures: {i + 1}/{n_invoices} ({time.perf_counter() - start:.0f} s)", end='')
+        print()
+    finally:
+        cursor.execute("SET SESSION foreign_key_checks = 1")
+        cursor.execute("SET SESSION unique_checks = 1")
+
+    print("  - Calcul des totaux enregistrés des factures...")
+    for statement in INVOICE_TOTALS_BACKFILL:
+        cursor.execute(statement)
+    # Les montants générés en float sont alignés sur les totaux au centime
+    cursor.execute(
+        "UPDATE invoices SET total_amount = subtotal + vat_amount,"
+        " amount_paid = IF(status = 'paid', total_amount, LEAST(amount_paid, total_amount))"
+        " WHERE id >= %s", (first_invoice,)
+    )
+    cnx.commit()
+
+    print("  - Calcul des cumuls mensuels de TVA...")
+    for statement in VAT_ROLLUP_REBUILD_WITH_ARCHIVE:
+        cursor.execute(statement)
+    cnx.commit()
+
+    print("Jeu de données synthétique généré.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Création et initialisation de la base de données.")
+    parser.add_argument('--host', help="Hôte de la base de données")
+    parser.add_argument('--user', help="Utilisateur de la base de données")
+    parser.add_argument('--database', help="Nom de la base de données de l'application")
+    parser.add_argument('--seed', action='store_true',
+                        help="Génère un jeu de données synthétique pour les benchmarks")
+    parser.add_argument('--clients', type=int, default=50000)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--invoices', type=int, default=1000000)
+    parser.add_argument('--items-min', type=int, default=5)
+    parser.add_argument('--items-max', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=2000)
+    return parser.parse_args()
+
+
 def main():
     """Fonction principale pour exécuter le script."""
+    args = parse_args()
     try:
-        db_host = input("Entrez l'hôte de la base de données (ex: localhost): ")
-        db_user = input("Entrez le nom d'utilisateur de la base de données (ex: root): ")
+        db_host = args.host or input("Entrez l'hôte de la base de données (ex: localhost): ")
+        db_user = args.user or input("Entrez le nom d'utilisateur de la base de données (ex: root): ")
         db_password = getpass.getpass("Entrez le mot de passe de la base de données: ")
-        db_name = input("Entrez le nom de la base de données pour l'application (ex: facturation_db): ")
+        db_name = args.database or input("Entrez le nom de la base de données pour l'application (ex: facturation_db): ")
 
         # Connexion au serveur MySQL
         cnx = mysql.connector.connect(
@@ -189,11 +541,18 @@ def main():
 
         # Création des tables et insertion des données
         create_tables(cursor)
+        apply_migrations(cursor, cnx)
         insert_initial_data(cursor)
 
         cnx.commit()
         print("\nConfiguration de la base de données terminée avec succès !")
 
+        if args.seed:
+            seed_synthetic_data(
+                cursor, cnx, args.clients, args.products, args.invoices,
+                min_items=args.items_min, max_items=args.items_max, batch_size=args.batch_size
+            )
+
     except Error as e:
         print(f"\nUne erreur est survenue: {e}")
     finally:
@@ -0,0 +1,583 @@
+"""
+Ligne de commande de l'application, sans interface graphique (serveurs, tâches cron).
+
+    python cli.py [--config FICHIER] [--tenant NOM ... | --all-tenants] <commande> ...
+
+Commandes :
+    certify   certification FNE des brouillons (--all-drafts) ou de factures choisies
+    pdf       génération des PDF d'un lot de factures
+    import    import CSV de clients, de produits ou d'un relevé bancaire
+    export    export CSV des factures, clients ou produits
+    report    balance âgée ou récapitulatif de TVA (CSV ou tableau sur la sortie standard)
+    archive   archivage des factures closes des années passées (voir [archive])
+
+La connexion et la clé FNE viennent du fichier de configuration ou de l'environnement
+(voir core/config.py, ex: FACTURATION_DATABASE_PASSWORD). Le mot de passe n'est demandé
+que si la commande est lancée depuis un terminal. PyQt6 n'est jamais importé.
+certify, pdf et archive traitent plusieurs entités (sections [tenant:<nom>]) dans le même lot,
+chacune avec ses connexions et sa clé FNE. certify --async recouvre les attentes SQL et
+FNE de nombreuses factures sur un seul thread (dépendances facultatives aiomysql et httpx).
+Les certifications, impressions et archivages sont inscrits au journal d'audit
+(source 'cli', opérateur [cli] operator ou --operator).
+La progression est écrite sur la sortie standard ; le code de sortie vaut 1 si un
+élément du lot a échoué, 2 en cas d'erreur de configuration ou de connexion.
+"""
+import argparse
+import asyncio
+import csv
+import datetime
+import getpass
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.audit import audit_log
+from core.config import load_config, apply_runtime_settings, ConfigError, TENANT_SECTION_PREFIX
+from core.db_manager import release_thread_connections
+from core.tenants import TenantRegistry
+from core.query_stats import query_stats
+from core.tracing import tracer
+from models.client import ClientModel
+from models.company import CompanyModel
+from models.invoice import InvoiceModel
+from models.product import ProductModel
+from models.user import UserModel
+
+EXIT_OK, EXIT_FAILURES, EXIT_ERROR = 0, 1, 2
+
+
+class CommandError(Exception):
+    """Erreur bloquante d'une commande (message affiché, code de sortie 2)."""
+    pass
+
+
+def progress(message):
+    print(message, flush=True)
+
+
+def parse_date(text):
+    try:
+        return datetime.date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"date invalide (AAAA-MM-JJ attendu) : {text}")
+
+
+# --- Contexte commun ---
+
+def open_tenants(args, config, jobs=1):
+    """
+    Entités visées (--tenant, --all-tenants, sinon l'entité par défaut) et registre de leurs connexions.
+    Le mot de passe n'est demandé que si une entité n'a pas le sien dans la configuration.
+    :return: Tuple (noms, TenantRegistry).
+    """
+    try:
+        names = config.tenant_names() if args.all_tenants else [config.tenant(name).name for name in args.tenant or [None]]
+    except ConfigError as e:
+        raise CommandError(str(e))
+    names = list(dict.fromkeys(names))
+
+    password = None
+    if any(config.tenant(name).password is None for name in names):
+        if not sys.stdin.isatty():
+            raise CommandError("Mot de passe de la base absent : renseignez [database] password "
+                               "ou FACTURATION_DATABASE_PASSWORD.")
+        password = getpass.getpass("Mot de passe de la base de données: ")
+    return names, TenantRegistry(config, password, pool_size=max(jobs, 1))
+
+
+def tenant_db(registry, name):
+    db_manager = registry.db_manager(name)
+    if db_manager is None:
+        raise CommandError(f"Impossible de se connecter à la base de données de l'entité {name}.")
+    return db_manager
+
+
+def connect(args, config):
+    """
+    Base de l'unique entité visée (commandes import, export et report).
+    :return: Tuple (registre, gestionnaire) ; fermer le registre, qui vide d'abord le journal d'audit.
+    """
+    names, registry = open_tenants(args, config)
+    try:
+        if len(names) > 1:
+            raise CommandError("Cette commande ne traite qu'une entité à la fois : précisez --tenant.")
+        return registry, tenant_db(registry, names[0])
+    except CommandError:
+        registry.close()
+        raise
+
+
+def interleave(items_by_tenant):
+    """Alterne les éléments des entités, pour que les threads d'un lot les servent toutes en parallèle."""
+    lists = list(items_by_tenant.values())
+    return [item for group in itertools.zip_longest(*lists) for item in group if item is not None]
+
+
+def run_batch(items, task, jobs, describe):
+    """
+    Exécute `task(item)` pour chaque élément, sur `jobs` threads, en affichant la progression.
+    `task` retourne le message de succès ou lève une exception (compté en échec).
+    :param describe: Fonction donnant le libellé d'un élément dans la progression.
+    :return: Nombre d'échecs.
+    """
+    progress_report = BatchProgress(len(items), describe)
+
+    def guarded(item):
+        try:
+            return item, task(item), None
+        except Exception as e:
+            return item, None, e
+        finally:
+            # Les threads du lot empruntent des connexions aux pools
+            release_thread_connections()
+
+    if jobs > 1:
+        executor = ThreadPoolExecutor(max_workers=jobs)
+        results = executor.map(guarded, items)
+    else:
+        executor = None
+        results = (guarded(item) for item in items)
+    try:
+        for item, message, error in results:
+            progress_report.add(item, message, error)
+    finally:
+        if executor:
+            executor.shutdown()
+    return progress_report.finish()
+
+
+class BatchProgress:
+    """Progression d'un lot sur la sortie standard ([fait/total] libellé : résultat)."""
+
+    def __init__(self, total, describe):
+        self.total = total
+        self.describe = describe
+        self.done = 0
+        self.failures = 0
+        self.start = time.perf_counter()
+
+    def add(self, item, message, error=None):
+        self.done += 1
+        if error is None:
+            progress(f"[{self.done}/{self.total}] {self.describe(item)} : {message}")
+        else:
+            self.failures += 1
+            progress(f"[{self.done}/{self.total}] {self.describe(item)} : ÉCHEC - {error}")
+
+    def finish(self):
+        """:return: Nombre d'échecs."""
+        progress(f"Terminé : {self.total - self.failures} réussite(s), {self.failures} échec(s) "
+                 f"en {time.perf_counter() - self.start:.1f} s.")
+        return self.failures
+
+
+def describe_invoice(names):
+    if len(names) > 1:
+        return lambda item: f"Facture {item[0]} #{item[1]}"
+    return lambda item: f"Facture #{item[1]}"
+
+
+def selected_invoice_ids(args, invoice_model, default_status):
+    if args.invoice:
+        return args.invoice
+    return invoice_model.get_ids(status=args.status or default_status, since=args.since,
+                                 until=args.until, limit=args.limit,
+                                 include_archive=getattr(args, 'include_archive', False))
+
+
+# --- Commandes ---
+
+def cmd_certify(args, config):
+    if not args.invoice and not args.all_drafts:
+        raise CommandError("Indiquez --invoice ID... ou --all-drafts.")
+
+    names, registry = open_tenants(args, config, args.jobs)
+    try:
+        if args.async_mode:
+            # Les événements d'audit sont écrits par les connexions synchrones des entités
+            for name in names:
+                tenant_db(registry, name)
+            return asyncio.run(certify_async(args, config, names, registry.password))
+
+        services, operators, ids = {}, {}, {}
+        operator_name = args.operator or config.cli.operator
+        for name in names:
+            db_manager = tenant_db(registry, name)
+            services[name] = registry.certification_service(name)
+            if not services[name].api_key:
+                raise CommandError(f"Clé d'API FNE absente pour l'entité {name} "
+                                   f"(company_info.fne_api_key ou [{TENANT_SECTION_PREFIX}{name}] api_key).")
+            operators[name] = UserModel(db_manager).get_by_username(operator_name)
+            if not operators[name]:
+                raise CommandError(f"Opérateur inconnu ou désactivé pour l'entité {name} : {operator_name}")
+            ids[name] = [(name, invoice_id)
+                         for invoice_id in selected_invoice_ids(args, InvoiceModel(db_manager), 'draft')]
+            if len(names) > 1:
+                progress(f"{name} : {len(ids[name])} facture(s) à certifier.")
+
+        items = interleave(ids)
+        progress(f"{len(items)} facture(s) à certifier ({args.jobs} en parallèle).")
+
+        def certify(item):
+            name, invoice_id = item
+            return f"certifiée (NIM {services[name].certify(invoice_id, operators[name])['nim']})"
+
+        return run_batch(items, certify, args.jobs, describe_invoice(names))
+    finally:
+        registry.close()
+
+
+async def certify_async(args, config, names, password):
+    """
+    Variante asyncio de cmd_certify (--async) : toutes les entités dans une seule boucle,
+    `--jobs` factures en cours au plus, un pool aiomysql et un client httpx par entité.
+    """
+    # aiomysql et httpx sont facultatifs : leur absence lève RuntimeError à la création du pool ou du client
+    from core.async_db import AsyncDBManager
+    from core.async_certification import AsyncCertificationService, run_bounded
+
+    pools, services, operators, ids = {}, {}, {}, {}
+    operator_name = args.operator or config.cli.operator
+    try:
+        for name in names:
+            try:
+                db = await AsyncDBManager.from_config(config, password, pool_size=args.jobs, tenant=name).open()
+                if db is None:
+                    raise CommandError(f"Impossible de se connecter à la base de données de l'entité {name}.")
+                pools[name] = db
+                services[name] = await AsyncCertificationService.from_config(db, config, max_connections=args.jobs)
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            if not services[name].api_key:
+                raise CommandError(f"Clé d'API FNE absente pour l'entité {name} "
+                                   f"(company_info.fne_api_key ou [{TENANT_SECTION_PREFIX}{name}] api_key).")
+            operators[name] = await services[name].get_operator(operator_name)
+            if not operators[name]:
+                raise CommandError(f"Opérateur inconnu ou désactivé pour l'entité {name} : {operator_name}")
+            invoice_ids = args.invoice or await services[name].invoice_model.get_ids(
+                status=args.status or 'draft', since=args.since, until=args.until, limit=args.limit)
+            ids[name] = [(name, invoice_id) for invoice_id in invoice_ids]
+            if len(names) > 1:
+                progress(f"{name} : {len(ids[name])} facture(s) à certifier.")
+
+        items = interleave(ids)
+        progress(f"{len(items)} facture(s) à certifier ({args.jobs} simultanées, mode asynchrone).")
+
+        async def certify(item):
+            name, invoice_id = item
+            fne_response = await services[name].certify(invoice_id, operators[name])
+            return f"certifiée (NIM {fne_response['nim']})"
+
+        progress_report = BatchProgress(len(items), describe_invoice(names))
+        async for item, message, error in run_bounded(items, certify, args.jobs):
+            progress_report.add(item, message, error)
+        return progress_report.finish()
+    finally:
+        for service in services.values():
+            await service.fne_client.aclose()
+        for db in pools.values():
+            await db.close()
+
+
+def cmd_pdf(args, config):
+    from core.pdf_generator import generate_invoice_pdf
+
+    names, registry = open_tenants(args, config, args.jobs)
+    try:
+        companies, ids, output_dirs = {}, {}, {}
+        for name in names:
+            db_manager = tenant_db(registry, name)
+            companies[name] = CompanyModel(db_manager).get()
+            ids[name] = [(name, invoice_id)
+                         for invoice_id in selected_invoice_ids(args, InvoiceModel(db_manager), 'certified')]
+            # Plusieurs entités : un sous-répertoire par entité (les numéros de facture se recoupent)
+            output_dirs[name] = os.path.join(args.output, name) if len(names) > 1 else args.output
+            os.makedirs(output_dirs[name], exist_ok=True)
+
+        items = interleave(ids)
+        progress(f"{len(items)} PDF à générer dans {args.output}.")
+
+        def render(item):
+            name, invoice_id = item
+            db_manager = registry.db_manager(name)
+            invoice_data = InvoiceModel(db_manager).get_by_id(invoice_id)
+            if not invoice_data:
+                raise CommandError("facture non trouvée")
+            client_data = ClientModel(db_manager).get_by_id(invoice_data['details']['client_id']) or {}
+            filepath = os.path.join(output_dirs[name], f"FACTURE_{invoice_id}.pdf")
+            generate_invoice_pdf(filepath, invoice_data, client_data, companies[name])
+            audit_log.record(db_manager, 'print', 'invoice', invoice_id, {'status': invoice_data['details']['status']})
+            return filepath
+
+        return run_batch(items, render, args.jobs, describe_invoice(names))
+    finally:
+        registry.close()
+
+
+def _read_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=';,\t')
+        except csv.Error:
+            dialect = csv.excel
+        return [{(k or '').strip().lower(): (v or '').strip() for k, v in row.items()}
+                for row in csv.DictReader(f, dialect=dialect)]
+
+
+def cmd_import(args, config):
+    registry, db_manager = connect(args, config)
+    try:
+        if args.kind == 'bank-statement':
+            return _import_bank_statement(args, db_manager)
+
+        rows = _read_csv(args.file)
+        progress(f"{len(rows)} ligne(s) lue(s) dans {args.file}.")
+        missing = [i for i, row in enumerate(rows, start=2) if not row.get('name')]
+        if missing:
+            raise CommandError(f"Colonne 'name' vide ou absente (lignes {', '.join(map(str, missing[:10]))}).")
+
+        if args.kind == 'clients':
+            count, error = ClientModel(db_manager).create_many(rows, batch_size=args.batch_size)
+        else:
+            for row in rows:
+                for key in ('unit_price', 'tax_rate'):
+                    if row.get(key):
+                        row[key] = row[key].replace(' ', '').replace(',', '.')
+                    else:
+                        row.pop(key, None)
+            count, error = ProductModel(db_manager).create_many(rows, batch_size=args.batch_size)
+        if error:
+            raise CommandError(error)
+        progress(f"{count} {args.kind} importé(s).")
+        return EXIT_OK
+    finally:
+        registry.close()
+
+
+def _import_bank_statement(args, db_manager):
+    from core.bank_reconciliation import read_bank_statement, reconcile, StatementError
+    from models.payment import PaymentModel
+
+    try:
+        lines, errors = read_bank_statement(args.file)
+    except StatementError as e:
+        raise CommandError(str(e))
+    for error in errors:
+        progress(f"Ignorée : {error}")
+
+    payment_model = PaymentModel(db_manager)
+    payments, unmatched = reconcile(lines, payment_model.get_open_invoices())
+    for payment in payments:
+        progress(f"Ligne {payment['line_number']} : {payment['amount']:.2f} -> facture #{payment['invoice_id']} "
+                 f"({payment['match']})")
+    for line in unmatched:
+        progress(f"Ligne {line['line_number']} : {line['amount']:.2f} non rapprochée ({line['reason']})")
+    progress(f"{len(payments)} paiement(s) rapproché(s), {len(unmatched)} ligne(s) à traiter manuellement.")
+
+    if args.dry_run or not payments:
+        return EXIT_OK
+    count, error = payment_model.create_many(payments)
+    if error:
+        raise CommandError(error)
+    progress(f"{count} paiement(s) enregistré(s).")
+    return EXIT_FAILURES if unmatched or errors else EXIT_OK
+
+
+EXPORTS = {
+    # type: (méthode du modèle, colonnes)
+    'invoices': (lambda db: InvoiceModel(db).get_all_with_client_info(),
+                 ('id', 'issue_date', 'due_date', 'client_name', 'total_amount', 'balance_due',
+                  'status', 'fne_status', 'fne_nim')),
+    'clients': (lambda db: ClientModel(db).get_all(), ('id', 'name', 'address', 'email', 'phone')),
+    'products': (lambda db: ProductModel(db).get_all(), ('id', 'name', 'description', 'unit_price', 'tax_rate')),
+}
+
+
+def _open_output(path):
+    if not path or path == '-':
+        return sys.stdout, False
+    return open(path, 'w', newline='', encoding='utf-8-sig'), True
+
+
+def cmd_export(args, config):
+    load, columns = EXPORTS[args.kind]
+    registry, db_manager = connect(args, config)
+    try:
+        rows = load(db_manager)
+    finally:
+        registry.close()
+
+    output, close = _open_output(args.output)
+    try:
+        writer = csv.writer(output, delimiter=';')
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(['' if row.get(column) is None else row.get(column) for column in columns])
+    finally:
+        if close:
+            output.close()
+    if close:
+        progress(f"{len(rows)} ligne(s) exportée(s) dans {args.output}.")
+    return EXIT_OK
+
+
+def cmd_report(args, config):
+    from models.report import ReportModel
+
+    registry, db_manager = connect(args, config)
+    try:
+        model = ReportModel(db_manager)
+        if args.kind == 'aged-receivables':
+            report = model.get_aged_receivables(args.as_of)
+        else:
+            if not (args.start and args.end):
+                raise CommandError("Le récapitulatif de TVA demande --from et --to.")
+            report = model.get_vat_report(args.start, args.end, args.by_client)
+    finally:
+        registry.close()
+    if report is None:
+        raise CommandError("Impossible de calculer le rapport.")
+
+    if args.output:
+        progress(f"{report.title} : {len(report.rows)} ligne(s) exportée(s) dans {report.export_csv(args.output)}.")
+        return EXIT_OK
+
+    # Tableau aligné sur la sortie standard
+    headers = [label for _, label in report.columns]
+    table = report.to_table()
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *table)]
+    progress(report.title)
+    for values in [headers] + table:
+        progress("  ".join(str(cell).rjust(width) if i else str(cell).ljust(width)
+                           for i, (cell, width) in enumerate(zip(values, widths))))
+    return EXIT_OK
+
+
+def cmd_archive(args, config):
+    from models.archive import ArchiveModel, archive_cutoff
+
+    before = args.before or archive_cutoff(config.archive.keep_years)
+    batch_size = args.archive_batch_size or config.archive.batch_size
+    names, registry = open_tenants(args, config)
+    try:
+        failures = 0
+        for name in names:
+            label = f"{name} : " if len(names) > 1 else ""
+            model = ArchiveModel(tenant_db(registry, name))
+            count = model.count_archivable(before)
+            if count is None:
+                raise CommandError(f"{label}impossible de sélectionner les factures à archiver.")
+            progress(f"{label}{count} facture(s) close(s) émise(s) avant le {before:%d/%m/%Y}.")
+            if args.dry_run or not count:
+                continue
+
+            archived, error = model.archive_before(
+                before, batch_size, on_batch=lambda done: progress(f"{label}[{done}/{count}] archivée(s)"))
+            if error:
+                failures += 1
+                progress(f"{label}ÉCHEC après {archived} facture(s) - {error}")
+            else:
+                progress(f"{label}{archived} facture(s) archivée(s).")
+        return failures
+    finally:
+        registry.close()
+
+
+# --- Arguments ---
+
+def add_selection_arguments(parser):
+    parser.add_argument('--invoice', type=int, nargs='+', help="IDs des factures à traiter")
+    parser.add_argument('--status', help="Statut des factures à traiter")
+    parser.add_argument('--since', type=parse_date, help="Émises à partir du (AAAA-MM-JJ)")
+    parser.add_argument('--until', type=parse_date, help="Émises jusqu'au (AAAA-MM-JJ)")
+    parser.add_argument('--limit', type=int)
+    parser.add_argument('--jobs', type=int, help="Factures traitées en parallèle (défaut : [concurrency] cli_jobs)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Facturation FNE en ligne de commande.")
+    parser.add_argument('--config', help="Fichier de configuration INI")
+    parser.add_argument('--tenant', action='append', metavar='NOM',
+                        help="Entité traitée (répétable ; défaut : [tenants] default)")
+    parser.add_argument('--all-tenants', action='store_true', help="Toutes les entités déclarées (certify, pdf, archive)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    certify = subparsers.add_parser('certify', help="Certification FNE")
+    add_selection_arguments(certify)
+    certify.add_argument('--all-drafts', action='store_true', help="Tous les brouillons (ou --status)")
+    certify.add_argument('--operator', help="Utilisateur opérateur (défaut : [cli] operator)")
+    certify.add_argument('--async', dest='async_mode', action='store_true',
+                         help="Mode asyncio (aiomysql, httpx) : --jobs factures simultanées sur un seul thread")
+    certify.set_defaults(handler=cmd_certify)
+
+    pdf = subparsers.add_parser('pdf', help="Génération de PDF (factures certifiées par défaut)")
+    add_selection_arguments(pdf)
+    pdf.add_argument('--output', required=True, help="Répertoire de destination")
+    pdf.add_argument('--include-archive', action='store_true', help="Sélection : factures archivées comprises")
+    pdf.set_defaults(handler=cmd_pdf)
+
+    importer = subparsers.add_parser('import', help="Import CSV")
+    importer.add_argument('kind', choices=('clients', 'products', 'bank-statement'))
+    importer.add_argument('file')
+    importer.add_argument('--batch-size', type=int, help="Lignes par requête (défaut : [batch] import_size)")
+    importer.add_argument('--dry-run', action='store_true', help="Relevé : rapprocher sans enregistrer")
+    importer.set_defaults(handler=cmd_import)
+
+    exporter = subparsers.add_parser('export', help="Export CSV")
+    exporter.add_argument('kind', choices=tuple(EXPORTS))
+    exporter.add_argument('--output', help="Fichier CSV (défaut : sortie standard)")
+    exporter.set_defaults(handler=cmd_export)
+
+    report = subparsers.add_parser('report', help="Rapports")
+    report.add_argument('kind', choices=('aged-receivables', 'vat'))
+    report.add_argument('--as-of', type=parse_date, help="Balance âgée : date d'arrêté")
+    report.add_argument('--from', dest='start', type=parse_date, help="TVA : début de période")
+    report.add_argument('--to', dest='end', type=parse_date, help="TVA : fin de période")
+    report.add_argument('--by-client', action='store_true')
+    report.add_argument('--output', help="Fichier CSV (défaut : tableau sur la sortie standard)")
+    report.set_defaults(handler=cmd_report)
+
+    archive = subparsers.add_parser('archive', help="Archivage des factures closes")
+    archive.add_argument('--before', type=parse_date,
+                         help="Émises avant le (AAAA-MM-JJ ; défaut : 1er janvier, [archive] keep_years ans plus tôt)")
+    archive.add_argument('--batch-size', dest='archive_batch_size', type=int, metavar='N',
+                         help="Factures par transaction (défaut : [archive] batch_size)")
+    archive.add_argument('--dry-run', action='store_true', help="Compter sans archiver")
+    archive.set_defaults(handler=cmd_archive)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = None
+    try:
+        config = load_config(args.config)
+        apply_runtime_settings(config)
+        audit_log.source = 'cli'
+        audit_log.set_actor({'username': getattr(args, 'operator', None) or config.cli.operator})
+        if 'jobs' in args and args.jobs is None:
+            args.jobs = config.concurrency.cli_jobs
+        if 'batch_size' in args and args.batch_size is None:
+            args.batch_size = config.batch.import_size
+        exit_code = EXIT_FAILURES if args.handler(args, config) else EXIT_OK
+    except (ConfigError, CommandError) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        exit_code = EXIT_ERROR
+    finally:
+        # Les registres ont déjà vidé le tampon à leur fermeture : arrêt du thread d'écriture
+        audit_log.close()
+
+    if config and config.diagnostics.query_stats_on_exit:
+        print("\n--- Statistiques des requêtes SQL ---")
+        print(query_stats.summary())
+    if config and config.diagnostics.trace:
+        print(f"Trace exportée : {tracer.export(config.diagnostics.trace)}")
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,7 @@
 import bcrypt
 from mysql.connector import Error
+from core.audit import audit_log
+from core.tracing import traced
 
 class AuthController:
     def __init__(self, db_manager):
@@ -10,6 +12,7 @@ class AuthController:
         self.db_manager = db_manager
         self.current_user = None
 
+    @traced()
     def check_credentials(self, username, password):
         """
         Vérifie les identifiants de l'utilisateur contre la base de données.
@@ -38,10 +41,14 @@ class AuthController:
 
             if not user_data:
                 print(f"Authentification échouée: L'utilisateur '{username}' n'existe pas.")
+                audit_log.record(self.db_manager, 'login_failed', 'user', details={'reason': 'unknown'},
+                                 user={'username': username})
                 return None
 
             if not user_data['is_active']:
                 print(f"Authentification échouée: Le compte pour '{username}' est désactivé.")
+                audit_log.record(self.db_manager, 'login_failed', 'user', user_data['id'], {'reason': 'inactive'},
+                                 user=user_data)
                 return None
 
             # Vérifier le mot de passe
@@ -51,9 +58,12 @@ class AuthController:
             if bcrypt.checkpw(entered_password, stored_hash):
                 print(f"Authentification réussie pour l'utilisateur '{username}'.")
                 self.current_user = user_data
+                audit_log.record(self.db_manager, 'login', 'user', user_data['id'], user=user_data)
                 return user_data
             else:
                 print(f"Authentification échouée: Mot de passe incorrect pour '{username}'.")
+                audit_log.record(self.db_manager, 'login_failed', 'user', user_data['id'], {'reason': 'password'},
+                                 user=user_data)
                 return None
 
         except Error as e:
@@ -1,7 +1,9 @@
 from PyQt6.QtWidgets import QMessageBox, QDialog
-from models.client_model import ClientModel
+from models.client import ClientModel
 from views.client_view import ClientView
 from views.crud_dialog import CrudDialog
+from core.tracing import traced
+from core.async_loader import AsyncLoader
 
 class ClientController:
     def __init__(self, db_manager, main_window):
@@ -10,6 +12,8 @@ class ClientController:
 
         self.model = ClientModel(self.db_manager)
         self.view = ClientView()
+        # Chargement de la liste en tâche de fond
+        self.loader = AsyncLoader(self.model.get_all, parent=self.view)
 
         # Remplacer le widget placeholder dans la MainWindow
         # L'index 2 correspond à "Clients" dans l'ordre d'ajout dans main_window.py
@@ -33,12 +37,17 @@ class ClientController:
         self.view.new_button.clicked.connect(self.open_new_client_dialog)
         self.view.edit_button.clicked.connect(self.open_edit_client_dialog)
         self.view.delete_button.clicked.connect(self.delete_client)
+        self.loader.loaded.connect(self.view.set_clients)
+        self.loader.loading_changed.connect(self.view.set_loading)
+        self.loader.failed.connect(
+            lambda message: self.main_window.statusBar().showMessage(f"Erreur de chargement des clients : {message}"))
 
+    @traced()
     def load_clients(self):
-        """Charge les clients depuis le modèle et les affiche dans la vue."""
-        clients = self.model.get_all()
-        self.view.set_clients(clients)
+        """Charge les clients en tâche de fond ; la vue est remplie à la réception (voir connect_signals)."""
+        self.loader.load()
 
+    @traced(slot=True)
     def open_new_client_dialog(self):
         """Ouvre la boîte de dialogue pour créer un nouveau client."""
         dialog = CrudDialog(
@@ -55,6 +64,7 @@ class ClientController:
             else:
                 QMessageBox.critical(self.main_window, "Erreur", "Impossible de créer le client.")
 
+    @traced(slot=True)
     def open_edit_client_dialog(self):
         """Ouvre la boîte de dialogue pour modifier un client existant."""
         client_id = self.view.get_selected_client_id()
@@ -82,6 +92,7 @@ class ClientController:
             else:
                 QMessageBox.critical(self.main_window, "Erreur", "Impossible de mettre à jour le client.")
 
+    @traced(slot=True)
     def delete_client(self):
         """Supprime le client sélectionné après confirmation."""
         client_id = self.view.get_selected_client_id()
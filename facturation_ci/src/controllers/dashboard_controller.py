@@ -1,5 +1,7 @@
-from models.invoice_model import InvoiceModel
+from models.invoice import InvoiceModel
 from views.dashboard_view import DashboardView
+from core.tracing import traced
+from core.async_loader import AsyncLoader
 
 class DashboardController:
     def __init__(self, db_manager, main_window):
@@ -9,6 +11,13 @@ class DashboardController:
         self.invoice_model = InvoiceModel(self.db_manager)
         self.view = DashboardView()
 
+        # Chargement des statistiques en tâche de fond
+        self.loader = AsyncLoader(self.invoice_model.get_dashboard_stats, parent=self.view)
+        self.loader.loaded.connect(self.on_stats_loaded)
+        self.loader.loading_changed.connect(self.view.set_loading)
+        self.loader.failed.connect(
+            lambda message: self.main_window.statusBar().showMessage(f"Erreur de chargement des statistiques : {message}"))
+
         # Remplacer le widget placeholder dans la MainWindow (index 0)
         dashboard_widget_index = 0
         old_widget = self.main_window.stacked_widget.widget(dashboard_widget_index)
@@ -28,9 +37,12 @@ class DashboardController:
         if self.main_window.stacked_widget.widget(index) == self.view:
             self.load_dashboard_data()
 
+    @traced()
     def load_dashboard_data(self):
         """Charge les statistiques et met à jour la vue."""
         self.main_window.statusBar().showMessage("Chargement des statistiques du tableau de bord...")
-        stats = self.invoice_model.get_dashboard_stats()
+        self.loader.load()
+
+    def on_stats_loaded(self, stats):
         self.view.update_stats(stats)
         self.main_window.statusBar().showMessage("Prêt")
@@ -1,34 +1,37 @@
-from PyQt6.QtWidgets import QMessageBox, QDialog, QFileDialog
-from models.invoice_model import InvoiceModel
-from models.client_model import ClientModel
-from models.product_model import ProductModel
+from PyQt6.QtWidgets import QApplication, QMessageBox, QDialog, QFileDialog
+from models.invoice import InvoiceModel
+from models.client import ClientModel
+from models.product import ProductModel
+from models.company import CompanyModel
 from views.invoice_view import InvoiceView
+from controllers.payment_controller import PaymentController
 from views.invoice_editor_dialog import InvoiceEditorDialog
-from core.fne_client import certify_document, FNEClientError
-from core.pdf_generator import generate_invoice_pdf
+from core.audit import audit_log
+from core.tracing import traced
+from core.async_loader import AsyncLoader
 import os
 
 class InvoiceController:
-    def __init__(self, db_manager, main_window, user_data):
+    def __init__(self, db_manager, main_window, user_data, config):
         self.db_manager = db_manager
         self.main_window = main_window
         self.user_data = user_data
+        self.config = config
 
         # Models
         self.invoice_model = InvoiceModel(self.db_manager)
         self.client_model = ClientModel(self.db_manager)
         self.product_model = ProductModel(self.db_manager)
-        # TODO: Add a CompanyModel to get company_info and api_key
-        self.company_data = {
-            'name': 'Mon Entreprise SARL',
-            'address': '123 Rue de la Facture, Abidjan',
-            'phone': '+225 01 02 03 04 05',
-            'email': 'contact@monentreprise.ci',
-            'tax_id': 'CI-ABJ-2023-A-12345'
-        }
-        self.api_key = 'VOTRE_CLE_API_FNE_ICI'
+        # Informations de l'entreprise (table company_info, lues une fois)
+        self.company_model = CompanyModel(self.db_manager)
+        # Service de certification, créé à la première certification (sa session HTTP est réutilisée)
+        self.certification_service = None
 
         self.view = InvoiceView()
+        # Recherche (une page filtrée côté serveur) en tâche de fond
+        self.page = 1
+        self.loader = AsyncLoader(self.invoice_model.search, parent=self.view)
+        self.clients_loader = AsyncLoader(self.client_model.get_all, parent=self.view)
 
         # Replace placeholder in MainWindow
         invoice_widget_index = 1 # 'Factures' is at index 1
@@ -36,7 +39,11 @@ class InvoiceController:
         self.main_window.stacked_widget.removeWidget(old_widget)
         self.main_window.stacked_widget.insertWidget(invoice_widget_index, self.view)
 
+        # Paiements et rapprochement bancaire (boutons de la même vue)
+        self.payment_controller = PaymentController(self.db_manager, self.main_window, self.view, self.load_invoices)
+
         self.connect_signals()
+        self.clients_loader.load()
         self.load_invoices()
 
     def connect_signals(self):
@@ -44,11 +51,30 @@ class InvoiceController:
         self.view.view_button.clicked.connect(self.view_invoice)
         self.view.certify_button.clicked.connect(self.certify_invoice)
         self.view.pdf_button.clicked.connect(self.generate_pdf)
-
+        self.view.filters_changed.connect(lambda: self.go_to_page(1))
+        self.view.previous_button.clicked.connect(lambda: self.go_to_page(self.page - 1))
+        self.view.next_button.clicked.connect(lambda: self.go_to_page(self.page + 1))
+        self.loader.loaded.connect(self.on_invoices_loaded)
+        self.loader.loading_changed.connect(self.view.set_loading)
+        self.loader.failed.connect(
+            lambda message: self.main_window.statusBar().showMessage(f"Erreur de chargement des factures : {message}"))
+        self.clients_loader.loaded.connect(self.view.set_clients)
+
+    @traced()
     def load_invoices(self):
-        invoices = self.invoice_model.get_all_with_client_info()
+        """Recharge la page courante avec les filtres de la vue."""
+        self.loader.load(self.view.get_filters(), self.page, include_archive=self.view.include_archive())
+
+    def go_to_page(self, page):
+        self.page = max(page, 1)
+        self.load_invoices()
+
+    def on_invoices_loaded(self, result):
+        invoices, has_next = result
         self.view.set_invoices(invoices)
+        self.view.set_page(self.page, has_next)
 
+    @traced(slot=True)
     def open_new_invoice(self):
         dialog = InvoiceEditorDialog(
             client_model=self.client_model,
@@ -69,6 +95,7 @@ class InvoiceController:
                     QMessageBox.information(self.main_window, "Succès", f"Facture #{invoice_id} créée avec succès en tant que brouillon.")
                     self.load_invoices()
 
+    @traced(slot=True)
     def view_invoice(self):
         invoice_id = self.view.get_selected_invoice_id()
         if invoice_id is None:
@@ -89,56 +116,51 @@ class InvoiceController:
         )
         dialog.exec()
 
+    @traced(slot=True)
     def certify_invoice(self):
+        # Import différé : `requests` n'est chargé qu'à la première certification
+        from core.certification import CertificationService, CertificationError, CertificationNotSavedError
+        from core.fne_client import FNEClientError
+
         invoice_id = self.view.get_selected_invoice_id()
         if invoice_id is None:
             QMessageBox.warning(self.main_window, "Aucune Sélection", "Veuillez sélectionner une facture à certifier.")
             return
 
-        invoice_data = self.invoice_model.get_by_id(invoice_id)
-        if not invoice_data:
-            QMessageBox.critical(self.main_window, "Erreur", "Facture non trouvée.")
+        if self.certification_service is None:
+            self.certification_service = CertificationService.from_config(self.db_manager, self.config)
+        service = self.certification_service
+        if not service.api_key:
+            QMessageBox.warning(self.main_window, "Configuration Incomplète",
+                                "Aucune clé d'API FNE n'est configurée (table company_info ou réglage [fne] api_key).")
             return
-
-        if invoice_data['details']['status'] != 'draft':
-            QMessageBox.warning(self.main_window, "Action Impossible", f"Cette facture ne peut pas être certifiée (statut: {invoice_data['details']['status']}).")
-            return
-
-        # --- Données nécessaires pour l'API ---
-        client_info = self.client_model.get_by_id(invoice_data['details']['client_id'])
-
         try:
             # Afficher un message d'attente
             self.main_window.statusBar().showMessage("Certification en cours auprès de la FNE...")
             QApplication.processEvents()
 
-            fne_response = certify_document(invoice_data, self.company_data, client_info, self.user_data, self.api_key)
-
-            # Mettre à jour la BDD avec la réponse FNE
-            success = self.invoice_model.update_fne_data(
-                invoice_id, 'success',
-                nim=fne_response['nim'],
-                qr_code=fne_response['qr_code']
-            )
-            if success:
-                QMessageBox.information(self.main_window, "Succès", f"Facture #{invoice_id} certifiée avec succès.\nNIM: {fne_response['nim']}")
-            else:
-                raise FNEClientError("Impossible de sauvegarder la réponse FNE dans la base de données.")
+            fne_response = service.certify(invoice_id, self.user_data)
+            QMessageBox.information(self.main_window, "Succès", f"Facture #{invoice_id} certifiée avec succès.\nNIM: {fne_response['nim']}")
 
+        except CertificationNotSavedError as e:
+            QMessageBox.critical(self.main_window, "Certification non enregistrée",
+                                 f"{e}\nNe soumettez pas cette facture à nouveau : notez le NIM et "
+                                 f"contactez l'administrateur.")
+        except CertificationError as e:
+            QMessageBox.warning(self.main_window, "Action Impossible", str(e))
         except FNEClientError as e:
-            # En cas d'erreur de l'API, on met à jour la BDD pour tracer l'erreur
-            self.invoice_model.update_fne_data(invoice_id, 'failed', error_message=str(e))
             QMessageBox.critical(self.main_window, "Erreur de Certification FNE", f"La certification a échoué:\n{e}")
         finally:
             self.load_invoices()
             self.main_window.statusBar().showMessage("Prêt")
             QApplication.processEvents()
 
-# Need to import QApplication for processEvents
-from PyQt6.QtWidgets import QApplication
-
+    @traced(slot=True)
     def generate_pdf(self):
         """Génère un PDF pour la facture sélectionnée."""
+        # Import différé : ReportLab n'est chargé qu'à la première impression
+        from core.pdf_generator import generate_invoice_pdf
+
         invoice_id = self.view.get_selected_invoice_id()
         if invoice_id is None:
             QMessageBox.warning(self.main_window, "Aucune Sélection", "Veuillez sélectionner une facture à imprimer.")
@@ -174,7 +196,9 @@ from PyQt6.QtWidgets import QApplication
 
         try:
             self.main_window.statusBar().showMessage("Génération du PDF en cours...")
-            generate_invoice_pdf(filepath, invoice_data, client_data, self.company_data)
+            generate_invoice_pdf(filepath, invoice_data, client_data, self.company_model.get())
+            audit_log.record(self.db_manager, 'print', 'invoice', invoice_id,
+                             {'status': invoice_data['details']['status']}, user=self.user_data)
             self.main_window.statusBar().showMessage("Prêt")
             QMessageBox.information(self.main_window, "Succès", f"Le fichier PDF a été enregistré avec succès:\n{filepath}")
         except Exception as e:
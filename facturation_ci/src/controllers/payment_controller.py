@@ -0,0 +1,113 @@
+from PyQt6.QtWidgets import QMessageBox, QDialog, QFileDialog
+from models.invoice import InvoiceModel
+from models.payment import PaymentModel, PAYABLE_STATUSES
+from views.payment_dialog import PaymentDialog
+from views.reconciliation_dialog import ReconciliationDialog
+from core.bank_reconciliation import read_bank_statement, reconcile
+from core.tracing import traced
+from core.workers import start_worker
+import os
+
+class PaymentController:
+    """Saisie des paiements et import des relevés bancaires, depuis la vue des factures."""
+
+    def __init__(self, db_manager, main_window, invoice_view, on_payments_recorded):
+        self.db_manager = db_manager
+        self.main_window = main_window
+        self.view = invoice_view
+        # Appelé après chaque enregistrement (rechargement de la liste des factures)
+        self.on_payments_recorded = on_payments_recorded
+
+        self.model = PaymentModel(self.db_manager)
+        self.invoice_model = InvoiceModel(self.db_manager)
+
+        self.connect_signals()
+
+    def connect_signals(self):
+        self.view.payment_button.clicked.connect(self.record_payment)
+        self.view.reconcile_button.clicked.connect(self.import_bank_statement)
+
+    @traced(slot=True)
+    def record_payment(self):
+        """Enregistre un paiement sur la facture sélectionnée."""
+        invoice_id = self.view.get_selected_invoice_id()
+        if invoice_id is None:
+            QMessageBox.warning(self.main_window, "Aucune Sélection", "Veuillez sélectionner une facture.")
+            return
+
+        invoice_data = self.invoice_model.get_by_id(invoice_id)
+        if not invoice_data:
+            QMessageBox.critical(self.main_window, "Erreur", "Facture non trouvée.")
+            return
+
+        details = invoice_data['details']
+        if details['status'] not in PAYABLE_STATUSES:
+            QMessageBox.warning(self.main_window, "Action Impossible",
+                                f"Cette facture ne peut pas recevoir de paiement (statut: {details['status']}).")
+            return
+
+        dialog = PaymentDialog(details, self.model.get_by_invoice(invoice_id), parent=self.main_window)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            payment_id, error = self.model.create(dialog.get_data())
+            if error:
+                QMessageBox.critical(self.main_window, "Erreur", f"Impossible d'enregistrer le paiement : {error}")
+            else:
+                QMessageBox.information(self.main_window, "Succès", f"Paiement enregistré sur la facture #{invoice_id}.")
+                self.on_payments_recorded()
+
+    @traced(slot=True)
+    def import_bank_statement(self):
+        """Rapproche un relevé bancaire CSV des factures ouvertes, puis enregistre les paiements."""
+        filepath, _ = QFileDialog.getOpenFileName(
+            self.main_window,
+            "Importer un relevé bancaire",
+            os.path.join(os.path.expanduser("~"), "Documents"),
+            "Relevés CSV (*.csv *.txt)"
+        )
+        if not filepath:
+            return
+
+        # Lecture du relevé, chargement des factures ouvertes et rapprochement en tâche de fond
+        self.view.reconcile_button.setEnabled(False)
+        self.main_window.statusBar().showMessage("Rapprochement du relevé bancaire en cours...")
+        start_worker(
+            self._prepare_reconciliation, filepath,
+            on_result=self._show_reconciliation,
+            on_error=lambda message: self._end_import(f"Impossible de lire le relevé :\n{message}")
+        )
+
+    @traced('payments.prepare_reconciliation')
+    def _prepare_reconciliation(self, filepath):
+        lines, errors = read_bank_statement(filepath)
+        payments, unmatched = reconcile(lines, self.model.get_open_invoices())
+        return payments, unmatched, errors
+
+    def _show_reconciliation(self, result):
+        payments, unmatched, errors = result
+        self.main_window.statusBar().showMessage("Prêt")
+        dialog = ReconciliationDialog(payments, unmatched, errors, parent=self.main_window)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            self._end_import()
+            return
+
+        self.main_window.statusBar().showMessage(f"Enregistrement de {len(payments)} paiement(s)...")
+        start_worker(
+            self.model.create_many, payments,
+            on_result=self._on_payments_saved,
+            on_error=lambda message: self._end_import(f"Impossible d'enregistrer les paiements :\n{message}")
+        )
+
+    def _on_payments_saved(self, result):
+        count, error = result
+        if error:
+            self._end_import(f"Aucun paiement n'a été enregistré :\n{error}")
+            return
+        self._end_import()
+        QMessageBox.information(self.main_window, "Succès", f"{count} paiement(s) enregistré(s).")
+        self.on_payments_recorded()
+
+    def _end_import(self, error_message=None):
+        self.view.reconcile_button.setEnabled(True)
+        self.main_window.statusBar().showMessage("Prêt")
+        if error_message:
+            QMessageBox.critical(self.main_window, "Erreur de Rapprochement", error_message)
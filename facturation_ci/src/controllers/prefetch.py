@@ -0,0 +1,25 @@
+from core.workers import start_worker
+from models.client import ClientModel
+from models.product import ProductModel
+from models.invoice import InvoiceModel
+from models.company import CompanyModel
+
+
+def prefetch_after_login(db_manager):
+    """
+    Remplit les caches des modèles en tâche de fond juste après l'authentification :
+    clients, produits, première page des factures, statistiques du tableau de bord et informations
+    de l'entreprise sont chargés en parallèle, chacun sur une connexion du pool. La première visite de chaque onglet
+    lit alors le cache ; si elle arrive avant la fin d'un chargement, elle l'attend
+    au lieu de relancer la requête.
+    :return: La liste des Workers lancés.
+    """
+    invoice_model = InvoiceModel(db_manager)
+    loaders = (
+        ClientModel(db_manager).get_all,
+        ProductModel(db_manager).get_all,
+        invoice_model.search,
+        invoice_model.get_dashboard_stats,
+        CompanyModel(db_manager).get,
+    )
+    return [start_worker(loader) for loader in loaders]
@@ -1,8 +1,10 @@
-from PyQt6.QtWidgets import QMessageBox, QDialog, QDoubleValidator
-from PyQt6.QtGui import QValidator
-from models.product_model import ProductModel
+from PyQt6.QtWidgets import QMessageBox, QDialog
+from PyQt6.QtGui import QDoubleValidator
+from models.product import ProductModel
 from views.product_view import ProductView
 from views.crud_dialog import CrudDialog
+from core.tracing import traced
+from core.async_loader import AsyncLoader
 
 class ProductController:
     def __init__(self, db_manager, main_window):
@@ -11,6 +13,8 @@ class ProductController:
 
         self.model = ProductModel(self.db_manager)
         self.view = ProductView()
+        # Chargement de la liste en tâche de fond
+        self.loader = AsyncLoader(self.model.get_all, parent=self.view)
 
         # Remplacer le widget placeholder dans la MainWindow
         # L'index 3 correspond à "Produits"
@@ -33,10 +37,14 @@ class ProductController:
         self.view.new_button.clicked.connect(self.open_new_product_dialog)
         self.view.edit_button.clicked.connect(self.open_edit_product_dialog)
         self.view.delete_button.clicked.connect(self.delete_product)
+        self.loader.loaded.connect(self.view.set_products)
+        self.loader.loading_changed.connect(self.view.set_loading)
+        self.loader.failed.connect(
+            lambda message: self.main_window.statusBar().showMessage(f"Erreur de chargement des produits : {message}"))
 
+    @traced()
     def load_products(self):
-        products = self.model.get_all()
-        self.view.set_products(products)
+        self.loader.load()
 
     def _get_configured_dialog(self, mode, data=None):
         """Helper to create and configure the CrudDialog."""
@@ -54,6 +62,7 @@ class ProductController:
                 dialog.widgets[field['name']].setValidator(field['validator'])
         return dialog
 
+    @traced(slot=True)
     def open_new_product_dialog(self):
         dialog = self._get_configured_dialog(mode='new')
         if dialog.exec() == QDialog.DialogCode.Accepted:
@@ -65,6 +74,7 @@ class ProductController:
                 QMessageBox.information(self.main_window, "Succès", "Produit créé avec succès.")
                 self.load_products()
 
+    @traced(slot=True)
     def open_edit_product_dialog(self):
         product_id = self.view.get_selected_product_id()
         if product_id is None:
@@ -86,6 +96,7 @@ class ProductController:
                 QMessageBox.information(self.main_window, "Succès", "Produit mis à jour avec succès.")
                 self.load_products()
 
+    @traced(slot=True)
     def delete_product(self):
         product_id = self.view.get_selected_product_id()
         if product_id is None:
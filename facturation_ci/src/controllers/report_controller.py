@@ -0,0 +1,87 @@
+from PyQt6.QtWidgets import QMessageBox, QFileDialog
+from models.report import ReportModel
+from views.reports_view import ReportsView
+from core.async_loader import AsyncLoader
+from core.tracing import traced
+import os
+
+class ReportController:
+    def __init__(self, db_manager, main_window):
+        self.db_manager = db_manager
+        self.main_window = main_window
+
+        self.model = ReportModel(self.db_manager)
+        self.view = ReportsView()
+        self.reports = {}
+
+        # Remplacer le widget placeholder dans la MainWindow (index 4, "Rapports")
+        report_widget_index = 4
+        old_widget = self.main_window.stacked_widget.widget(report_widget_index)
+        self.main_window.stacked_widget.removeWidget(old_widget)
+        self.main_window.stacked_widget.insertWidget(report_widget_index, self.view)
+
+        # Calcul des rapports en tâche de fond
+        self.aged_loader = AsyncLoader(self.model.get_aged_receivables, parent=self.view)
+        self.vat_loader = AsyncLoader(self.model.get_vat_report, parent=self.view)
+
+        self.connect_signals()
+        self.load_aged_receivables()
+
+    def connect_signals(self):
+        aged_tab = self.view.aged_tab
+        aged_tab.refresh_button.clicked.connect(self.load_aged_receivables)
+        aged_tab.export_button.clicked.connect(lambda: self.export_report('aged_receivables', "balance_agee"))
+        self.aged_loader.loaded.connect(lambda report: self.show_report('aged_receivables', aged_tab, report))
+        self.aged_loader.loading_changed.connect(aged_tab.set_loading)
+
+        vat_tab = self.view.vat_tab
+        vat_tab.refresh_button.clicked.connect(self.load_vat_report)
+        vat_tab.export_button.clicked.connect(lambda: self.export_report('vat', "recapitulatif_tva"))
+        self.vat_loader.loaded.connect(lambda report: self.show_report('vat', vat_tab, report))
+        self.vat_loader.loading_changed.connect(vat_tab.set_loading)
+
+        for loader in (self.aged_loader, self.vat_loader):
+            loader.failed.connect(
+                lambda message: self.main_window.statusBar().showMessage(f"Erreur de calcul du rapport : {message}"))
+
+    @traced(slot=True)
+    def load_aged_receivables(self):
+        self.aged_loader.load(self.view.aged_date_edit.date().toPyDate())
+
+    @traced(slot=True)
+    def load_vat_report(self):
+        start = self.view.vat_start_edit.date().toPyDate()
+        end = self.view.vat_end_edit.date().toPyDate()
+        if start > end:
+            QMessageBox.warning(self.main_window, "Période invalide", "La date de début doit précéder la date de fin.")
+            return
+        self.vat_loader.load(start, end, self.view.vat_by_client_check.isChecked())
+
+    def show_report(self, name, tab, report):
+        if report is None:
+            QMessageBox.critical(self.main_window, "Erreur", "Impossible de calculer le rapport.")
+            return
+        self.reports[name] = report
+        tab.set_report(report)
+
+    @traced()
+    def export_report(self, name, default_name):
+        """Exporte en CSV le dernier résultat affiché du rapport `name`."""
+        report = self.reports.get(name)
+        if report is None:
+            return
+
+        filepath, _ = QFileDialog.getSaveFileName(
+            self.main_window,
+            "Exporter le rapport",
+            os.path.join(os.path.expanduser("~"), "Documents", f"{default_name}.csv"),
+            "Fichiers CSV (*.csv)"
+        )
+        if not filepath:
+            return
+
+        try:
+            report.export_csv(filepath)
+            QMessageBox.information(self.main_window, "Succès", f"Rapport exporté :\n{filepath}")
+        except OSError as e:
+            QMessageBox.critical(self.main_window, "Erreur d'Export", f"Impossible d'écrire le fichier :\n{e}")
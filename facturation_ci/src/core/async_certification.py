@@ -0,0 +1,102 @@
+import asyncio
+
+from core.async_fne_client import AsyncFNEClient
+from core.audit import audit_log
+from core.certification import (
+    CertificationError, UNSAVED_CERTIFICATION_MESSAGE, fne_claim_timeout, unsaved_certification,
+)
+from core.fne_client import FNEClientError
+from models.async_client import AsyncClientModel
+from models.async_invoice import AsyncInvoiceModel
+from models.company import COMPANY_QUERY
+from models.user import USER_BY_USERNAME_QUERY
+
+class AsyncCertificationService:
+    """
+    Équivalent asyncio de CertificationService pour les lots : les factures sont
+    certifiées concurremment sur un seul thread, l'attente de l'API FNE de l'une
+    recouvrant les requêtes SQL et l'attente des autres.
+    À utiliser comme gestionnaire de contexte asynchrone (ferme le client HTTP).
+    """
+
+    def __init__(self, async_db, company_data, api_key, base_url=None, timeout=None, max_connections=20):
+        self.db = async_db
+        self.invoice_model = AsyncInvoiceModel(async_db)
+        self.client_model = AsyncClientModel(async_db)
+        self.company_data = company_data
+        self.api_key = api_key
+        self.claim_timeout = fne_claim_timeout(timeout)
+        self.fne_client = AsyncFNEClient(api_key, base_url=base_url, timeout=timeout, max_connections=max_connections)
+
+    @classmethod
+    async def from_config(cls, async_db, config, max_connections=20):
+        """Service de l'entité du pool `async_db` (voir CertificationService.from_config)."""
+        settings = config.tenant(async_db.tenant)
+        company = await async_db.fetch_one(COMPANY_QUERY) or {}
+        return cls(async_db, company, settings.api_key or company.get('fne_api_key'),
+                   base_url=settings.base_url, timeout=config.fne.timeout, max_connections=max_connections)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.fne_client.aclose()
+
+    async def get_operator(self, username):
+        return await self.db.fetch_one(USER_BY_USERNAME_QUERY, (username,))
+
+    async def certify(self, invoice_id, user_data):
+        """
+        Voir CertificationService.certify.
+        :raises CertificationError: Si la facture n'est pas certifiable.
+        :raises FNEClientError: Si l'API refuse ou n'est pas joignable (l'échec est enregistré).
+        """
+        invoice_data = await self.invoice_model.get_by_id(invoice_id)
+        if not invoice_data:
+            raise CertificationError(f"Facture #{invoice_id} non trouvée.")
+
+        status = invoice_data['details']['status']
+        if status != 'draft':
+            raise CertificationError(f"Cette facture ne peut pas être certifiée (statut: {status}).")
+
+        version = await self.invoice_model.claim_for_certification(invoice_id, invoice_data['details']['version'],
+                                                                   self.claim_timeout)
+        if version is None:
+            raise CertificationError(f"Facture #{invoice_id} déjà en cours de certification ou modifiée entre-temps.")
+
+        client_info = await self.client_model.get_by_id(invoice_data['details']['client_id'])
+
+        try:
+            fne_response = await self.fne_client.certify_document(invoice_data, self.company_data,
+                                                                  client_info or {}, user_data)
+        except FNEClientError as e:
+            await self.invoice_model.update_fne_data(invoice_id, version, 'failed', error_message=str(e))
+            audit_log.record(self.db, 'certify_failed', 'invoice', invoice_id, {'error': str(e)}, user=user_data)
+            raise
+
+        if not await self.invoice_model.update_fne_data(invoice_id, version, 'success',
+                                                        nim=fne_response['nim'], qr_code=fne_response['qr_code']):
+            saved = await self.invoice_model.mark_needs_reconciliation(
+                invoice_id, fne_response['nim'], fne_response['qr_code'], UNSAVED_CERTIFICATION_MESSAGE)
+            raise unsaved_certification(self.db, invoice_id, fne_response, user_data, saved)
+        # Le tampon d'audit est écrit par le DBManager synchrone de la même entité
+        audit_log.record(self.db, 'certify', 'invoice', invoice_id, {'nim': fne_response['nim']}, user=user_data)
+        return fne_response
+
+
+async def run_bounded(items, task, concurrency):
+    """
+    Exécute `task(item)` pour chaque élément, `concurrency` à la fois au plus, et rend
+    les résultats dans l'ordre de fin : tuples (élément, résultat, exception ou None).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def guarded(item):
+        async with semaphore:
+            try:
+                return item, await task(item), None
+            except Exception as e:
+                return item, None, e
+
+    for future in asyncio.as_completed([guarded(item) for item in items]):
+        yield await future
@@ -0,0 +1,107 @@
+"""
+Accès asyncio à la base, pour les traitements par lots sans interface (voir cli.py --async).
+
+Les attentes réseau (MySQL, API FNE) de nombreuses factures se recouvrent sur un seul
+thread, là où le mode par threads immobilise un thread et une connexion par facture.
+Dépendance facultative : `pip install aiomysql`.
+"""
+import time
+from contextlib import asynccontextmanager
+
+try:
+    import aiomysql
+except ImportError:  # Dépendance facultative : seul le mode asynchrone en a besoin
+    aiomysql = None
+
+from core.config import DEFAULT_TENANT
+from core.query_stats import query_stats
+from core.tracing import tracer, span
+
+
+class AsyncDBManager:
+    """
+    Pool de connexions aiomysql d'une entité. Les requêtes passent par `fetch_all`,
+    `fetch_one` et `transaction`, qui les chronomètrent dans query_stats comme les
+    curseurs instrumentés du DBManager.
+    """
+
+    def __init__(self, host, database, user, password, port=3306, pool_size=10, connect_timeout=None,
+                 tenant=DEFAULT_TENANT):
+        if aiomysql is None:
+            raise RuntimeError("Le mode asynchrone nécessite le paquet aiomysql (pip install aiomysql).")
+        self.tenant = tenant
+        self.pool_size = pool_size
+        self._connect_args = dict(host=host, port=port, db=database, user=user, password=password)
+        if connect_timeout:
+            self._connect_args['connect_timeout'] = connect_timeout
+        self._pool = None
+
+    @classmethod
+    def from_config(cls, config, password=None, pool_size=None, tenant=None):
+        """Pool de l'entité `tenant` (voir Config.tenant et DBManager.from_config)."""
+        settings = config.tenant(tenant)
+        return cls(settings.host, settings.database, settings.user,
+                   password if settings.password is None else settings.password,
+                   port=settings.port, pool_size=pool_size or settings.pool_size,
+                   connect_timeout=settings.connect_timeout, tenant=settings.name)
+
+    async def open(self):
+        """Ouvre le pool. :return: self, ou None si la base est injoignable."""
+        if self._pool is None:
+            try:
+                self._pool = await aiomysql.create_pool(minsize=1, maxsize=self.pool_size, autocommit=False,
+                                                        **self._connect_args)
+            except (aiomysql.Error, OSError) as e:
+                print(f"Erreur de connexion à la base de données (asynchrone) : {e}")
+                return None
+        return self
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+
+    async def execute(self, cursor, query, params=()):
+        """Exécute `query` sur `cursor` en la chronométrant (query_stats, traceur)."""
+        start = time.perf_counter()
+        try:
+            if tracer.enabled:
+                with span('sql', statement=query.strip()[:200], mode='async'):
+                    await cursor.execute(query, params)
+            else:
+                await cursor.execute(query, params)
+        finally:
+            if query_stats.enabled:
+                query_stats.record(query, (time.perf_counter() - start) * 1000)
+        return cursor
+
+    async def fetch_all(self, query, params=()):
+        """Lignes (dictionnaires) d'une requête de lecture. :raises aiomysql.Error: À gérer par le modèle."""
+        async with self._pool.acquire() as connection:
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                await self.execute(cursor, query, params)
+                rows = await cursor.fetchall()
+            # Pas de transaction ouverte rendue au pool (autocommit désactivé)
+            await connection.rollback()
+        return list(rows)
+
+    async def fetch_one(self, query, params=()):
+        rows = await self.fetch_all(query, params)
+        return rows[0] if rows else None
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Curseur (dictionnaires) dans une transaction : validée en sortie de bloc,
+        annulée si le bloc lève une exception.
+        """
+        async with self._pool.acquire() as connection:
+            await connection.begin()
+            try:
+                async with connection.cursor(aiomysql.DictCursor) as cursor:
+                    yield cursor
+                await connection.commit()
+            except BaseException:
+                await connection.rollback()
+                raise
@@ -0,0 +1,68 @@
+"""
+Client asynchrone de l'API FNE, pour les traitements par lots (voir cli.py certify --async).
+
+Même requête et même interprétation des réponses que core.fne_client (build_request,
+parse_response) ; seul le transport change : un httpx.AsyncClient dont les connexions
+sont réutilisées, et dont le nombre d'appels simultanés est borné.
+Dépendance facultative : `pip install httpx`.
+"""
+try:
+    import httpx
+except ImportError:  # Dépendance facultative : seul le mode asynchrone en a besoin
+    httpx = None
+
+from core.fne_client import build_request, parse_response, FNEClientError, FNE_API_TIMEOUT
+from core.tracing import span
+
+
+class AsyncFNEClient:
+    """
+    Client de signature d'une entité (clé d'API et URL propres).
+    À utiliser comme gestionnaire de contexte asynchrone : `async with AsyncFNEClient(...) as client`.
+    """
+
+    def __init__(self, api_key, base_url=None, timeout=None, max_connections=20):
+        if httpx is None:
+            raise RuntimeError("Le client FNE asynchrone nécessite le paquet httpx (pip install httpx).")
+        self.api_key = api_key
+        self.base_url = base_url
+        self._client = httpx.AsyncClient(
+            timeout=timeout or FNE_API_TIMEOUT,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def certify_document(self, invoice_full_data, company_info, client_info, user_info):
+        """
+        Équivalent asynchrone de core.fne_client.certify_document.
+        :return: Dictionnaire avec les données de certification FNE ('nim' et 'qr_code').
+        :raises FNEClientError: En cas d'échec de la communication ou d'erreur de l'API.
+        """
+        endpoint, headers, body = build_request(invoice_full_data, company_info, client_info, user_info,
+                                                self.api_key, self.base_url)
+        with span('fne.certify_document', mode='async'):
+            try:
+                response = await self._client.post(endpoint, headers=headers, content=body)
+            except httpx.HTTPError as e:
+                raise FNEClientError(f"Erreur de communication avec l'API FNE: {e}")
+
+        if response.is_error:
+            try:
+                error_details = response.json().get('message', response.text)
+            except ValueError:
+                error_details = "Détail de l'erreur non disponible."
+            raise FNEClientError(f"Erreur API FNE ({response.status_code}): {error_details}", response.status_code)
+
+        try:
+            response_data = response.json()
+        except ValueError as e:
+            raise FNEClientError(f"Réponse invalide de l'API FNE: {e}", response.status_code)
+        return parse_response(response_data, response.status_code)
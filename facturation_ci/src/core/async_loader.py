@@ -0,0 +1,66 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.workers import start_worker, cancel_worker
+
+
+class AsyncLoader(QObject):
+    """
+    Exécute un chargement (appel de modèle) en tâche de fond pour un contrôleur.
+
+    Chaque appel à `load` rend le précédent obsolète : s'il n'a pas encore démarré il est
+    retiré du pool, sinon son résultat est ignoré à l'arrivée. Seul le dernier chargement
+    émet `loaded` ou `failed` ; `loading_changed` permet à la vue d'afficher l'attente.
+    """
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    loading_changed = pyqtSignal(bool)
+
+    def __init__(self, fn, parent=None):
+        super().__init__(parent)
+        self.fn = fn
+        self._generation = 0
+        self._worker = None
+
+    @property
+    def is_loading(self):
+        return self._worker is not None
+
+    def load(self, *args, **kwargs):
+        """Lance `fn(*args, **kwargs)` en abandonnant le chargement en cours."""
+        if self._worker is not None:
+            cancel_worker(self._worker)
+        else:
+            self.loading_changed.emit(True)
+
+        self._generation += 1
+        generation = self._generation
+        self._worker = start_worker(
+            self.fn, *args,
+            on_result=lambda result: self._on_result(generation, result),
+            on_error=lambda message: self._on_error(generation, message),
+            **kwargs
+        )
+
+    def cancel(self):
+        """Abandonne le chargement en cours (son résultat éventuel sera ignoré)."""
+        if self._worker is None:
+            return
+        cancel_worker(self._worker)
+        self._generation += 1
+        self._worker = None
+        self.loading_changed.emit(False)
+
+    def _is_current(self, generation):
+        if generation != self._generation:
+            return False
+        self._worker = None
+        self.loading_changed.emit(False)
+        return True
+
+    def _on_result(self, generation, result):
+        if self._is_current(generation):
+            self.loaded.emit(result)
+
+    def _on_error(self, generation, message):
+        if self._is_current(generation):
+            self.failed.emit(message)
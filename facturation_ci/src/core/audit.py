@@ -0,0 +1,184 @@
+"""
+Journal d'audit : qui a créé, certifié, imprimé, encaissé ou archivé une facture
+(table `audit_log`, migration 009, en ajout seul).
+
+Enregistrer un événement ne touche pas la base : il est placé dans un tampon mémoire,
+vidé par un thread de fond toutes les `flush_interval` secondes, ou dès que le tampon
+atteint `buffer_size` événements, en une insertion multi-lignes par entité.
+Le tampon doit être vidé avant la fermeture des connexions (voir `close`).
+"""
+import datetime
+import json
+import threading
+
+from mysql.connector import Error, InterfaceError, OperationalError
+
+AUDIT_INSERT_QUERY = (
+    "INSERT INTO audit_log (occurred_at, user_id, username, source, action, entity, entity_id, details) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+)
+
+# Longueur des colonnes texte (migration 009) : une valeur plus longue ferait échouer tout le lot
+USERNAME_MAX_LENGTH = 100
+SOURCE_MAX_LENGTH = 20
+NAME_MAX_LENGTH = 50
+
+# Au-delà, les événements non écrits (base injoignable) les plus anciens sont abandonnés
+MAX_PENDING_EVENTS = 100000
+
+
+class AuditLog:
+    """Tampon des événements d'audit de toutes les entités du processus (instance partagée `audit_log`)."""
+
+    def __init__(self, flush_interval=2.0, buffer_size=200):
+        self.enabled = True
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        # Origine des événements ('app' ou 'cli') et utilisateur par défaut (celui de la session)
+        self.source = 'app'
+        self.actor = None
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._closed = False
+
+    def set_actor(self, user):
+        """Utilisateur auquel sont attribués les événements sans `user` explicite (dict avec id, username)."""
+        self.actor = user
+
+    def record(self, db, action, entity, entity_id=None, details=None, user=None):
+        """
+        Ajoute un événement au tampon (sans accès à la base).
+        :param db: Gestionnaire de l'entité concernée (DBManager ou AsyncDBManager).
+        :param details: dict facultatif, enregistré en JSON.
+        :param user: Auteur de l'action (par défaut, l'utilisateur de la session).
+        """
+        if not self.enabled:
+            return
+        user = user or self.actor or {}
+        username = user.get('username')
+        row = (
+            datetime.datetime.now(), user.get('id'), str(username)[:USERNAME_MAX_LENGTH] if username else None,
+            self.source[:SOURCE_MAX_LENGTH], action[:NAME_MAX_LENGTH], entity[:NAME_MAX_LENGTH], entity_id,
+            json.dumps(details, ensure_ascii=False, default=str) if details else None,
+        )
+        with self._lock:
+            self._buffer.append((db.tenant, row))
+            full = len(self._buffer) >= self.buffer_size
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="audit-flush", daemon=True)
+                self._thread.start()
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if not self._closed:
+                self.flush()
+
+    def flush(self):
+        """
+        Écrit les événements en attente (un INSERT multi-lignes par entité et par tranche
+        de `buffer_size`). Ceux d'une entité injoignable sont remis dans le tampon ; une
+        tranche refusée par la base est réécrite ligne à ligne et ses lignes invalides écartées.
+        :return: Nombre d'événements écrits.
+        """
+        # Import différé : core.db_manager importe la configuration et le pool MySQL
+        from core.db_manager import DBManager
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._buffer = self._buffer, []
+            if not pending:
+                return 0
+
+            by_tenant = {}
+            for tenant, row in pending:
+                by_tenant.setdefault(tenant, []).append(row)
+
+            written, failed = 0, []
+            for tenant, rows in by_tenant.items():
+                db_manager = DBManager.for_tenant(tenant)
+                # Gestionnaire fermé (connexion principale à None) : ne pas le rouvrir pour le journal
+                unsent = rows if db_manager is None or db_manager.connection is None else self._write(db_manager, rows)
+                written += len(rows) - len(unsent)
+                failed.extend((tenant, row) for row in unsent)
+
+            if failed:
+                with self._lock:
+                    self._buffer[:0] = failed
+                    dropped = len(self._buffer) - MAX_PENDING_EVENTS
+                    if dropped > 0:
+                        del self._buffer[:dropped]
+                        print(f"Journal d'audit : {dropped} événement(s) abandonné(s), base injoignable.")
+            return written
+
+    def _write(self, db_manager, rows):
+        """
+        Écrit `rows`, une transaction par tranche de `buffer_size`.
+        :return: Lignes à réessayer (connexion perdue ou base injoignable).
+        """
+        connection = db_manager.get_connection()
+        if not connection:
+            return rows
+
+        cursor = connection.cursor()
+        start = 0
+        try:
+            for start in range(0, len(rows), self.buffer_size):
+                chunk = rows[start:start + self.buffer_size]
+                try:
+                    # executemany regroupe les lignes d'un INSERT ... VALUES en une seule instruction
+                    cursor.executemany(AUDIT_INSERT_QUERY, chunk)
+                except (InterfaceError, OperationalError):
+                    raise
+                except Error as e:
+                    connection.rollback()
+                    print(f"Journal d'audit : lot de {len(chunk)} événement(s) refusé ({e}), écriture ligne à ligne.")
+                    self._write_rows(cursor, chunk)
+                connection.commit()
+            return []
+        except Error as e:
+            print(f"Erreur lors de l'écriture du journal d'audit: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass  # Connexion perdue : la transaction est déjà annulée par le serveur
+            return rows[start:]
+        finally:
+            cursor.close()
+            # Le thread d'écriture emprunte une connexion au pool (sans effet sur le thread principal)
+            if threading.current_thread() is not threading.main_thread():
+                db_manager.release_connection()
+
+    @staticmethod
+    def _write_rows(cursor, rows):
+        """Insère `rows` une à une ; une ligne refusée (donnée invalide) est écartée et signalée."""
+        for row in rows:
+            try:
+                cursor.execute(AUDIT_INSERT_QUERY, row)
+            except (InterfaceError, OperationalError):
+                raise
+            except Error as e:
+                print(f"Journal d'audit : événement écarté ({e}) : {row}")
+
+    def close(self):
+        """Arrête le thread d'écriture et vide le tampon (à appeler avant de fermer les connexions)."""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._wake.set()
+            thread.join()
+        written = self.flush()
+        with self._lock:
+            if self._buffer:
+                print(f"Journal d'audit : {len(self._buffer)} événement(s) non écrit(s) à la fermeture.")
+        return written
+
+
+audit_log = AuditLog()
@@ -0,0 +1,199 @@
+import csv
+import datetime
+import re
+from decimal import Decimal, InvalidOperation
+
+# Noms de colonnes reconnus dans les relevés (comparés en minuscules, sans accents courants)
+COLUMN_ALIASES = {
+    'date': ('date', 'date operation', 'date valeur', 'date comptable'),
+    'amount': ('montant', 'credit', 'amount'),
+    'label': ('libelle', 'reference', 'description', 'label', 'motif'),
+}
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%d/%m/%y')
+
+# Références recherchées dans les libellés : NIM FNE ou numéro de facture ("FACTURE #123", "FAC 123")
+NIM_PATTERN = re.compile(r'[A-Z0-9][A-Z0-9-]{5,}')
+INVOICE_NUMBER_PATTERN = re.compile(r'\bFACT?(?:URE)?\s*(?:N[°O]?|#)?\s*(\d+)\b')
+
+DEFAULT_PAYMENT_METHOD = 'Virement'
+CENT = Decimal('0.01')
+
+
+class StatementError(Exception):
+    """Relevé bancaire illisible (colonnes manquantes, format inconnu)."""
+    pass
+
+
+def _normalize_header(name):
+    name = (name or '').strip().lower()
+    for accented, plain in (('é', 'e'), ('è', 'e'), ('ê', 'e'), ('ô', 'o')):
+        name = name.replace(accented, plain)
+    return name.replace("'", ' ').replace('_', ' ')
+
+
+def parse_amount(text):
+    """Convertit un montant de relevé ("1 234,50", "1,234.50", "1234.5 XOF") en Decimal."""
+    cleaned = re.sub(r'[^\d,.\-]', '', text or '')
+    if ',' in cleaned and '.' in cleaned:
+        # Le dernier séparateur est le séparateur décimal
+        thousands = ',' if cleaned.rfind('.') > cleaned.rfind(',') else '.'
+        cleaned = cleaned.replace(thousands, '')
+    cleaned = cleaned.replace(',', '.')
+    try:
+        return Decimal(cleaned).quantize(CENT)
+    except InvalidOperation:
+        raise ValueError(f"Montant illisible : {text!r}")
+
+
+def parse_date(text):
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text.strip(), date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Date illisible : {text!r}")
+
+
+def read_bank_statement(path):
+    """
+    Lit un relevé bancaire CSV (séparateur ; , ou tabulation détecté automatiquement).
+    Seuls les crédits (montants positifs) sont retenus.
+    :return: Tuple (lignes, erreurs). Chaque ligne est un dict
+             {line_number, date, amount, label} ; chaque erreur une chaîne.
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=';,\t')
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.DictReader(f, dialect=dialect)
+
+        columns = {}
+        for field in reader.fieldnames or ():
+            normalized = _normalize_header(field)
+            for key, aliases in COLUMN_ALIASES.items():
+                if key not in columns and normalized in aliases:
+                    columns[key] = field
+        missing = [key for key in COLUMN_ALIASES if key not in columns]
+        if missing:
+            raise StatementError(f"Colonnes introuvables dans le relevé : {', '.join(missing)} "
+                                 f"(colonnes lues : {', '.join(reader.fieldnames or ())})")
+
+        lines, errors = [], []
+        for row in reader:
+            try:
+                amount = parse_amount(row[columns['amount']])
+                if amount <= 0:
+                    continue
+                lines.append({
+                    'line_number': reader.line_num,
+                    'date': parse_date(row[columns['date']]),
+                    'amount': amount,
+                    'label': (row[columns['label']] or '').strip(),
+                })
+            except (ValueError, AttributeError) as e:
+                errors.append(f"Ligne {reader.line_num} : {e}")
+    return lines, errors
+
+
+class ReconciliationIndex:
+    """
+    Index en mémoire des factures à encaisser, construit en une seule requête :
+    par référence (NIM FNE, numéro de facture) et par solde restant dû.
+    Les soldes sont décrémentés au fil des rapprochements, pour qu'une même facture
+    ne soit pas soldée deux fois par un relevé.
+    """
+
+    def __init__(self, open_invoices):
+        self.invoices = {}
+        self.by_nim = {}
+        self.by_balance = {}
+        for invoice in open_invoices:
+            invoice = dict(invoice, balance_due=Decimal(invoice['balance_due']).quantize(CENT))
+            self.invoices[invoice['id']] = invoice
+            if invoice.get('fne_nim'):
+                self.by_nim[invoice['fne_nim'].upper()] = invoice['id']
+            self.by_balance.setdefault(invoice['balance_due'], set()).add(invoice['id'])
+
+    def find_by_reference(self, label):
+        """IDs des factures ouvertes citées dans le libellé."""
+        label = label.upper()
+        found = []
+        for token in NIM_PATTERN.findall(label):
+            invoice_id = self.by_nim.get(token)
+            if invoice_id is not None and invoice_id not in found:
+                found.append(invoice_id)
+        for number in INVOICE_NUMBER_PATTERN.findall(label):
+            invoice_id = int(number)
+            if invoice_id in self.invoices and invoice_id not in found:
+                found.append(invoice_id)
+        return found
+
+    def find_by_amount(self, amount):
+        """IDs des factures ouvertes dont le solde est exactement `amount`."""
+        return self.by_balance.get(amount, set())
+
+    def consume(self, invoice_id, amount):
+        """Impute `amount` sur le solde de la facture."""
+        invoice = self.invoices[invoice_id]
+        ids = self.by_balance.get(invoice['balance_due'])
+        if ids is not None:
+            ids.discard(invoice_id)
+            if not ids:
+                del self.by_balance[invoice['balance_due']]
+        invoice['balance_due'] -= amount
+        if invoice['balance_due'] > 0:
+            self.by_balance.setdefault(invoice['balance_due'], set()).add(invoice_id)
+
+
+def reconcile(lines, open_invoices, payment_method=DEFAULT_PAYMENT_METHOD):
+    """
+    Rapproche les crédits d'un relevé des factures ouvertes.
+
+    1. Par référence : le libellé cite un NIM ou un numéro de facture ; le crédit ne doit
+       pas dépasser le solde (un paiement partiel est accepté).
+    2. Par montant, pour les lignes restantes : le crédit égale le solde d'une seule facture.
+    Les lignes ambiguës ou sans correspondance sont rendues pour un traitement manuel.
+
+    :return: Tuple (paiements, non_rapprochées). Les paiements sont au format de
+             PaymentModel.create_many, complétés de `line_number`, `match` et `client_name`.
+             Chaque ligne non rapprochée reçoit une clé `reason`.
+    """
+    index = ReconciliationIndex(open_invoices)
+    payments, remaining, unmatched = [], [], []
+
+    def match(line, invoice_id, method):
+        index.consume(invoice_id, line['amount'])
+        invoice = index.invoices[invoice_id]
+        payments.append({
+            'invoice_id': invoice_id,
+            'payment_date': line['date'],
+            'amount': line['amount'],
+            'payment_method': payment_method,
+            'reference': line['label'][:100] or None,
+            'line_number': line['line_number'],
+            'match': method,
+            'client_name': invoice.get('client_name'),
+        })
+
+    # Passe 1 : références explicites (prioritaires sur les montants)
+    for line in lines:
+        candidates = [i for i in index.find_by_reference(line['label'])
+                      if index.invoices[i]['balance_due'] >= line['amount']]
+        if len(candidates) == 1:
+            match(line, candidates[0], 'référence')
+        else:
+            remaining.append(line)
+
+    # Passe 2 : montant exact du solde
+    for line in remaining:
+        candidates = index.find_by_amount(line['amount'])
+        if len(candidates) == 1:
+            match(line, next(iter(candidates)), 'montant')
+        else:
+            reason = "plusieurs factures possibles" if candidates else "aucune facture correspondante"
+            unmatched.append(dict(line, reason=reason))
+
+    return payments, unmatched
@@ -0,0 +1,78 @@
+import threading
+import time
+
+# Durée de vie par défaut des entrées (secondes), voir le réglage [cache] ttl.
+DEFAULT_CACHE_TTL = 120
+
+
+class TTLCache:
+    """
+    Cache mémoire thread-safe à durée de vie limitée, utilisé par les modèles.
+    `get_or_load` ne lance qu'un seul chargement par clé : un thread qui demande
+    une clé en cours de chargement (ex: pendant le préchargement) attend son résultat
+    au lieu de relancer la requête.
+    """
+
+    def __init__(self, ttl=DEFAULT_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._loading = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+        return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key=None):
+        """Supprime une entrée, ou toutes si `key` est None."""
+        with self._lock:
+            # Un chargement démarré avant l'invalidation ne doit pas remplir le cache
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_or_load(self, key, loader):
+        """
+        Retourne la valeur en cache, ou l'obtient via `loader()` et la met en cache.
+        Un résultat vide (None, [], {}) n'est pas mis en cache : c'est aussi ce que
+        retournent les modèles en cas d'erreur.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry[0] > time.monotonic():
+                    return entry[1]
+                pending = self._loading.get(key)
+                if pending is None:
+                    pending = self._loading[key] = threading.Event()
+                    generation = self._generation
+                    break
+            # Un autre thread charge déjà cette clé : attendre puis relire le cache
+            pending.wait()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry[0] > time.monotonic():
+                    return entry[1]
+            # Le chargement concurrent a échoué : on le refait nous-mêmes
+
+        try:
+            value = loader()
+            if value:
+                with self._lock:
+                    if generation == self._generation:
+                        self._entries[key] = (time.monotonic() + self.ttl, value)
+            return value
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            pending.set()
@@ -0,0 +1,139 @@
+import threading
+
+import requests
+
+from core.audit import audit_log
+from core.fne_client import certify_document, FNEClientError, FNE_API_TIMEOUT
+from core.tracing import traced
+from models.invoice import InvoiceModel, FNE_CLAIM_TIMEOUT_SECONDS
+from models.client import ClientModel
+from models.company import CompanyModel
+
+class CertificationError(Exception):
+    """La facture ne peut pas être soumise à la FNE (introuvable, déjà certifiée...)."""
+    pass
+
+class CertificationNotSavedError(CertificationError):
+    """
+    La FNE a certifié la facture mais son NIM n'a pas pu être enregistré comme tel :
+    la facture est à rapprocher (`needs_reconciliation`) et ne doit pas être soumise à nouveau.
+    """
+
+    def __init__(self, invoice_id, fne_response):
+        self.invoice_id = invoice_id
+        self.fne_response = fne_response
+        super().__init__(f"Facture #{invoice_id} certifiée par la FNE (NIM {fne_response['nim']}), "
+                         f"mais le résultat n'a pas pu être enregistré : facture à rapprocher.")
+
+
+UNSAVED_CERTIFICATION_MESSAGE = "Certifiée par la FNE, NIM non enregistré (version périmée ou erreur BDD)."
+
+# Durée maximale d'un appel à l'API, en multiples de [fne] timeout : requests et httpx appliquent
+# ce délai séparément à chaque étape (attente du pool, connexion, envoi, lecture), plus une marge
+FNE_CLAIM_TIMEOUT_FACTOR = 5
+
+
+def fne_claim_timeout(api_timeout=None):
+    """
+    Âge (secondes) au-delà duquel une réservation 'processing' peut être reprise : assez long
+    pour qu'un appel à l'API FNE encore en cours ait abouti ou expiré (jamais deux soumissions).
+    :param api_timeout: Délai des appels à l'API ([fne] timeout, par défaut FNE_API_TIMEOUT).
+    """
+    return max(FNE_CLAIM_TIMEOUT_SECONDS, FNE_CLAIM_TIMEOUT_FACTOR * (api_timeout or FNE_API_TIMEOUT))
+
+
+
+def unsaved_certification(db_manager, invoice_id, fne_response, user_data, saved):
+    """
+    Trace une certification FNE dont le résultat n'a pas été enregistré (journal d'audit,
+    dont le tampon réessaie l'écriture, et sortie standard), puis rend l'exception à lever.
+    :param saved: True si l'état 'needs_reconciliation' a pu être enregistré sur la facture.
+    """
+    print(f"ATTENTION : facture {invoice_id} certifiée par la FNE (NIM {fne_response['nim']}) sans que le "
+          f"résultat soit enregistré ({'à rapprocher' if saved else 'état non enregistré'}).")
+    audit_log.record(db_manager, 'certify_unsaved', 'invoice', invoice_id,
+                     {'nim': fne_response['nim'], 'qr_code': fne_response.get('qr_code'), 'marked': saved},
+                     user=user_data)
+    return CertificationNotSavedError(invoice_id, fne_response)
+
+class CertificationService:
+    """
+    Certification FNE d'une facture : envoi à l'API puis enregistrement du résultat
+    (NIM et QR code, ou message d'erreur). Partagé par l'interface et la ligne de commande.
+    Un service par entité : chaque thread qui l'utilise garde sa propre session HTTP,
+    dont les connexions à l'API sont réutilisées d'une facture à l'autre.
+    """
+
+    def __init__(self, db_manager, company_data, api_key, base_url=None, timeout=None):
+        self.db_manager = db_manager
+        self.invoice_model = InvoiceModel(db_manager)
+        self.client_model = ClientModel(db_manager)
+        self.company_data = company_data
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.claim_timeout = fne_claim_timeout(timeout)
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, db_manager, config):
+        """Service de l'entité du `db_manager` : clé et URL de sa section (ou de [fne]), société de son `company_info`."""
+        settings = config.tenant(db_manager.tenant)
+        company_model = CompanyModel(db_manager)
+        return cls(db_manager, company_model.get(), company_model.get_api_key(settings.api_key),
+                   base_url=settings.base_url, timeout=config.fne.timeout)
+
+    @property
+    def session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    @traced()
+    def certify(self, invoice_id, user_data):
+        """
+        Certifie la facture `invoice_id` (brouillon) au nom de l'opérateur `user_data`.
+        :return: Dictionnaire FNE ('nim', 'qr_code').
+        :raises CertificationError: Si la facture n'est pas certifiable.
+        :raises CertificationNotSavedError: Si la FNE a certifié la facture mais que le résultat n'a
+                                            pas pu être enregistré (facture à rapprocher, jamais resoumise).
+        :raises FNEClientError: Si l'API refuse ou n'est pas joignable (l'échec est enregistré).
+        """
+        invoice_data = self.invoice_model.get_by_id(invoice_id)
+        if not invoice_data:
+            raise CertificationError(f"Facture #{invoice_id} non trouvée.")
+
+        status = invoice_data['details']['status']
+        if status != 'draft':
+            raise CertificationError(f"Cette facture ne peut pas être certifiée (statut: {status}).")
+
+        # Réservation avant l'appel à l'API : un autre poste ou un lot parallèle
+        # ne peut plus soumettre cette facture tant que le résultat n'est pas enregistré
+        version = self.invoice_model.claim_for_certification(invoice_id, invoice_data['details']['version'],
+                                                             self.claim_timeout)
+        if version is None:
+            raise CertificationError(f"Facture #{invoice_id} déjà en cours de certification ou modifiée entre-temps.")
+
+        client_info = self.client_model.get_by_id(invoice_data['details']['client_id'])
+
+        try:
+            fne_response = certify_document(invoice_data, self.company_data, client_info or {}, user_data,
+                                            self.api_key, base_url=self.base_url, timeout=self.timeout,
+                                            session=self.session)
+        except FNEClientError as e:
+            # On trace l'échec dans la BDD avant de le remonter (la facture pourra être resoumise)
+            self.invoice_model.update_fne_data(invoice_id, version, 'failed', error_message=str(e))
+            audit_log.record(self.db_manager, 'certify_failed', 'invoice', invoice_id, {'error': str(e)},
+                             user=user_data)
+            raise
+
+        # La FNE a signé : la facture ne doit plus jamais redevenir réservable
+        if not self.invoice_model.update_fne_data(invoice_id, version, 'success',
+                                                  nim=fne_response['nim'], qr_code=fne_response['qr_code']):
+            saved = self.invoice_model.mark_needs_reconciliation(
+                invoice_id, fne_response['nim'], fne_response['qr_code'], UNSAVED_CERTIFICATION_MESSAGE)
+            raise unsaved_certification(self.db_manager, invoice_id, fne_response, user_data, saved)
+        audit_log.record(self.db_manager, 'certify', 'invoice', invoice_id, {'nim': fne_response['nim']},
+                         user=user_data)
+        return fne_response
@@ -1,16 +1,45 @@
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
 import sys
+import threading
+import time
+
+from core.cache import TTLCache, DEFAULT_CACHE_TTL
+from core.config import DEFAULT_TENANT
+from core.query_stats import InstrumentedConnection, query_stats
+
+# Délai avant une nouvelle tentative de connexion à une réplique injoignable (secondes)
+REPLICA_RETRY_SECONDS = 30
 
 class DBManager:
-    _instance = None
+    """
+    Gestionnaire de connexions d'une entité (société) : une instance unique par entité,
+    avec sa connexion principale, son pool, ses curseurs préparés et ses caches.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __new__(cls, *args, tenant=DEFAULT_TENANT, **kwargs):
+        with cls._instances_lock:
+            instance = cls._instances.get(tenant)
+            if instance is None:
+                instance = cls._instances[tenant] = super(DBManager, cls).__new__(cls)
+        return instance
 
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super(DBManager, cls).__new__(cls)
-        return cls._instance
+    @classmethod
+    def instances(cls):
+        """Retourne les gestionnaires existants (un par entité)."""
+        return [instance for instance in list(cls._instances.values()) if hasattr(instance, '_local')]
 
-    def __init__(self, host=None, database=None, user=None, password=None):
+    @classmethod
+    def for_tenant(cls, tenant):
+        """Gestionnaire existant de l'entité `tenant`, ou None s'il n'a pas été créé."""
+        instance = cls._instances.get(tenant)
+        return instance if hasattr(instance, '_local') else None
+
+    def __init__(self, host=None, database=None, user=None, password=None, pool_size=5,
+                 port=3306, connect_timeout=None, cache_ttl=DEFAULT_CACHE_TTL, tenant=DEFAULT_TENANT,
+                 replica=None, read_your_writes=0):
         # The __init__ will be called every time, but we only connect once.
         if not hasattr(self, 'connection') or self.connection is None:
             if not all([host, database, user, password]):
@@ -18,25 +47,60 @@ class DBManager:
                 self.connection = None
                 return
 
+            self.tenant = tenant
             self.host = host
             self.database = database
             self.user = user
             self.password = password
+            self.port = port
+            self.connect_timeout = connect_timeout
             self.connection = None
+            # Curseurs préparés réutilisables, indexés par connexion puis par texte SQL
+            # (complétés et vidés par les threads de fond : tout accès passe par le verrou)
+            self._prepared_cursors = {}
+            self._prepared_lock = threading.Lock()
+            # Pool de connexions pour les threads de fond (le thread principal garde la sienne)
+            self.pool_size = pool_size
+            self._pool = None
+            self._pool_lock = threading.Lock()
+            self._local = threading.local()
+            # Caches des modèles, partagés par toutes leurs instances sur cette base
+            self.cache_ttl = cache_ttl
+            self._caches = {}
+            # Réplique en lecture (voir get_read_connection) : paramètres, gestionnaire créé à la
+            # première lecture, et fenêtre read-your-writes après la dernière écriture
+            self.replica_args = replica
+            self._replica = None
+            self._replica_retry_at = 0
+            self.read_your_writes = read_your_writes
+            self._last_write_at = None
             self.connect()
 
+    @classmethod
+    def from_config(cls, config, password=None, pool_size=None, tenant=None):
+        """
+        Crée (ou retrouve) le gestionnaire d'une entité à partir de la configuration
+        (voir Config.tenant). `password` sert si l'entité n'a pas le sien.
+        """
+        settings = config.tenant(tenant)
+        return cls(settings.host, settings.database, settings.user,
+                   password if settings.password is None else settings.password,
+                   pool_size=pool_size or settings.pool_size, port=settings.port,
+                   connect_timeout=settings.connect_timeout, cache_ttl=config.cache.ttl,
+                   tenant=settings.name, replica=settings.replica, read_your_writes=settings.read_your_writes)
+
     def connect(self):
         """Établit la connexion à la base de données."""
         if self.connection and self.connection.is_connected():
             return
 
+        if self.connection is not None:
+            # Les instructions préparées ne survivent pas à la connexion qui les a créées ;
+            # celles des connexions du pool restent valides
+            self._drop_prepared_cursors(self.connection)
         try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                database=self.database,
-                user=self.user,
-                password=self.password
-            )
+            # Connexion instrumentée : chaque requête est chronométrée (voir core.query_stats)
+            self.connection = InstrumentedConnection(mysql.connector.connect(**self._connect_args()), query_stats)
             print("Connexion à la base de données réussie.")
         except Error as e:
             print(f"Erreur de connexion à la base de données : {e}")
@@ -45,19 +109,253 @@ class DBManager:
             # On pourrait vouloir quitter l'application si la BDD est indisponible au démarrage.
             # sys.exit(1)
 
+    def _connect_args(self):
+        """Paramètres communs à la connexion principale, au pool et aux connexions dédiées."""
+        args = dict(host=self.host, port=self.port, database=self.database, user=self.user, password=self.password)
+        if self.connect_timeout:
+            args['connection_timeout'] = self.connect_timeout
+        return args
+
+    def init_pool(self):
+        """
+        Crée le pool de connexions des threads de fond. Toutes les connexions sont
+        ouvertes dès la création : appelée en tâche de fond pendant la connexion
+        de l'utilisateur, elle évite ce coût au premier chargement.
+        """
+        with self._pool_lock:
+            if self._pool is not None:
+                return self._pool
+            try:
+                self._pool = pooling.MySQLConnectionPool(
+                    pool_name=f"facturation_{self.tenant}_{id(self)}"[:64],
+                    pool_size=self.pool_size,
+                    # Conserver la session permet de réutiliser les instructions préparées
+                    pool_reset_session=False,
+                    **self._connect_args()
+                )
+                print(f"Pool de {self.pool_size} connexions initialisé.")
+            except Error as e:
+                print(f"Erreur lors de la création du pool de connexions : {e}")
+            return self._pool
+
     def get_connection(self):
-        """Retourne l'objet de connexion. Tente de se reconnecter si nécessaire."""
+        """
+        Retourne l'objet de connexion. Tente de se reconnecter si nécessaire.
+        Le thread principal utilise la connexion principale ; chaque thread de fond
+        emprunte sa propre connexion au pool, jusqu'à `release_connection()`.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return self._get_thread_connection()
+
         if not self.connection or not self.connection.is_connected():
             print("Connexion perdue. Tentative de reconnexion...")
             self.connect()
         return self.connection
 
+    def _get_thread_connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and connection.is_connected():
+            return connection
+
+        pool = self.init_pool()
+        try:
+            if pool is None:
+                raise pooling.PoolError("Pool indisponible")
+            raw = pool.get_connection()
+            self._local.standalone = False
+        except Error:
+            # Pool épuisé ou indisponible : connexion dédiée, fermée à la libération
+            try:
+                raw = mysql.connector.connect(**self._connect_args())
+            except Error as e:
+                print(f"Erreur de connexion à la base de données (thread de fond) : {e}")
+                return None
+            self._local.standalone = True
+
+        self._local.connection = InstrumentedConnection(raw, query_stats)
+        return self._local.connection
+
+    def get_read_connection(self):
+        """
+        Connexion pour les lectures lourdes (liste des factures, tableau de bord, rapports) :
+        celle de la réplique si elle est configurée, sinon `get_connection()`.
+        Les lectures retombent sur la base principale si la réplique est injoignable (nouvel
+        essai après REPLICA_RETRY_SECONDS) et, pendant `read_your_writes` secondes après
+        `mark_write()`, pour qu'un utilisateur voie aussitôt ce qu'il vient d'enregistrer.
+        """
+        if not self.replica_args or self._recent_write() or time.monotonic() < self._replica_retry_at:
+            return self.get_connection()
+
+        replica = self._get_replica()
+        connection = replica.get_connection() if replica else None
+        if connection is None:
+            self._replica_retry_at = time.monotonic() + REPLICA_RETRY_SECONDS
+            print(f"Réplique injoignable : lectures sur la base principale pendant {REPLICA_RETRY_SECONDS} s.")
+            return self.get_connection()
+        return connection
+
+    def _get_replica(self):
+        """Gestionnaire de la réplique (même entité, suffixe '@replica'), créé au premier appel."""
+        with self._pool_lock:
+            if self._replica is None:
+                args = {key: value for key, value in self.replica_args.items() if value is not None}
+                connect_args = dict(self._connect_args(), **args)
+                self._replica = DBManager(
+                    connect_args['host'], connect_args['database'], connect_args['user'], connect_args['password'],
+                    pool_size=self.pool_size, port=connect_args['port'], connect_timeout=self.connect_timeout,
+                    cache_ttl=self.cache_ttl, tenant=f"{self.tenant}@replica"
+                )
+            return self._replica
+
+    def mark_write(self):
+        """Signale une écriture validée : les lectures suivantes iront à la principale pendant `read_your_writes` s."""
+        self._last_write_at = time.monotonic()
+
+    def _recent_write(self):
+        return (self._last_write_at is not None
+                and time.monotonic() - self._last_write_at < self.read_your_writes)
+
+    def release_connection(self):
+        """
+        Rend au pool la connexion empruntée par le thread courant (sans effet sur le thread principal).
+        Les curseurs préparés d'une connexion du pool sont conservés tant qu'elle vit : la tâche
+        qui l'empruntera ensuite les réutilise. Ceux d'une connexion dédiée sont libérés avec elle.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            return
+        self._local.connection = None
+        try:
+            # pool_reset_session=False : sans rollback, la transaction implicite ouverte par
+            # les lectures (et son instantané REPEATABLE READ) suivrait la connexion dans le pool
+            connection.rollback()
+        except Error as e:
+            print(f"Erreur lors de l'annulation de la transaction avant libération : {e}")
+        try:
+            if getattr(self._local, 'standalone', False):
+                self._drop_prepared_cursors(connection)
+            connection.close()
+        except Error as e:
+            print(f"Erreur lors de la libération de la connexion : {e}")
+
+    @staticmethod
+    def _connection_key(connection):
+        """Identifie la connexion MySQL réelle, sous les enveloppes instrumentée et de pool."""
+        raw = getattr(connection, 'raw', connection)
+        return id(getattr(raw, '_cnx', None) or raw)
+
+    def cache(self, name, ttl=None):
+        """
+        Retourne le cache mémoire `name` associé à cette base (créé au premier appel).
+        :param ttl: Durée de vie des entrées à la création (par défaut `cache_ttl`).
+        """
+        cache = self._caches.get(name)
+        if cache is None:
+            cache = self._caches.setdefault(name, TTLCache(ttl or self.cache_ttl))
+        return cache
+
+    def get_prepared_cursor(self, query, dictionary=False):
+        """
+        Retourne un curseur préparé (`cursor(prepared=True)`) pour `query`.
+        Le curseur est mis en cache par connexion et par texte SQL : l'instruction
+        n'est analysée par le serveur qu'une seule fois, les appels suivants
+        n'envoient que les paramètres. Pour une connexion du pool, le cache dure autant
+        que la connexion elle-même (voir `release_connection`).
+        :param query: Le texte SQL avec des marqueurs %s.
+        :param dictionary: True pour obtenir les lignes sous forme de dictionnaires.
+        :return: Le curseur préparé, ou None si aucune connexion n'est disponible.
+        """
+        connection = self.get_connection()
+        if not connection:
+            return None
+
+        key = (query, dictionary)
+        with self._prepared_lock:
+            cache = self._prepared_cursors.setdefault(self._connection_key(connection), {})
+            cursor = cache.get(key)
+        if cursor is None:
+            # Création hors verrou : la connexion n'appartient qu'au thread courant
+            cursor = connection.cursor(prepared=True, dictionary=dictionary)
+            with self._prepared_lock:
+                cache[key] = cursor
+        return cursor
+
+    def fetch_prepared(self, query, params=(), one=False):
+        """
+        Exécute une requête de lecture via un curseur préparé et retourne les lignes
+        sous forme de dictionnaires (toutes, ou seulement la première si `one`).
+        Le résultat est toujours entièrement consommé pour libérer la connexion.
+        :raises Error: En cas d'erreur MySQL (à gérer par le modèle appelant).
+        """
+        cursor = self.get_prepared_cursor(query, dictionary=True)
+        if cursor is None:
+            return None if one else []
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        if one:
+            return rows[0] if rows else None
+        return rows
+
+    def execute_prepared(self, query, params=()):
+        """
+        Exécute une instruction d'écriture via un curseur préparé, sans commit
+        (la transaction reste sous le contrôle du modèle appelant).
+        :return: Le curseur, pour lire `lastrowid` ou `rowcount`.
+        :raises Error: En cas d'erreur MySQL (à gérer par le modèle appelant).
+        """
+        cursor = self.get_prepared_cursor(query)
+        if cursor is None:
+            return None
+        cursor.execute(query, params)
+        return cursor
+
+    def _drop_prepared_cursors(self, connection):
+        """Libère les instructions préparées d'une connexion qui va être fermée ou remplacée."""
+        with self._prepared_lock:
+            cache = self._prepared_cursors.pop(self._connection_key(connection), {})
+        self._close_cursors(cache.values())
+
+    def _close_prepared_cursors(self):
+        """Libère les instructions préparées côté serveur (toutes connexions, y compris celles du pool)."""
+        with self._prepared_lock:
+            caches, self._prepared_cursors = list(self._prepared_cursors.values()), {}
+        for cache in caches:
+            self._close_cursors(cache.values())
+
+    @staticmethod
+    def _close_cursors(cursors):
+        for cursor in cursors:
+            try:
+                cursor.close()
+            except Error:
+                pass
+
     def close(self):
-        """Ferme la connexion à la base de données."""
+        """Ferme la connexion à la base de données et les connexions du pool (et de la réplique)."""
+        if getattr(self, '_replica', None) is not None:
+            self._replica.close()
+            self._replica = None
+        if getattr(self, '_prepared_lock', None) is not None:
+            self._close_prepared_cursors()
         if self.connection and self.connection.is_connected():
             self.connection.close()
             self.connection = None
             print("Connexion à la base de données fermée.")
+        if getattr(self, '_pool', None) is None:
+            return
+        with self._pool_lock:
+            if self._pool is not None:
+                try:
+                    self._pool._remove_connections()
+                except Error:
+                    pass
+                self._pool = None
+
+
+def release_thread_connections():
+    """Rend au pool les connexions empruntées par le thread courant (à appeler en fin de tâche de fond)."""
+    for db_manager in DBManager.instances():
+        db_manager.release_connection()
 
 # Exemple d'utilisation (Singleton)
 # from db_manager import DBManager
@@ -1,8 +1,11 @@
 import requests
 import json
 
-# L'URL de base de l'API FNE. À mettre dans un fichier de configuration dans une app réelle.
+from core.tracing import traced
+
+# Valeurs par défaut des réglages [fne] base_url et timeout (voir core/config.py)
 FNE_API_BASE_URL = "http://54.247.95.108/ws/external"
+FNE_API_TIMEOUT = 20
 
 class FNEClientError(Exception):
     """Exception personnalisée pour les erreurs du client FNE."""
@@ -10,17 +13,12 @@ class FNEClientError(Exception):
         super().__init__(message)
         self.status_code = status_code
 
-def certify_document(invoice_full_data: dict, company_info: dict, client_info: dict, user_info: dict, api_key: str):
+def build_request(invoice_full_data: dict, company_info: dict, client_info: dict, user_info: dict, api_key: str,
+                  base_url: str = None):
     """
-    Appelle l'API FNE pour certifier un document de vente ou d'achat.
-
-    :param invoice_full_data: Dictionnaire contenant les détails de la facture et les lignes d'articles ('details' et 'items').
-    :param company_info: Dictionnaire avec les informations de l'entreprise (tax_id).
-    :param client_info: Dictionnaire avec les informations du client.
-    :param user_info: Dictionnaire avec les informations de l'opérateur.
-    :param api_key: La clé d'API de l'entreprise pour l'authentification.
-    :return: Dictionnaire avec les données de certification FNE ('nim' et 'qrCode').
-    :raises FNEClientError: En cas d'échec de la communication ou d'erreur de l'API.
+    Prépare l'appel de signature (partagé par ce client et core.async_fne_client).
+    :return: Tuple (URL, en-têtes, corps JSON).
+    :raises FNEClientError: Si le type de document n'est pas signable.
     """
     invoice_details = invoice_full_data['details']
     doc_type = invoice_details['document_type'] # 'sale', 'purchase'
@@ -28,7 +26,7 @@ def certify_document(invoice_full_data: dict, company_info: dict, client_info: d
     if doc_type not in ["sale", "purchase"]:
         raise FNEClientError(f"Le type de document '{doc_type}' n'est pas supporté pour la signature.")
 
-    endpoint = f"{FNE_API_BASE_URL}/invoices/sign"
+    endpoint = f"{base_url or FNE_API_BASE_URL}/invoices/sign"
 
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -59,23 +57,50 @@ def certify_document(invoice_full_data: dict, company_info: dict, client_info: d
         },
         # ... autres champs requis par la DGI (ex: `payment`, `invoice`)
     }
+    return endpoint, headers, json.dumps(payload)
 
-    try:
-        response = requests.post(endpoint, headers=headers, data=json.dumps(payload), timeout=20)
-        response.raise_for_status()
 
-        response_data = response.json()
+def parse_response(response_data: dict, status_code: int):
+    """
+    Extrait le NIM et le QR code d'une réponse 2xx de l'API.
+    :raises FNEClientError: Si la réponse n'a pas la forme attendue.
+    """
+    if response_data.get("status") == "success" and "data" in response_data:
+        fne_data = response_data["data"]
+        if "nim" in fne_data and "qrCode" in fne_data:
+            return {
+                "nim": fne_data["nim"],
+                "qr_code": fne_data["qrCode"]
+            }
+
+    error_msg = response_data.get('message', json.dumps(response_data))
+    raise FNEClientError(f"Réponse invalide de l'API FNE: {error_msg}", status_code)
+
 
-        if response_data.get("status") == "success" and "data" in response_data:
-            fne_data = response_data["data"]
-            if "nim" in fne_data and "qrCode" in fne_data:
-                return {
-                    "nim": fne_data["nim"],
-                    "qr_code": fne_data["qrCode"]
-                }
+@traced('fne.certify_document')
+def certify_document(invoice_full_data: dict, company_info: dict, client_info: dict, user_info: dict, api_key: str,
+                     base_url: str = None, timeout: float = None, session=None):
+    """
+    Appelle l'API FNE pour certifier un document de vente ou d'achat.
 
-        error_msg = response_data.get('message', json.dumps(response_data))
-        raise FNEClientError(f"Réponse invalide de l'API FNE: {error_msg}", response.status_code)
+    :param invoice_full_data: Dictionnaire contenant les détails de la facture et les lignes d'articles ('details' et 'items').
+    :param company_info: Dictionnaire avec les informations de l'entreprise (tax_id).
+    :param client_info: Dictionnaire avec les informations du client.
+    :param user_info: Dictionnaire avec les informations de l'opérateur.
+    :param api_key: La clé d'API de l'entreprise pour l'authentification.
+    :param base_url: URL de base de l'API (par défaut FNE_API_BASE_URL, ex: simulateur local).
+    :param timeout: Délai maximal de l'appel en secondes (par défaut FNE_API_TIMEOUT).
+    :param session: requests.Session réutilisant ses connexions HTTP (par défaut, une connexion par appel).
+    :return: Dictionnaire avec les données de certification FNE ('nim' et 'qrCode').
+    :raises FNEClientError: En cas d'échec de la communication ou d'erreur de l'API.
+    """
+    endpoint, headers, body = build_request(invoice_full_data, company_info, client_info, user_info, api_key, base_url)
+
+    try:
+        response = (session or requests).post(endpoint, headers=headers, data=body,
+                                              timeout=timeout or FNE_API_TIMEOUT)
+        response.raise_for_status()
+        return parse_response(response.json(), response.status_code)
 
     except requests.exceptions.HTTPError as e:
         error_details = "Détail de l'erreur non disponible."
@@ -87,5 +112,7 @@ def certify_document(invoice_full_data: dict, company_info: dict, client_info: d
 
     except requests.exceptions.RequestException as e:
         raise FNEClientError(f"Erreur de communication avec l'API FNE: {e}")
+    except FNEClientError:
+        raise
     except Exception as e:
         raise FNEClientError(f"Erreur inattendue lors de la certification: {e}")
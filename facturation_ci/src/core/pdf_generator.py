@@ -8,6 +8,10 @@ from reportlab.graphics.barcode import qr
 from reportlab.graphics.shapes import Drawing
 from reportlab.graphics.renderPDF import drawToFile
 
+from core.tracing import traced
+from models.invoice_totals import invoice_totals, line_totals
+
+@traced('pdf.generate_invoice_pdf')
 def generate_invoice_pdf(filepath, invoice_data, client_data, company_data):
     """
     Génère un fichier PDF pour une facture.
@@ -87,13 +91,8 @@ def generate_invoice_pdf(filepath, invoice_data, client_data, company_data):
     table_header = ['Description', 'Qté', 'Prix U. HT', 'Total HT']
     table_data = [table_header]
 
-    subtotal = 0
-    total_vat = 0
-
     for item in invoice_data['items']:
-        total_ht = item['quantity'] * item['unit_price']
-        subtotal += total_ht
-        total_vat += total_ht * (item['tax_rate'] / 100.0)
+        _, total_ht, _ = line_totals(item)
 
         row = [
             Paragraph(item['description'], styles['Normal']),
@@ -117,17 +116,16 @@ def generate_invoice_pdf(filepath, invoice_data, client_data, company_data):
     story.append(items_table)
     story.append(Spacer(1, 0.5*cm))
 
-    # --- Totals ---
-    grand_total = subtotal + total_vat
-    totals_data = [
-        ['Total HT:', f"{subtotal:.2f} €"],
-        ['Montant TVA:', f"{total_vat:.2f} €"],
-        ['Total TTC:', f"{grand_total:.2f} €"],
-    ]
+    # --- Totals (enregistrés avec la facture, ventilés par taux de TVA) ---
+    totals = invoice_totals(invoice_data)
+    totals_data = [['Total HT:', f"{totals.subtotal:.2f} €"]]
+    for row in totals.vat_rows():
+        totals_data.append([f"TVA {row['tax_rate'].normalize():f} %:", f"{row['vat']:.2f} €"])
+    totals_data.append(['Total TTC:', f"{totals.total:.2f} €"])
     totals_table = Table(totals_data, colWidths=[3*cm, 3*cm])
     totals_table.setStyle(TableStyle([
         ('ALIGN', (0,0), (-1,-1), 'RIGHT'),
-        ('FONTNAME', (0,2), (1,2), 'Helvetica-Bold'), # Bold for the grand total
+        ('FONTNAME', (0,-1), (1,-1), 'Helvetica-Bold'), # Bold for the grand total
     ]))
 
     # Wrap the totals table in another table to align it to the right
@@ -0,0 +1,192 @@
+import threading
+import time
+
+from core.tracing import tracer
+
+# Bornes supérieures (en ms) des classes de l'histogramme de latence.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+# Seuil du journal des requêtes lentes, voir le réglage [diagnostics] slow_query_ms.
+DEFAULT_SLOW_QUERY_MS = 200
+
+
+def normalize_sql(query):
+    """Ramène un texte SQL sur une seule ligne pour servir de clé de regroupement."""
+    if isinstance(query, (bytes, bytearray)):
+        query = query.decode('utf-8', errors='replace')
+    return " ".join(str(query).split())
+
+
+class StatementStats:
+    """Statistiques cumulées pour une instruction SQL (clé = texte normalisé)."""
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.calls = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * len(LATENCY_BUCKETS_MS)
+
+    def add(self, elapsed_ms):
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.histogram[index] += 1
+                break
+
+    def percentile(self, fraction):
+        """Estimation d'un percentile à partir de l'histogramme (borne supérieure de la classe)."""
+        if not self.calls:
+            return 0.0
+        threshold = fraction * self.calls
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            seen += count
+            if seen >= threshold:
+                bound = LATENCY_BUCKETS_MS[index]
+                return self.max_ms if bound == float('inf') else min(bound, self.max_ms)
+        return self.max_ms
+
+
+class QueryStats:
+    """
+    Collecteur des temps d'exécution SQL : nombre d'appels, lignes lues, histogramme
+    de latence par instruction, et journal des requêtes dépassant un seuil.
+    Partagé par tous les modèles via les curseurs instrumentés du DBManager.
+    """
+
+    def __init__(self, slow_query_ms=DEFAULT_SLOW_QUERY_MS):
+        self.enabled = True
+        self.slow_query_ms = slow_query_ms
+        self._statements = {}
+        self._lock = threading.Lock()
+
+    def _get(self, sql):
+        stats = self._statements.get(sql)
+        if stats is None:
+            stats = self._statements[sql] = StatementStats(sql)
+        return stats
+
+    def record(self, query, elapsed_ms):
+        """Enregistre une exécution et signale la requête si elle dépasse le seuil."""
+        sql = normalize_sql(query)
+        with self._lock:
+            self._get(sql).add(elapsed_ms)
+        if self.slow_query_ms is not None and elapsed_ms >= self.slow_query_ms:
+            print(f"[SQL lente] {elapsed_ms:.1f} ms : {sql}")
+        return sql
+
+    def add_rows(self, sql, count):
+        """Ajoute `count` lignes lues à une instruction déjà normalisée."""
+        if not sql or not count:
+            return
+        with self._lock:
+            self._get(sql).rows += count
+
+    def snapshot(self):
+        """Retourne une copie des statistiques, triée par temps total décroissant."""
+        with self._lock:
+            statements = list(self._statements.values())
+        return sorted(statements, key=lambda s: s.total_ms, reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+
+    def summary(self, limit=None):
+        """Construit un résumé texte des statistiques (une ligne par instruction)."""
+        statements = self.snapshot()
+        if limit:
+            statements = statements[:limit]
+        if not statements:
+            return "Aucune requête SQL enregistrée."
+
+        lines = [
+            f"{'Appels':>8} {'Lignes':>9} {'Total ms':>10} {'Moy ms':>8} {'p50':>7} {'p95':>7} {'Max ms':>8}  Requête",
+        ]
+        for s in statements:
+            lines.append(
+                f"{s.calls:>8} {s.rows:>9} {s.total_ms:>10.1f} {s.total_ms / s.calls:>8.2f} "
+                f"{s.percentile(0.5):>7.1f} {s.percentile(0.95):>7.1f} {s.max_ms:>8.1f}  {s.sql[:160]}"
+            )
+        return "\n".join(lines)
+
+
+class InstrumentedCursor:
+    """Enveloppe un curseur MySQL pour chronométrer `execute` et compter les lignes lues."""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._last_sql = None
+
+    def _run(self, method, query, *args, **kwargs):
+        if tracer.enabled:
+            with tracer.span('sql', statement=normalize_sql(query)[:200]):
+                return self._timed(method, query, *args, **kwargs)
+        return self._timed(method, query, *args, **kwargs)
+
+    def _timed(self, method, query, *args, **kwargs):
+        if not self._stats.enabled:
+            return method(query, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(query, *args, **kwargs)
+        finally:
+            self._last_sql = self._stats.record(query, (time.perf_counter() - start) * 1000)
+
+    def execute(self, query, *args, **kwargs):
+        return self._run(self._cursor.execute, query, *args, **kwargs)
+
+    def executemany(self, query, *args, **kwargs):
+        return self._run(self._cursor.executemany, query, *args, **kwargs)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None and self._stats.enabled:
+            self._stats.add_rows(self._last_sql, 1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        if self._stats.enabled:
+            self._stats.add_rows(self._last_sql, len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if self._stats.enabled:
+            self._stats.add_rows(self._last_sql, len(rows))
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Enveloppe une connexion MySQL : tous les curseurs qu'elle crée sont instrumentés."""
+
+    def __init__(self, connection, stats):
+        self._connection = connection
+        self._stats = stats
+
+    @property
+    def raw(self):
+        """La connexion mysql.connector sous-jacente."""
+        return self._connection
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs), self._stats)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+# Instance partagée par toute l'application
+query_stats = QueryStats()
@@ -0,0 +1,111 @@
+import csv
+import datetime
+from decimal import Decimal
+
+# Tranches de la balance âgée : (clé, libellé, jours de retard min, max). Les factures
+# non encore échues (retard négatif) sont comptées dans la première tranche.
+AGING_BUCKETS = (
+    ('bucket_0_30', '0-30 jours', None, 30),
+    ('bucket_31_60', '31-60 jours', 31, 60),
+    ('bucket_61_90', '61-90 jours', 61, 90),
+    ('bucket_90_plus', '+90 jours', 91, None),
+)
+
+
+class Report:
+    """
+    Résultat tabulaire d'un rapport, indépendant de l'affichage.
+    :param columns: Liste de tuples (clé, libellé) dans l'ordre d'affichage.
+    :param rows: Liste de dicts indexés par les clés de colonnes.
+    :param totals: Dict de la ligne de total (facultatif).
+    """
+
+    def __init__(self, title, columns, rows, totals=None, parameters=None):
+        self.title = title
+        self.columns = columns
+        self.rows = rows
+        self.totals = totals
+        self.parameters = parameters or {}
+
+    def format_value(self, value):
+        if isinstance(value, Decimal):
+            return f"{value:.2f}"
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.strftime('%d-%m-%Y')
+        return '' if value is None else str(value)
+
+    def to_table(self):
+        """Lignes formatées pour l'affichage ou l'export (ligne de total comprise)."""
+        table = [[self.format_value(row.get(key)) for key, _ in self.columns] for row in self.rows]
+        if self.totals:
+            table.append([self.format_value(self.totals.get(key)) for key, _ in self.columns])
+        return table
+
+    def export_csv(self, filepath):
+        """Exporte le rapport en CSV (séparateur point-virgule, lisible par Excel en français)."""
+        with open(filepath, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow([label for _, label in self.columns])
+            writer.writerows(self.to_table())
+        return filepath
+
+
+def aging_bucket_sql(days_expression):
+    """Expressions SUM(CASE ...) des tranches de AGING_BUCKETS sur `days_expression`."""
+    expressions = []
+    for key, _, low, high in AGING_BUCKETS:
+        conditions = []
+        if low is not None:
+            conditions.append(f"{days_expression} >= {low}")
+        if high is not None:
+            conditions.append(f"{days_expression} <= {high}")
+        expressions.append(f"SUM(CASE WHEN {' AND '.join(conditions)} THEN balance_due ELSE 0 END) AS {key}")
+    return ",\n                ".join(expressions)
+
+
+def build_aged_receivables_report(rows, as_of):
+    """Met en forme les lignes de ReportModel.get_aged_receivables (une par client)."""
+    columns = [('client_name', 'Client'), ('invoice_count', 'Factures')]
+    columns += [(key, label) for key, label, _, _ in AGING_BUCKETS]
+    columns.append(('total', 'Total dû'))
+
+    totals = {'client_name': 'TOTAL', 'invoice_count': sum(row['invoice_count'] for row in rows)}
+    for key, _ in columns[2:]:
+        totals[key] = sum((row[key] for row in rows), Decimal('0'))
+    return Report(f"Balance âgée au {as_of.strftime('%d-%m-%Y')}", columns, rows, totals, {'as_of': as_of})
+
+
+def split_months(start, end):
+    """
+    Découpe la période [start, end] en mois complets et en plages partielles aux bornes.
+    :return: Tuple (premiers jours des mois complets, liste de plages (début, fin) incluses).
+    """
+    full_months, partial_ranges = [], []
+    month = start.replace(day=1)
+    while month <= end:
+        next_month = (month + datetime.timedelta(days=32)).replace(day=1)
+        month_end = next_month - datetime.timedelta(days=1)
+        range_start, range_end = max(month, start), min(month_end, end)
+        if range_start == month and range_end == month_end:
+            full_months.append(month)
+        else:
+            partial_ranges.append((range_start, range_end))
+        month = next_month
+    return full_months, partial_ranges
+
+
+def build_vat_report(rows, start, end, by_client=False):
+    """Met en forme les lignes de VatRollupModel.get_summary (par mois, [client,] taux)."""
+    columns = [('period_label', 'Période')]
+    if by_client:
+        columns.append(('client_name', 'Client'))
+    columns += [('tax_rate', 'Taux TVA (%)'), ('invoice_count', 'Factures'),
+                ('base_ht', 'Total HT'), ('vat', 'TVA'), ('total_ttc', 'Total TTC')]
+
+    for row in rows:
+        row['period_label'] = row['period'].strftime('%m/%Y')
+    totals = {'period_label': 'TOTAL'}
+    for key in ('base_ht', 'vat', 'total_ttc'):
+        totals[key] = sum((row[key] for row in rows), Decimal('0'))
+    title = f"TVA du {start.strftime('%d-%m-%Y')} au {end.strftime('%d-%m-%Y')}"
+    return Report(title, columns, rows, totals, {'start': start, 'end': end, 'by_client': by_client})
@@ -0,0 +1,67 @@
+import threading
+
+from core.audit import audit_log
+from core.db_manager import DBManager
+
+
+class TenantRegistry:
+    """
+    Entités (sociétés) traitées par un même processus, ex: un lot de certification
+    sur plusieurs sociétés. Chaque entité a son DBManager (connexion, pool, curseurs
+    préparés et caches propres) et son service de certification (clé FNE et session
+    HTTP propres), créés à la première utilisation puis réutilisés : les threads d'un
+    lot passent d'une entité à l'autre sans jamais se reconnecter.
+    """
+
+    def __init__(self, config, password=None, pool_size=None):
+        """
+        :param password: Mot de passe des entités qui n'ont pas le leur dans la configuration.
+        :param pool_size: Taille des pools (par défaut, celle de chaque entité).
+        """
+        self.config = config
+        self.password = password
+        self.pool_size = pool_size
+        self._db_managers = {}
+        self._services = {}
+        self._lock = threading.Lock()
+
+    def names(self):
+        return self.config.tenant_names()
+
+    def db_manager(self, name=None):
+        """Gestionnaire connecté de l'entité `name`, ou None si la connexion échoue."""
+        name = self.config.tenant(name).name
+        with self._lock:
+            db_manager = self._db_managers.get(name)
+            if db_manager is None:
+                db_manager = DBManager.from_config(self.config, self.password, pool_size=self.pool_size, tenant=name)
+                if not db_manager.get_connection():
+                    return None
+                if self.pool_size and self.pool_size > 1:
+                    db_manager.init_pool()
+                self._db_managers[name] = db_manager
+        return db_manager
+
+    def certification_service(self, name=None):
+        """Service de certification FNE de l'entité `name` (None si sa base est injoignable)."""
+        # Import différé : `requests` n'est chargé que par les commandes qui certifient
+        from core.certification import CertificationService
+
+        name = self.config.tenant(name).name
+        service = self._services.get(name)
+        if service is None:
+            db_manager = self.db_manager(name)
+            if db_manager is None:
+                return None
+            with self._lock:
+                service = self._services.setdefault(name, CertificationService.from_config(db_manager, self.config))
+        return service
+
+    def close(self):
+        # Les événements d'audit en attente s'écrivent avant la fermeture des connexions
+        audit_log.flush()
+        with self._lock:
+            for db_manager in self._db_managers.values():
+                db_manager.close()
+            self._db_managers.clear()
+            self._services.clear()
@@ -0,0 +1,150 @@
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Nombre maximal de spans conservés en mémoire (les plus anciens sont écartés).
+MAX_SPANS = 100_000
+
+
+class Span:
+    """Une opération chronométrée, éventuellement rattachée à une opération parente."""
+
+    __slots__ = ('span_id', 'parent_id', 'name', 'start_us', 'end_us', 'thread_id', 'attributes')
+
+    def __init__(self, span_id, parent_id, name, attributes):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.start_us = time.time_ns() // 1000
+        self.end_us = None
+        self.thread_id = threading.get_ident()
+        self.attributes = attributes
+
+    @property
+    def duration_us(self):
+        return (self.end_us or self.start_us) - self.start_us
+
+    def to_dict(self):
+        return {
+            'id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_us': self.start_us,
+            'end_us': self.end_us,
+            'duration_ms': round(self.duration_us / 1000, 3),
+            'thread_id': self.thread_id,
+            'attributes': self.attributes,
+        }
+
+
+class Tracer:
+    """
+    Traçage léger des actions de l'application (contrôleurs, modèles, appels FNE, PDF, SQL).
+    Chaque span connaît son parent grâce au span courant, propre à chaque thread et à chaque
+    tâche asyncio (variable de contexte) ; les spans terminés sont
+    conservés en mémoire et exportables en JSON Lines ou au format Chrome Trace
+    (chrome://tracing, Perfetto). Désactivé, le traceur ne coûte qu'un test booléen.
+    """
+
+    def __init__(self, enabled=False, max_spans=MAX_SPANS):
+        self.enabled = enabled
+        self._spans = deque(maxlen=max_spans)
+        self._ids = itertools.count(1)
+        self._current = contextvars.ContextVar(f'tracer_{id(self)}_span', default=None)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Ouvre un span pour la durée du bloc `with`."""
+        if not self.enabled:
+            yield None
+            return
+
+        parent = self._current.get()
+        current = Span(next(self._ids), parent.span_id if parent else None, name, attributes)
+        token = self._current.set(current)
+        try:
+            yield current
+        except Exception as e:
+            current.attributes['error'] = str(e)
+            raise
+        finally:
+            current.end_us = time.time_ns() // 1000
+            self._current.reset(token)
+            self._spans.append(current)
+
+    def traced(self, name=None, slot=False):
+        """
+        Décorateur : enveloppe chaque appel de la fonction dans un span.
+        Avec `slot=True` (fonction connectée à un signal Qt), les arguments positionnels
+        excédentaires (ex: `checked` émis par `clicked`) sont ignorés, comme le fait PyQt
+        pour une fonction non décorée ; sinon les arguments sont transmis tels quels.
+        """
+        def decorator(func):
+            span_name = name or func.__qualname__
+            code = func.__code__
+            max_args = code.co_argcount if slot and not code.co_flags & inspect.CO_VARARGS else None
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if max_args is not None:
+                    args = args[:max_args]
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def spans(self):
+        """Retourne la liste des spans terminés."""
+        return list(self._spans)
+
+    def clear(self):
+        self._spans.clear()
+
+    def export_jsonl(self, filepath):
+        """Écrit un span par ligne au format JSON."""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            for span in self.spans():
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+        return filepath
+
+    def export_chrome_trace(self, filepath):
+        """Écrit les spans au format Chrome Trace Event (événements complets 'X')."""
+        pid = os.getpid()
+        events = [
+            {
+                'name': span.name,
+                'cat': span.name.split('.')[0],
+                'ph': 'X',
+                'ts': span.start_us,
+                'dur': span.duration_us,
+                'pid': pid,
+                'tid': span.thread_id,
+                'args': dict(span.attributes, span_id=span.span_id, parent_id=span.parent_id),
+            }
+            for span in self.spans()
+        ]
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+        return filepath
+
+    def export(self, filepath):
+        """Exporte selon l'extension : `.jsonl` pour JSON Lines, sinon Chrome Trace."""
+        if filepath.endswith('.jsonl'):
+            return self.export_jsonl(filepath)
+        return self.export_chrome_trace(filepath)
+
+
+# Instance partagée ; activée au lancement si le réglage [diagnostics] trace indique
+# un fichier d'export (voir core.config.apply_runtime_settings).
+tracer = Tracer()
+span = tracer.span
+traced = tracer.traced
@@ -0,0 +1,67 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from core.db_manager import release_thread_connections
+
+# Workers en cours : gardés en vie jusqu'à la livraison de leur signal `finished`
+_active_workers = set()
+
+class WorkerSignals(QObject):
+    """Signaux émis par un Worker ; ils sont délivrés dans le thread de l'interface."""
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+class Worker(QRunnable):
+    """
+    Exécute une fonction dans un thread du QThreadPool global.
+    La connexion BDD éventuellement empruntée par le thread est rendue au pool à la fin.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        # La durée de vie est gérée côté Python (voir _active_workers)
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            print(f"Erreur dans la tâche de fond {getattr(self.fn, '__qualname__', self.fn)}: {e}")
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.result.emit(result)
+        finally:
+            release_thread_connections()
+            self.signals.finished.emit()
+
+def start_worker(fn, *args, on_result=None, on_error=None, on_finished=None, **kwargs):
+    """
+    Lance `fn(*args, **kwargs)` en tâche de fond.
+    Les callbacks sont connectés avant le démarrage, pour ne manquer aucun signal.
+    :return: Le Worker (à conserver tant que ses signaux sont attendus).
+    """
+    worker = Worker(fn, *args, **kwargs)
+    if on_result:
+        worker.signals.result.connect(on_result)
+    if on_error:
+        worker.signals.error.connect(on_error)
+    if on_finished:
+        worker.signals.finished.connect(on_finished)
+    _active_workers.add(worker)
+    worker.signals.finished.connect(lambda: _active_workers.discard(worker))
+    QThreadPool.globalInstance().start(worker)
+    return worker
+
+def cancel_worker(worker):
+    """
+    Retire du QThreadPool un Worker qui n'a pas encore démarré.
+    :return: True si le Worker a été annulé, False s'il est déjà en cours ou terminé.
+    """
+    if QThreadPool.globalInstance().tryTake(worker):
+        _active_workers.discard(worker)
+        return True
+    return False
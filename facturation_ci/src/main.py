@@ -1,28 +1,49 @@
+import time
+_STARTUP_TIME = time.perf_counter()
+
 import sys
 import getpass
 from PyQt6.QtWidgets import QApplication, QMessageBox, QDialog
+from PyQt6.QtCore import QThreadPool
 
 from views.main_window import MainWindow
 from views.login_dialog import LoginDialog
+from core.audit import audit_log
+from core.config import load_config, apply_runtime_settings, ConfigError
 from core.db_manager import DBManager
+from core.query_stats import query_stats
+from core.tracing import tracer
+from core.workers import start_worker
 from controllers.auth_controller import AuthController
+from controllers.prefetch import prefetch_after_login
 from controllers.client_controller import ClientController
 from controllers.product_controller import ProductController
 from controllers.invoice_controller import InvoiceController
 from controllers.dashboard_controller import DashboardController
+from controllers.report_controller import ReportController
 
 def main():
     """Point d'entrée principal de l'application."""
     app = QApplication(sys.argv)
 
+    # --- Configuration (fichier facturation.ini et variables FACTURATION_*, voir core/config.py) ---
+    try:
+        config = load_config()
+        # Entité ouverte par l'interface : [tenants] default (ou l'unique base de [database])
+        tenant = config.tenant()
+    except ConfigError as e:
+        QMessageBox.critical(None, "Erreur de Configuration", f"{e}\nL'application va se fermer.")
+        sys.exit(1)
+    apply_runtime_settings(config)
+    if config.concurrency.max_threads:
+        QThreadPool.globalInstance().setMaxThreadCount(config.concurrency.max_threads)
+    shutdown_wait_ms = config.concurrency.shutdown_wait_ms
+
     # --- Connexion à la base de données ---
-    db_password = getpass.getpass("Veuillez entrer le mot de passe de la base de données: ")
-    db_manager = DBManager(
-        host="localhost",
-        database="facturation_db",
-        user="root", # À remplacer par un utilisateur dédié
-        password=db_password
-    )
+    db_password = tenant.password
+    if db_password is None:
+        db_password = getpass.getpass("Veuillez entrer le mot de passe de la base de données: ")
+    db_manager = DBManager.from_config(config, db_password, tenant=tenant.name)
 
     if not db_manager.get_connection():
         QMessageBox.critical(None, "Erreur de Base de Données",
@@ -31,46 +52,92 @@ def main():
                              "L'application va se fermer.")
         sys.exit(1)
 
+    # --- Préchauffage pendant la saisie des identifiants ---
+    # Ouverture des connexions du pool en tâche de fond, puis construction
+    # (masquée) de la fenêtre principale pour qu'elle soit prête dès l'authentification.
+    prepared = {}
+
+    def prepare_main_window():
+        if 'window' not in prepared:
+            prepared['window'] = MainWindow(None)
+        return prepared['window']
+
+    start_worker(db_manager.init_pool, on_finished=prepare_main_window)
+
     # --- Processus d'authentification ---
+    # bcrypt est volontairement lent : la vérification tourne dans un thread de fond
+    # et le dialogue reste réactif (bouton « Vérification... »).
     auth_controller = AuthController(db_manager)
     login_dialog = LoginDialog()
+    authentication = {}
 
-    user_data = None
-    # Boucle de connexion
-    while True:
-        if login_dialog.exec() == QDialog.DialogCode.Accepted:
-            username, password = login_dialog.get_credentials()
-            user_data = auth_controller.check_credentials(username, password)
-            if user_data:
-                break # Succès, on sort de la boucle
-            else:
-                QMessageBox.warning(login_dialog, "Échec de la connexion",
-                                    "Nom d'utilisateur ou mot de passe incorrect.")
+    def on_credentials_checked(result):
+        if result:
+            authentication['user_data'] = result
+            authentication['time'] = time.perf_counter()
+            # Les données des onglets se chargent pendant l'affichage de la fenêtre
+            prefetch_after_login(db_manager)
+            login_dialog.accept()
         else:
-            # L'utilisateur a annulé la connexion
-            db_manager.close()
-            sys.exit(0) # On quitte proprement
+            login_dialog.show_login_error("Nom d'utilisateur ou mot de passe incorrect.")
+
+    def on_login_requested(username, password):
+        start_worker(
+            auth_controller.check_credentials, username, password,
+            on_result=on_credentials_checked,
+            on_error=lambda message: login_dialog.show_login_error(f"Erreur lors de l'authentification : {message}")
+        )
+
+    login_dialog.login_requested.connect(on_login_requested)
+
+    if login_dialog.exec() != QDialog.DialogCode.Accepted:
+        # L'utilisateur a annulé la connexion
+        QThreadPool.globalInstance().waitForDone(shutdown_wait_ms)
+        audit_log.close()
+        db_manager.close()
+        sys.exit(0) # On quitte proprement
+
+    user_data = authentication['user_data']
+    authenticated_time = authentication['time']
+    # Auteur des événements d'audit de la session (création, impression...)
+    audit_log.set_actor(user_data)
 
     # --- Lancement de l'interface principale ---
-    main_window = MainWindow(user_data)
+    main_window = prepare_main_window()
     # Personnaliser la barre de statut avec le nom de l'utilisateur
-    main_window.statusBar().showMessage(f"Connecté en tant que: {user_data['full_name']} ({user_data['role']})")
+    main_window.set_user(user_data)
 
-    # --- Initialisation des contrôleurs des modules ---
-    dashboard_controller = DashboardController(db_manager, main_window)
-    client_controller = ClientController(db_manager, main_window)
-    product_controller = ProductController(db_manager, main_window)
-    invoice_controller = InvoiceController(db_manager, main_window, user_data)
-    # Les autres contrôleurs (rapports, paramètres) seraient initialisés ici
+    # --- Enregistrement des modules (créés et chargés à la première visite) ---
+    main_window.register_module(0, lambda: DashboardController(db_manager, main_window))
+    main_window.register_module(1, lambda: InvoiceController(db_manager, main_window, user_data, config))
+    main_window.register_module(2, lambda: ClientController(db_manager, main_window))
+    main_window.register_module(3, lambda: ProductController(db_manager, main_window))
+    main_window.register_module(4, lambda: ReportController(db_manager, main_window))
+    # Le contrôleur des paramètres serait enregistré ici
 
+    main_window.first_painted.connect(lambda: print(
+        f"Premier affichage de la fenêtre principale : "
+        f"{(time.perf_counter() - authenticated_time) * 1000:.0f} ms après l'authentification "
+        f"({(time.perf_counter() - _STARTUP_TIME) * 1000:.0f} ms depuis le lancement)."
+    ))
     main_window.show()
 
     # --- Démarrage de la boucle d'événements ---
     exit_code = app.exec()
 
     # --- Nettoyage avant de quitter ---
+    # Les tâches de fond terminées, le journal d'audit est vidé avant la fermeture des connexions
+    QThreadPool.globalInstance().waitForDone(shutdown_wait_ms)
+    audit_log.close()
     db_manager.close()
 
+    if config.diagnostics.query_stats_on_exit:
+        print("\n--- Statistiques des requêtes SQL ---")
+        print(query_stats.summary())
+
+    if config.diagnostics.trace:
+        print(f"Trace exportée : {tracer.export(config.diagnostics.trace)}")
+
     sys.exit(exit_code)
 
 
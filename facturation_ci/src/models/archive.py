@@ -0,0 +1,122 @@
+import datetime
+
+from mysql.connector import Error
+from core.audit import audit_log
+from core.tracing import traced
+
+# Tables déplacées avec chaque facture (table courante, table d'archive), parents d'abord :
+# les tables d'archive (migration 008) ont les mêmes colonnes, sans clés étrangères.
+ARCHIVE_TABLES = (
+    ('invoices', 'invoices_archive', 'id'),
+    ('invoice_items', 'invoice_items_archive', 'invoice_id'),
+    ('invoice_vat_breakdown', 'invoice_vat_breakdown_archive', 'invoice_id'),
+    ('payments', 'payments_archive', 'invoice_id'),
+)
+
+# Seules les factures closes sont archivées ; une facture encore référencée par
+# un avoir courant reste en place (clé étrangère original_invoice_id).
+ARCHIVABLE_CONDITION = """
+    i.issue_date < %s AND i.status IN ('paid', 'cancelled')
+    AND NOT EXISTS (SELECT 1 FROM invoices r WHERE r.original_invoice_id = i.id)
+"""
+ARCHIVABLE_QUERY = f"SELECT i.id FROM invoices i WHERE {ARCHIVABLE_CONDITION} ORDER BY i.id LIMIT %s"
+ARCHIVABLE_COUNT_QUERY = f"SELECT COUNT(*) FROM invoices i WHERE {ARCHIVABLE_CONDITION}"
+
+# Colonnes copiées (les colonnes calculées, comme balance_due, sont recalculées par l'archive)
+STORED_COLUMNS_QUERY = """
+    SELECT COLUMN_NAME FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND EXTRA NOT LIKE '%%GENERATED%%'
+    ORDER BY ORDINAL_POSITION
+"""
+
+
+def archive_cutoff(keep_years, today=None):
+    """Premier jour de la plus ancienne année conservée : `keep_years` années closes plus l'année en cours."""
+    today = today or datetime.date.today()
+    return datetime.date(today.year - keep_years, 1, 1)
+
+
+class ArchiveModel:
+    """
+    Archivage par année des factures closes : elles passent, avec leurs lignes, leur
+    ventilation de TVA et leurs paiements, dans les tables `*_archive`. Les tables
+    courantes ne gardent que les années récentes et les factures encore ouvertes :
+    la liste, le tableau de bord et les rapports gardent un temps de réponse stable
+    quand l'historique grandit. Les cumuls de TVA (vat_monthly_rollups) sont conservés.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.invoice_cache = db_manager.cache('invoices')
+
+    @traced()
+    def count_archivable(self, before):
+        """Nombre de factures closes émises avant `before`, ou None en cas d'erreur."""
+        connection = self.db_manager.get_connection()
+        if not connection:
+            return None
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute(ARCHIVABLE_COUNT_QUERY, (before,))
+            return cursor.fetchone()[0]
+        except Error as e:
+            print(f"Erreur lors du décompte des factures à archiver: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    @traced()
+    def archive_before(self, before, batch_size=500, on_batch=None):
+        """
+        Archive les factures closes émises avant `before`, par lots de `batch_size`
+        factures, chacun dans sa propre transaction (copie puis suppression).
+        :param on_batch: Fonction appelée avec le nombre total archivé après chaque lot.
+        :return: Tuple (nombre de factures archivées, message d'erreur).
+        """
+        connection = self.db_manager.get_connection()
+        if not connection:
+            return 0, "Erreur de connexion à la BDD."
+
+        cursor = connection.cursor()
+        archived = 0
+        try:
+            copy_queries = []
+            for table, archive_table, key in ARCHIVE_TABLES:
+                cursor.execute(STORED_COLUMNS_QUERY, (table,))
+                columns = ", ".join(f"`{row[0]}`" for row in cursor.fetchall())
+                copy_queries.append((table, archive_table, key, columns))
+
+            while True:
+                connection.start_transaction()
+                cursor.execute(ARCHIVABLE_QUERY, (before, batch_size))
+                invoice_ids = [row[0] for row in cursor.fetchall()]
+                if not invoice_ids:
+                    connection.rollback()
+                    break
+                placeholders = ", ".join(["%s"] * len(invoice_ids))
+
+                for table, archive_table, key, columns in copy_queries:
+                    cursor.execute(f"INSERT INTO {archive_table} ({columns}) "
+                                   f"SELECT {columns} FROM {table} WHERE {key} IN ({placeholders})", invoice_ids)
+                # Enfants d'abord (clés étrangères vers invoices)
+                for table, _, key, _ in reversed(copy_queries):
+                    cursor.execute(f"DELETE FROM {table} WHERE {key} IN ({placeholders})", invoice_ids)
+                connection.commit()
+                for invoice_id in invoice_ids:
+                    audit_log.record(self.db_manager, 'archive', 'invoice', invoice_id, {'before': before})
+
+                archived += len(invoice_ids)
+                if on_batch:
+                    on_batch(archived)
+            return archived, None
+        except Error as e:
+            connection.rollback()
+            error_message = f"Erreur lors de l'archivage des factures: {e}"
+            print(error_message)
+            return archived, error_message
+        finally:
+            if archived:
+                self.db_manager.mark_write()
+                self.invoice_cache.invalidate()
+            cursor.close()
@@ -0,0 +1,36 @@
+from core.async_db import aiomysql
+from models.client import CLIENT_LIST_QUERY, CLIENT_BY_ID_QUERY, CLIENT_INSERT_QUERY, client_row
+
+class AsyncClientModel:
+    """Équivalent asyncio de ClientModel pour les traitements par lots (sans cache)."""
+
+    def __init__(self, async_db):
+        self.db = async_db
+
+    async def get_all(self):
+        try:
+            return await self.db.fetch_all(CLIENT_LIST_QUERY)
+        except aiomysql.Error as e:
+            print(f"Erreur lors de la récupération des clients: {e}")
+            return []
+
+    async def get_by_id(self, client_id):
+        try:
+            return await self.db.fetch_one(CLIENT_BY_ID_QUERY, (client_id,))
+        except aiomysql.Error as e:
+            print(f"Erreur lors de la récupération du client {client_id}: {e}")
+            return None
+
+    async def create_many(self, clients, batch_size=1000):
+        """Voir ClientModel.create_many. :return: Tuple (nombre de clients créés, message d'erreur)."""
+        rows = [client_row(c) for c in clients]
+        try:
+            async with self.db.transaction() as cursor:
+                for start in range(0, len(rows), batch_size):
+                    await cursor.executemany(CLIENT_INSERT_QUERY, rows[start:start + batch_size])
+            print(f"{len(rows)} client(s) créé(s).")
+            return len(rows), None
+        except aiomysql.Error as e:
+            error_message = f"Erreur lors de la création des clients: {e}"
+            print(error_message)
+            return 0, error_message
@@ -0,0 +1,104 @@
+import asyncio
+
+from core.async_db import aiomysql
+from models.invoice import (
+    INVOICE_BY_ID_QUERY, ITEMS_BY_INVOICE_QUERY, VAT_BREAKDOWN_BY_INVOICE_QUERY, FNE_CLAIM_QUERY,
+    FNE_CLAIM_TIMEOUT_SECONDS, FNE_UPDATE_QUERY, FNE_RECONCILE_QUERY, invoice_ids_query,
+)
+from models.vat_rollup import (
+    ROLLUP_PERIOD_QUERY, ROLLUP_DELETE_QUERY, ROLLUP_REFRESH_QUERIES, ROLLUP_RETRY_ERRNOS, ROLLUP_RETRY_ATTEMPTS,
+    ROLLUP_RETRY_DELAY_SECONDS,
+)
+
+class AsyncInvoiceModel:
+    """
+    Équivalent asyncio d'InvoiceModel pour les traitements par lots (mêmes requêtes,
+    mêmes valeurs de retour) : sélection, lecture et enregistrement du résultat FNE.
+    """
+
+    def __init__(self, async_db):
+        self.db = async_db
+
+    async def get_ids(self, status=None, since=None, until=None, limit=None):
+        query, params = invoice_ids_query(status, since, until, limit)
+        try:
+            return [row['id'] for row in await self.db.fetch_all(query, params)]
+        except aiomysql.Error as e:
+            print(f"Erreur lors de la sélection des factures: {e}")
+            return []
+
+    async def get_by_id(self, invoice_id):
+        """Détails, lignes d'articles et ventilation de TVA d'une facture (lignes et ventilation lues en parallèle)."""
+        try:
+            details = await self.db.fetch_one(INVOICE_BY_ID_QUERY, (invoice_id,))
+            if not details:
+                return None
+            items, vat_breakdown = await asyncio.gather(
+                self.db.fetch_all(ITEMS_BY_INVOICE_QUERY, (invoice_id,)),
+                self.db.fetch_all(VAT_BREAKDOWN_BY_INVOICE_QUERY, (invoice_id,)),
+            )
+            return {'details': details, 'items': items, 'vat_breakdown': vat_breakdown}
+        except aiomysql.Error as e:
+            print(f"Erreur lors de la récupération de la facture {invoice_id}: {e}")
+            return None
+
+    async def claim_for_certification(self, invoice_id, version, claim_timeout=FNE_CLAIM_TIMEOUT_SECONDS):
+        """Voir InvoiceModel.claim_for_certification. :return: La nouvelle version, ou None."""
+        try:
+            async with self.db.transaction() as cursor:
+                await self.db.execute(cursor, FNE_CLAIM_QUERY, (invoice_id, version, claim_timeout))
+                claimed = cursor.rowcount == 1
+            return version + 1 if claimed else None
+        except aiomysql.Error as e:
+            print(f"Erreur lors de la réservation de la facture {invoice_id}: {e}")
+            return None
+
+    async def update_fne_data(self, invoice_id, version, fne_status, nim=None, qr_code=None, error_message=None):
+        """Voir InvoiceModel.update_fne_data (NIM validé seul, puis cumuls de TVA recalculés à part)."""
+        try:
+            async with self.db.transaction() as cursor:
+                await self.db.execute(cursor, FNE_UPDATE_QUERY,
+                                      (fne_status, nim, qr_code, error_message, fne_status, invoice_id, version))
+                updated = cursor.rowcount == 1
+            if not updated:
+                print(f"La facture {invoice_id} a été modifiée pendant sa certification (version {version} périmée).")
+                return False
+            print(f"Données FNE pour la facture {invoice_id} mises à jour.")
+        except aiomysql.Error as e:
+            print(f"Erreur lors de la mise à jour FNE pour la facture {invoice_id}: {e}")
+            return False
+
+        if fne_status == 'success' and not await self.refresh_vat_rollups(invoice_id):
+            print(f"Cumuls de TVA non recalculés pour la facture {invoice_id} : "
+                  f"lancer VatRollupModel.rebuild() pour les rétablir.")
+        return True
+
+    async def mark_needs_reconciliation(self, invoice_id, nim, qr_code, error_message):
+        """Voir InvoiceModel.mark_needs_reconciliation. :return: True si l'état a été enregistré."""
+        try:
+            async with self.db.transaction() as cursor:
+                await self.db.execute(cursor, FNE_RECONCILE_QUERY, (nim, qr_code, error_message, invoice_id))
+                return cursor.rowcount == 1
+        except aiomysql.Error as e:
+            print(f"Erreur lors de l'enregistrement du NIM {nim} de la facture {invoice_id} à rapprocher: {e}")
+            return False
+
+    async def refresh_vat_rollups(self, invoice_id):
+        """Voir VatRollupModel.refresh_for_invoice. :return: True si les cumuls sont à jour."""
+        for attempt in range(1, ROLLUP_RETRY_ATTEMPTS + 1):
+            try:
+                async with self.db.transaction() as cursor:
+                    await self.db.execute(cursor, ROLLUP_PERIOD_QUERY, (invoice_id,))
+                    row = await cursor.fetchone()
+                    if row:
+                        await self.db.execute(cursor, ROLLUP_DELETE_QUERY, (row['period'], row['client_id']))
+                        for query in ROLLUP_REFRESH_QUERIES:
+                            await self.db.execute(cursor, query, (row['period'], row['period_end'], row['client_id']))
+                return True
+            except aiomysql.Error as e:
+                if e.args and e.args[0] in ROLLUP_RETRY_ERRNOS and attempt < ROLLUP_RETRY_ATTEMPTS:
+                    await asyncio.sleep(ROLLUP_RETRY_DELAY_SECONDS * attempt)
+                    continue
+                print(f"Erreur lors du recalcul des cumuls de TVA de la facture {invoice_id}: {e}")
+                return False
+        return False
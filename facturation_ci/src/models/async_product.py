@@ -0,0 +1,36 @@
+from core.async_db import aiomysql
+from models.product import PRODUCT_LIST_QUERY, PRODUCT_BY_ID_QUERY, PRODUCT_INSERT_QUERY, product_row
+
+class AsyncProductModel:
+    """Équivalent asyncio de ProductModel pour les traitements par lots (sans cache)."""
+
+    def __init__(self, async_db):
+        self.db = async_db
+
+    async def get_all(self):
+        try:
+            return await self.db.fetch_all(PRODUCT_LIST_QUERY)
+        except aiomysql.Error as e:
+            print(f"Erreur lors de la récupération des produits: {e}")
+            return []
+
+    async def get_by_id(self, product_id):
+        try:
+            return await self.db.fetch_one(PRODUCT_BY_ID_QUERY, (product_id,))
+        except aiomysql.Error as e:
+            print(f"Erreur lors de la récupération du produit {product_id}: {e}")
+            return None
+
+    async def create_many(self, products, batch_size=1000):
+        """Voir ProductModel.create_many. :return: Tuple (nombre de produits créés, message d'erreur)."""
+        try:
+            rows = [product_row(p) for p in products]
+            async with self.db.transaction() as cursor:
+                for start in range(0, len(rows), batch_size):
+                    await cursor.executemany(PRODUCT_INSERT_QUERY, rows[start:start + batch_size])
+            print(f"{len(rows)} produit(s) créé(s).")
+            return len(rows), None
+        except (aiomysql.Error, ValueError) as e:
+            error_message = f"Erreur lors de la création des produits: {e}"
+            print(error_message)
+            return 0, str(e)
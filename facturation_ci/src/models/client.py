@@ -1,10 +1,39 @@
 from mysql.connector import Error
+from core.tracing import traced
+from models.fulltext import SEARCH_PAGE_SIZE, search_page
+
+# Requêtes partagées avec models.async_client
+CLIENT_LIST_QUERY = "SELECT id, name, address, email, phone FROM clients ORDER BY name"
+CLIENT_BY_ID_QUERY = "SELECT id, name, address, email, phone FROM clients WHERE id = %s"
+CLIENT_INSERT_QUERY = "INSERT INTO clients (name, address, email, phone) VALUES (%s, %s, %s, %s)"
+
+CLIENT_SEARCH_QUERY = """
+    SELECT id, name, address, email, phone,
+           MATCH(name, address) AGAINST (%s IN BOOLEAN MODE) AS relevance
+    FROM clients
+    WHERE MATCH(name, address) AGAINST (%s IN BOOLEAN MODE)
+    ORDER BY relevance DESC, id
+    LIMIT %s OFFSET %s
+"""
+
+
+def client_row(client_data):
+    """Valeurs de CLIENT_INSERT_QUERY pour un client."""
+    return (client_data.get('name'), client_data.get('address'), client_data.get('email'), client_data.get('phone'))
+
 
 class ClientModel:
     def __init__(self, db_manager):
         self.db_manager = db_manager
+        # Cache partagé par toutes les instances du modèle (voir DBManager.cache)
+        self.cache = db_manager.cache('clients')
 
+    @traced()
     def get_all(self):
+        """Récupère tous les clients (depuis le cache s'il est à jour). La liste ne doit pas être modifiée."""
+        return self.cache.get_or_load('all', self._fetch_all)
+
+    def _fetch_all(self):
         """Récupère tous les clients de la base de données."""
         connection = self.db_manager.get_connection()
         if not connection:
@@ -12,7 +41,7 @@ class ClientModel:
 
         cursor = connection.cursor(dictionary=True)
         try:
-            cursor.execute("SELECT id, name, address, email, phone FROM clients ORDER BY name")
+            cursor.execute(CLIENT_LIST_QUERY)
             clients = cursor.fetchall()
             return clients
         except Error as e:
@@ -21,23 +50,25 @@ class ClientModel:
         finally:
             cursor.close()
 
+    @traced()
+    def search(self, text, page=1, page_size=SEARCH_PAGE_SIZE):
+        """
+        Clients dont le nom ou l'adresse contient tous les mots de `text` (index FULLTEXT),
+        les plus pertinents d'abord. :return: Tuple (clients de la page, True s'il existe une page suivante).
+        """
+        return search_page(self.db_manager, CLIENT_SEARCH_QUERY, text, page, page_size, "des clients")
+
+    @traced()
     def get_by_id(self, client_id):
         """Récupère un client par son ID."""
-        connection = self.db_manager.get_connection()
-        if not connection:
-            return None
-
-        cursor = connection.cursor(dictionary=True)
         try:
-            cursor.execute("SELECT id, name, address, email, phone FROM clients WHERE id = %s", (client_id,))
-            client = cursor.fetchone()
-            return client
+            # Requête fréquente (certification, PDF, édition) : curseur préparé réutilisé
+            return self.db_manager.fetch_prepared(CLIENT_BY_ID_QUERY, (client_id,), one=True)
         except Error as e:
             print(f"Erreur lors de la récupération du client {client_id}: {e}")
             return None
-        finally:
-            cursor.close()
 
+    @traced()
     def create(self, client_data):
         """Crée un nouveau client."""
         connection = self.db_manager.get_connection()
@@ -45,17 +76,11 @@ class ClientModel:
             return False
 
         cursor = connection.cursor()
-        query = "INSERT INTO clients (name, address, email, phone) VALUES (%s, %s, %s, %s)"
-        values = (
-            client_data.get('name'),
-            client_data.get('address'),
-            client_data.get('email'),
-            client_data.get('phone')
-        )
         try:
-            cursor.execute(query, values)
+            cursor.execute(CLIENT_INSERT_QUERY, client_row(client_data))
             connection.commit()
             print(f"Client '{client_data.get('name')}' créé avec succès.")
+            self.cache.invalidate()
             return True
         except Error as e:
             print(f"Erreur lors de la création du client: {e}")
@@ -64,6 +89,36 @@ class ClientModel:
         finally:
             cursor.close()
 
+    @traced()
+    def create_many(self, clients, batch_size=1000):
+        """
+        Crée des clients en masse (import), par requêtes multi-lignes de `batch_size` clients,
+        dans une seule transaction.
+        :return: Tuple (nombre de clients créés, message d'erreur).
+        """
+        connection = self.db_manager.get_connection()
+        if not connection:
+            return 0, "Erreur de connexion à la BDD."
+
+        cursor = connection.cursor()
+        rows = [client_row(c) for c in clients]
+        try:
+            connection.start_transaction()
+            for start in range(0, len(rows), batch_size):
+                cursor.executemany(CLIENT_INSERT_QUERY, rows[start:start + batch_size])
+            connection.commit()
+            print(f"{len(rows)} client(s) créé(s).")
+            self.cache.invalidate()
+            return len(rows), None
+        except Error as e:
+            connection.rollback()
+            error_message = f"Erreur lors de la création des clients: {e}"
+            print(error_message)
+            return 0, error_message
+        finally:
+            cursor.close()
+
+    @traced()
     def update(self, client_id, client_data):
         """Met à jour un client existant."""
         connection = self.db_manager.get_connection()
@@ -86,6 +141,7 @@ class ClientModel:
             cursor.execute(query, values)
             connection.commit()
             print(f"Client ID {client_id} mis à jour avec succès.")
+            self.cache.invalidate()
             return True
         except Error as e:
             print(f"Erreur lors de la mise à jour du client {client_id}: {e}")
@@ -94,6 +150,7 @@ class ClientModel:
         finally:
             cursor.close()
 
+    @traced()
     def delete(self, client_id):
         """Supprime un client."""
         # Attention: vérifier les contraintes de clé étrangère (factures liées)
@@ -113,6 +170,7 @@ class ClientModel:
             cursor.execute("DELETE FROM clients WHERE id = %s", (client_id,))
             connection.commit()
             print(f"Client ID {client_id} supprimé avec succès.")
+            self.cache.invalidate()
             return True
         except Error as e:
             print(f"Erreur lors de la suppression du client {client_id}: {e}")
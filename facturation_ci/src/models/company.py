@@ -0,0 +1,40 @@
+from mysql.connector import Error
+from core.tracing import traced
+
+COMPANY_QUERY = "SELECT * FROM company_info ORDER BY id LIMIT 1"
+
+class CompanyModel:
+    """
+    Informations de l'entreprise émettrice (table `company_info`, une seule ligne).
+    Lues une fois puis servies depuis le cache : elles figurent sur chaque PDF et
+    chaque certification mais ne changent presque jamais.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        # Cache partagé, sans expiration : invalidate() après une modification de company_info
+        self.cache = db_manager.cache('company', ttl=float('inf'))
+
+    @traced()
+    def get(self):
+        """Retourne les informations de l'entreprise ({} si la table est vide). Le dictionnaire ne doit pas être modifié."""
+        return self.cache.get_or_load('info', self._fetch) or {}
+
+    def _fetch(self):
+        connection = self.db_manager.get_connection()
+        if not connection:
+            return None
+
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(COMPANY_QUERY)
+            return cursor.fetchone()
+        except Error as e:
+            print(f"Erreur lors de la récupération des informations de l'entreprise: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    def get_api_key(self, configured_key=None):
+        """Clé d'API FNE : celle de la configuration si elle est renseignée, sinon celle de `company_info`."""
+        return configured_key or self.get().get('fne_api_key')
@@ -0,0 +1,49 @@
+"""
+Recherche plein texte sur les index FULLTEXT (migration 007) : clients (nom, adresse),
+produits (nom, description) et lignes de factures (description).
+Les mots saisis sont tous exigés, en préfixe : « vis inox » cherche `+vis* +inox*`.
+"""
+import re
+
+from mysql.connector import Error
+
+# Taille d'une page de résultats
+SEARCH_PAGE_SIZE = 50
+
+# Mots plus courts que innodb_ft_min_token_size (3 par défaut) : absents de l'index
+MIN_TOKEN_SIZE = 3
+
+
+def boolean_query(text):
+    """
+    Expression MATCH ... AGAINST (... IN BOOLEAN MODE) pour le texte saisi.
+    Les opérateurs du mode booléen éventuellement tapés sont ignorés.
+    :return: L'expression, ou None si aucun mot n'est assez long pour être cherché.
+    """
+    words = [word for word in re.findall(r"\w+", text or '') if len(word) >= MIN_TOKEN_SIZE]
+    return " ".join(f"+{word}*" for word in words) or None
+
+
+def search_page(db_manager, query, text, page, page_size, label):
+    """
+    Exécute une requête de recherche (paramètres : expression deux fois, pour la
+    pertinence et le filtre, puis LIMIT et OFFSET), sur la réplique si configurée.
+    :return: Tuple (lignes de la page par pertinence décroissante, True s'il existe une page suivante).
+    """
+    terms = boolean_query(text)
+    if not terms:
+        return [], False
+    connection = db_manager.get_read_connection()
+    if not connection:
+        return [], False
+
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(query, (terms, terms, page_size + 1, (page - 1) * page_size))
+        rows = cursor.fetchall()
+        return rows[:page_size], len(rows) > page_size
+    except Error as e:
+        print(f"Erreur lors de la recherche {label}: {e}")
+        return [], False
+    finally:
+        cursor.close()
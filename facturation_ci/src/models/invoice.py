@@ -1,32 +1,195 @@
 from mysql.connector import Error
+from core.audit import audit_log
+from core.tracing import traced
+from models.fulltext import SEARCH_PAGE_SIZE, search_page
+from models.invoice_totals import InvoiceTotals
+from models.vat_rollup import VatRollupModel
+
+ITEM_INSERT_QUERY = (
+    "INSERT INTO invoice_items (invoice_id, product_id, description, quantity, unit_price, tax_rate) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+
+VAT_BREAKDOWN_INSERT_QUERY = (
+    "INSERT INTO invoice_vat_breakdown (invoice_id, tax_rate, base_ht, vat) VALUES (%s, %s, %s, %s)"
+)
+
+# Requêtes partagées avec models.async_invoice
+INVOICE_BY_ID_QUERY = "SELECT * FROM invoices WHERE id = %s"
+ITEMS_BY_INVOICE_QUERY = "SELECT * FROM invoice_items WHERE invoice_id = %s"
+VAT_BREAKDOWN_BY_INVOICE_QUERY = (
+    "SELECT tax_rate, base_ht, vat FROM invoice_vat_breakdown WHERE invoice_id = %s ORDER BY tax_rate"
+)
+# Une réservation plus ancienne est celle d'un traitement interrompu : elle peut être reprise.
+# Minimum : les services de certification l'allongent selon le délai de l'API FNE (voir
+# core.certification.fne_claim_timeout), pour ne jamais reprendre un appel encore en cours.
+FNE_CLAIM_TIMEOUT_SECONDS = 300
+
+# Réservation d'un brouillon avant l'appel à l'API FNE (voir InvoiceModel.claim_for_certification).
+# Une facture à rapprocher (certifiée par la FNE, résultat non enregistré) n'est jamais reprise.
+FNE_CLAIM_QUERY = """
+    UPDATE invoices
+    SET fne_status = 'processing', fne_claimed_at = NOW(), version = version + 1
+    WHERE id = %s AND version = %s AND status = 'draft' AND fne_status <> 'needs_reconciliation'
+      AND (fne_status <> 'processing' OR fne_claimed_at < NOW() - INTERVAL %s SECOND)
+"""
+# Factures archivées (voir models.archive) : mêmes colonnes, tables `*_archive`
+ARCHIVED_INVOICE_BY_ID_QUERY = "SELECT * FROM invoices_archive WHERE id = %s"
+ARCHIVED_ITEMS_BY_INVOICE_QUERY = "SELECT * FROM invoice_items_archive WHERE invoice_id = %s"
+ARCHIVED_VAT_BREAKDOWN_BY_INVOICE_QUERY = (
+    "SELECT tax_rate, base_ht, vat FROM invoice_vat_breakdown_archive WHERE invoice_id = %s ORDER BY tax_rate"
+)
+FNE_UPDATE_QUERY = """
+    UPDATE invoices
+    SET fne_status = %s, fne_nim = %s, fne_qr_code = %s, fne_error_message = %s, status = IF(%s='success', 'certified', status),
+        fne_claimed_at = NULL, version = version + 1
+    WHERE id = %s AND version = %s
+"""
+# NIM obtenu mais non enregistré par FNE_UPDATE_QUERY : conservé, sans condition de version,
+# pour un rapprochement manuel (voir InvoiceModel.mark_needs_reconciliation)
+FNE_RECONCILE_QUERY = """
+    UPDATE invoices
+    SET fne_status = 'needs_reconciliation', fne_nim = %s, fne_qr_code = %s, fne_error_message = %s,
+        fne_claimed_at = NULL, version = version + 1
+    WHERE id = %s AND fne_status <> 'success'
+"""
+
+
+# Liste des factures avec le nom du client (InvoiceView, export)
+INVOICE_LIST_QUERY = """
+    SELECT
+        i.id,
+        i.issue_date,
+        i.due_date,
+        i.total_amount,
+        i.balance_due,
+        i.status,
+        i.fne_status,
+        i.fne_nim,
+        c.name as client_name
+    FROM invoices i
+    JOIN clients c ON i.client_id = c.id
+"""
+INVOICE_LIST_ORDER = " ORDER BY i.issue_date DESC, i.id DESC"
+ARCHIVED_INVOICE_LIST_QUERY = INVOICE_LIST_QUERY.replace("FROM invoices i", "FROM invoices_archive i")
+
+# Lignes de factures dont la description contient les mots cherchés (index FULLTEXT)
+ITEM_SEARCH_QUERY = """
+    SELECT ii.invoice_id, ii.id AS item_id, ii.description, ii.quantity, ii.unit_price,
+           i.issue_date, i.status, c.name AS client_name,
+           MATCH(ii.description) AGAINST (%s IN BOOLEAN MODE) AS relevance
+    FROM invoice_items ii
+    JOIN invoices i ON i.id = ii.invoice_id
+    JOIN clients c ON c.id = i.client_id
+    WHERE MATCH(ii.description) AGAINST (%s IN BOOLEAN MODE)
+    ORDER BY relevance DESC, ii.invoice_id DESC, ii.id
+    LIMIT %s OFFSET %s
+"""
+
+# Taille d'une page de la liste des factures
+INVOICE_PAGE_SIZE = 100
+
+
+def text_match_join(text, table):
+    """
+    Jointure restreignant la liste aux factures de `table` dont le NIM ou le nom du client
+    commence par `text`, ou dont le numéro vaut `text`. Un OR entre les colonnes de deux
+    tables ne peut utiliser aucun index : chaque critère est une branche d'UNION servie
+    par son propre index (fne_nim, clients.name puis client_id, clé primaire).
+    :return: Tuple (jointure, paramètres).
+    """
+    prefix = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    branches = [
+        f"SELECT id FROM {table} WHERE fne_nim LIKE %s",
+        f"SELECT t.id FROM clients tc JOIN {table} t ON t.client_id = tc.id WHERE tc.name LIKE %s",
+    ]
+    params = [prefix, prefix]
+    if text.isdigit():
+        branches.append(f"SELECT id FROM {table} WHERE id = %s")
+        params.append(int(text))
+    return f" JOIN ({' UNION '.join(branches)}) AS text_match ON text_match.id = i.id", params
+
+
+def invoice_search_query(filters, limit, offset=0, include_archive=False):
+    """
+    Requête de recherche de la liste des factures (voir InvoiceModel.search).
+    Le texte est cherché en début de NIM ou de nom de client (LIKE 'texte%') ou comme
+    numéro de facture (voir text_match_join).
+    :param include_archive: Ajoute les factures archivées (UNION ALL des deux tables).
+    :return: Tuple (requête, paramètres).
+    """
+    conditions, params = [], []
+    for column, key, operator in (
+        ('i.issue_date', 'date_from', '>='), ('i.issue_date', 'date_to', '<='),
+        ('i.status', 'status', '='), ('i.fne_status', 'fne_status', '='), ('i.client_id', 'client_id', '='),
+        ('i.total_amount', 'amount_min', '>='), ('i.total_amount', 'amount_max', '<='),
+    ):
+        if filters.get(key) not in (None, ''):
+            conditions.append(f"{column} {operator} %s")
+            params.append(filters[key])
+
+    text = (filters.get('text') or '').strip()
+    join, join_params = text_match_join(text, 'invoices') if text else ("", [])
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    if not include_archive:
+        return (INVOICE_LIST_QUERY + join + where + INVOICE_LIST_ORDER + " LIMIT %s OFFSET %s",
+                join_params + params + [limit, offset])
+
+    # Chaque table ne fournit que ses `offset + limit` premières lignes, lues dans l'ordre de ses index
+    archive_join, archive_join_params = text_match_join(text, 'invoices_archive') if text else ("", [])
+    query = (f"({INVOICE_LIST_QUERY}{join}{where}{INVOICE_LIST_ORDER} LIMIT %s) UNION ALL "
+             f"({ARCHIVED_INVOICE_LIST_QUERY}{archive_join}{where}{INVOICE_LIST_ORDER} LIMIT %s) "
+             "ORDER BY issue_date DESC, id DESC LIMIT %s OFFSET %s")
+    return query, (join_params + params + [offset + limit] + archive_join_params + params
+                   + [offset + limit, limit, offset])
+
+
+def invoice_ids_query(status=None, since=None, until=None, limit=None, include_archive=False):
+    """
+    Requête des IDs de factures filtrées par statut et date d'émission (voir InvoiceModel.get_ids).
+    :return: Tuple (requête, paramètres).
+    """
+    conditions, params = [], []
+    if status:
+        conditions.append("status = %s")
+        params.append(status)
+    if since:
+        conditions.append("issue_date >= %s")
+        params.append(since)
+    if until:
+        conditions.append("issue_date <= %s")
+        params.append(until)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    tables = ('invoices', 'invoices_archive') if include_archive else ('invoices',)
+    query = " UNION ALL ".join(f"SELECT id FROM {table}{where}" for table in tables)
+    params = params * len(tables)
+    query += " ORDER BY id"
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+    return query, params
 
 class InvoiceModel:
     def __init__(self, db_manager):
         self.db_manager = db_manager
+        # Cache partagé (liste et statistiques), invalidé à chaque écriture sur les factures
+        self.cache = db_manager.cache('invoices')
+        self.vat_rollups = VatRollupModel(db_manager)
 
+    @traced()
     def get_all_with_client_info(self):
-        """Récupère toutes les factures avec le nom du client."""
-        connection = self.db_manager.get_connection()
+        """Récupère toutes les factures avec le nom du client (depuis le cache s'il est à jour)."""
+        return self.cache.get_or_load('list', self._fetch_all_with_client_info)
+
+    def _fetch_all_with_client_info(self):
+        """Récupère toutes les factures avec le nom du client (réplique en lecture si configurée)."""
+        connection = self.db_manager.get_read_connection()
         if not connection:
             return []
 
         cursor = connection.cursor(dictionary=True)
-        query = """
-            SELECT
-                i.id,
-                i.issue_date,
-                i.due_date,
-                i.total_amount,
-                i.status,
-                i.fne_status,
-                i.fne_nim,
-                c.name as client_name
-            FROM invoices i
-            JOIN clients c ON i.client_id = c.id
-            ORDER BY i.issue_date DESC, i.id DESC
-        """
         try:
-            cursor.execute(query)
+            cursor.execute(INVOICE_LIST_QUERY + INVOICE_LIST_ORDER)
             invoices = cursor.fetchall()
             return invoices
         except Error as e:
@@ -35,9 +198,81 @@ class InvoiceModel:
         finally:
             cursor.close()
 
-    def get_dashboard_stats(self):
-        """Récupère les statistiques pour le tableau de bord."""
+    @traced()
+    def search(self, filters=None, page=1, page_size=INVOICE_PAGE_SIZE, include_archive=False):
+        """
+        Une page de la liste des factures (les plus récentes d'abord), filtrée côté serveur.
+        :param filters: dict facultatif : date_from, date_to, status, fne_status, client_id,
+                        amount_min, amount_max et text (début du NIM ou du nom du client, ou n° de facture).
+        :param page: Numéro de page, à partir de 1.
+        :param include_archive: Cherche aussi dans les factures archivées (années closes).
+        :return: Tuple (factures de la page, True s'il existe une page suivante).
+        """
+        filters = {key: value for key, value in (filters or {}).items() if value not in (None, '')}
+        if filters:
+            result = self._fetch_page(filters, page, page_size, include_archive)
+        else:
+            # Pages sans filtre (ouverture de l'onglet, préchargement) : en cache comme l'ancienne liste complète
+            result = self.cache.get_or_load(('page', page, page_size, include_archive),
+                                            lambda: self._fetch_page(filters, page, page_size, include_archive))
+        return result or ([], False)
+
+    def _fetch_page(self, filters, page, page_size, include_archive=False):
+        """Voir search. Une ligne de plus que la page indique s'il y a une suite (pas de COUNT(*)). :return: None en cas d'erreur."""
+        connection = self.db_manager.get_read_connection()
+        if not connection:
+            return None
+
+        query, params = invoice_search_query(filters, page_size + 1, (page - 1) * page_size, include_archive)
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(query, params)
+            invoices = cursor.fetchall()
+            return invoices[:page_size], len(invoices) > page_size
+        except Error as e:
+            print(f"Erreur lors de la recherche des factures: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    @traced()
+    def search_items(self, text, page=1, page_size=SEARCH_PAGE_SIZE):
+        """
+        Lignes de factures dont la description contient tous les mots de `text` (index FULLTEXT),
+        avec leur facture et son client, les plus pertinentes d'abord.
+        :return: Tuple (lignes de la page, True s'il existe une page suivante).
+        """
+        return search_page(self.db_manager, ITEM_SEARCH_QUERY, text, page, page_size, "des lignes de factures")
+
+    @traced()
+    def get_ids(self, status=None, since=None, until=None, limit=None, include_archive=False):
+        """
+        IDs des factures (par ordre croissant) filtrées par statut et date d'émission,
+        pour les traitements par lots (archives comprises si `include_archive`).
+        """
         connection = self.db_manager.get_connection()
+        if not connection:
+            return []
+
+        query, params = invoice_ids_query(status, since, until, limit, include_archive)
+        cursor = connection.cursor()
+        try:
+            cursor.execute(query, params)
+            return [row[0] for row in cursor.fetchall()]
+        except Error as e:
+            print(f"Erreur lors de la sélection des factures: {e}")
+            return []
+        finally:
+            cursor.close()
+
+    @traced()
+    def get_dashboard_stats(self):
+        """Récupère les statistiques pour le tableau de bord (depuis le cache s'il est à jour)."""
+        return self.cache.get_or_load('dashboard_stats', self._fetch_dashboard_stats)
+
+    def _fetch_dashboard_stats(self):
+        """Récupère les statistiques pour le tableau de bord (réplique en lecture si configurée)."""
+        connection = self.db_manager.get_read_connection()
         if not connection:
             return {}
 
@@ -77,46 +312,60 @@ class InvoiceModel:
         finally:
             cursor.close()
 
+    @traced()
     def get_by_id(self, invoice_id):
-        """Récupère les détails complets d'une facture, y compris ses lignes d'articles."""
-        connection = self.db_manager.get_connection()
-        if not connection:
-            return None
-
-        invoice_data = {}
-        cursor = connection.cursor(dictionary=True)
+        """
+        Récupère les détails complets d'une facture, y compris ses lignes d'articles.
+        Une facture absente des tables courantes est cherchée dans les archives
+        (`invoice_data['archived']` vaut alors True).
+        """
+        invoice_data = {'archived': False}
+        queries = (INVOICE_BY_ID_QUERY, ITEMS_BY_INVOICE_QUERY, VAT_BREAKDOWN_BY_INVOICE_QUERY)
         try:
-            # Récupérer les données principales de la facture
-            cursor.execute("SELECT * FROM invoices WHERE id = %s", (invoice_id,))
-            invoice_data['details'] = cursor.fetchone()
+            # Récupérer les données principales de la facture (curseurs préparés réutilisés)
+            invoice_data['details'] = self.db_manager.fetch_prepared(INVOICE_BY_ID_QUERY, (invoice_id,), one=True)
             if not invoice_data['details']:
-                return None
+                invoice_data['details'] = self.db_manager.fetch_prepared(ARCHIVED_INVOICE_BY_ID_QUERY, (invoice_id,),
+                                                                         one=True)
+                if not invoice_data['details']:
+                    return None
+                invoice_data['archived'] = True
+                queries = (ARCHIVED_INVOICE_BY_ID_QUERY, ARCHIVED_ITEMS_BY_INVOICE_QUERY,
+                           ARCHIVED_VAT_BREAKDOWN_BY_INVOICE_QUERY)
 
             # Récupérer les lignes d'articles
-            cursor.execute("SELECT * FROM invoice_items WHERE invoice_id = %s", (invoice_id,))
-            invoice_data['items'] = cursor.fetchall()
+            invoice_data['items'] = self.db_manager.fetch_prepared(queries[1], (invoice_id,))
+
+            # Ventilation de la TVA enregistrée à la création (voir models.invoice_totals.invoice_totals)
+            invoice_data['vat_breakdown'] = self.db_manager.fetch_prepared(queries[2], (invoice_id,))
 
             return invoice_data
         except Error as e:
             print(f"Erreur lors de la récupération de la facture {invoice_id}: {e}")
             return None
-        finally:
-            cursor.close()
 
+    @traced()
     def create(self, invoice_data):
-        """Crée une nouvelle facture et ses lignes d'articles dans une transaction."""
+        """
+        Crée une nouvelle facture et ses lignes d'articles dans une transaction.
+        Les totaux (HT, TVA par taux, TTC) sont calculés ici, une fois pour toutes,
+        et enregistrés avec la facture ; `total_amount` éventuellement fourni est ignoré.
+        """
         connection = self.db_manager.get_connection()
         if not connection:
             return None, "Erreur de connexion à la BDD."
 
+        totals = InvoiceTotals.from_items(invoice_data['items'])
+
         cursor = connection.cursor()
         try:
             connection.start_transaction()
 
             # 1. Insérer dans la table 'invoices'
             invoice_query = """
-                INSERT INTO invoices (client_id, user_id, document_type, issue_date, due_date, total_amount, status)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                INSERT INTO invoices (client_id, user_id, document_type, issue_date, due_date,
+                                      subtotal, vat_amount, total_amount, status)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
             """
             invoice_details = invoice_data['details']
             invoice_values = (
@@ -125,17 +374,16 @@ class InvoiceModel:
                 invoice_details.get('document_type', 'sale'),
                 invoice_details['issue_date'],
                 invoice_details['due_date'],
-                invoice_details['total_amount'],
+                totals.subtotal,
+                totals.vat,
+                totals.total,
                 'draft' # Toujours créée en tant que brouillon
             )
             cursor.execute(invoice_query, invoice_values)
             invoice_id = cursor.lastrowid
 
             # 2. Insérer dans la table 'invoice_items'
-            items_query = """
-                INSERT INTO invoice_items (invoice_id, product_id, description, quantity, unit_price, tax_rate)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
+            # (instruction préparée une seule fois, puis réexécutée pour chaque ligne)
             for item in invoice_data['items']:
                 item_values = (
                     invoice_id,
@@ -145,10 +393,19 @@ class InvoiceModel:
                     item['unit_price'],
                     item['tax_rate']
                 )
-                cursor.execute(items_query, item_values)
+                self.db_manager.execute_prepared(ITEM_INSERT_QUERY, item_values)
+
+            # 3. Enregistrer la ventilation de la TVA par taux
+            cursor.executemany(VAT_BREAKDOWN_INSERT_QUERY, [
+                (invoice_id, row['tax_rate'], row['base_ht'], row['vat']) for row in totals.vat_rows()
+            ])
 
             connection.commit()
             print(f"Facture ID {invoice_id} créée avec succès.")
+            self.db_manager.mark_write()
+            self.cache.invalidate()
+            audit_log.record(self.db_manager, 'create', 'invoice', invoice_id,
+                             {'client_id': invoice_details['client_id'], 'total': totals.total})
             return invoice_id, None
         except Error as e:
             connection.rollback()
@@ -158,27 +415,98 @@ class InvoiceModel:
         finally:
             cursor.close()
 
-    def update_fne_data(self, invoice_id, fne_status, nim=None, qr_code=None, error_message=None):
-        """Met à jour le statut et les données FNE d'une facture."""
+    @traced()
+    def claim_for_certification(self, invoice_id, version, claim_timeout=FNE_CLAIM_TIMEOUT_SECONDS):
+        """
+        Réserve un brouillon pour sa certification : une seule mise à jour conditionnelle
+        (version lue inchangée, pas de réservation en cours) passe `fne_status` à 'processing'.
+        Deux traitements concurrents ne peuvent donc pas soumettre la même facture à la FNE,
+        sans verrouiller la table pendant l'appel à l'API.
+        :param version: Version lue avec la facture (`details['version']`).
+        :param claim_timeout: Âge (secondes) au-delà duquel une réservation en cours est reprise ;
+                              doit dépasser la durée maximale d'un appel à l'API FNE.
+        :return: La nouvelle version, à passer à update_fne_data, ou None si la facture
+                 a été modifiée ou réservée entre-temps.
+        """
         connection = self.db_manager.get_connection()
         if not connection:
-            return False
+            return None
 
         cursor = connection.cursor()
-        query = """
-            UPDATE invoices
-            SET fne_status = %s, fne_nim = %s, fne_qr_code = %s, fne_error_message = %s, status = IF(%s='success', 'certified', status)
-            WHERE id = %s
+        try:
+            cursor.execute(FNE_CLAIM_QUERY, (invoice_id, version, claim_timeout))
+            connection.commit()
+            if cursor.rowcount != 1:
+                return None
+            self.db_manager.mark_write()
+            self.cache.invalidate()
+            return version + 1
+        except Error as e:
+            print(f"Erreur lors de la réservation de la facture {invoice_id}: {e}")
+            connection.rollback()
+            return None
+        finally:
+            cursor.close()
+
+    @traced()
+    def update_fne_data(self, invoice_id, version, fne_status, nim=None, qr_code=None, error_message=None):
         """
-        values = (fne_status, nim, qr_code, error_message, fne_status, invoice_id)
+        Met à jour le statut et les données FNE d'une facture réservée par
+        claim_for_certification, si elle est toujours à la `version` réservée.
+        Le NIM est validé seul ; les cumuls de TVA du mois sont recalculés ensuite, dans
+        une transaction distincte dont l'échec ne remet pas en cause la certification.
+        """
+        connection = self.db_manager.get_connection()
+        if not connection:
+            return False
+
+        cursor = connection.cursor()
+        values = (fne_status, nim, qr_code, error_message, fne_status, invoice_id, version)
         try:
-            cursor.execute(query, values)
+            connection.start_transaction()
+            cursor.execute(FNE_UPDATE_QUERY, values)
+            if cursor.rowcount != 1:
+                connection.rollback()
+                print(f"La facture {invoice_id} a été modifiée pendant sa certification (version {version} périmée).")
+                return False
             connection.commit()
             print(f"Données FNE pour la facture {invoice_id} mises à jour.")
-            return True
+            self.db_manager.mark_write()
+            self.cache.invalidate()
         except Error as e:
             print(f"Erreur lors de la mise à jour FNE pour la facture {invoice_id}: {e}")
             connection.rollback()
             return False
         finally:
             cursor.close()
+
+        if fne_status == 'success' and not self.vat_rollups.refresh_for_invoice(invoice_id):
+            print(f"Cumuls de TVA non recalculés pour la facture {invoice_id} : "
+                  f"lancer VatRollupModel.rebuild() pour les rétablir.")
+        return True
+
+    @traced()
+    def mark_needs_reconciliation(self, invoice_id, nim, qr_code, error_message):
+        """
+        Conserve le NIM d'une facture certifiée par la FNE dont le résultat n'a pas pu être
+        enregistré par update_fne_data : `fne_status` passe à 'needs_reconciliation', que
+        claim_for_certification refuse, si bien que la facture n'est jamais soumise une seconde fois.
+        :return: True si l'état a été enregistré.
+        """
+        connection = self.db_manager.get_connection()
+        if not connection:
+            return False
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute(FNE_RECONCILE_QUERY, (nim, qr_code, error_message, invoice_id))
+            connection.commit()
+            self.db_manager.mark_write()
+            self.cache.invalidate()
+            return cursor.rowcount == 1
+        except Error as e:
+            print(f"Erreur lors de l'enregistrement du NIM {nim} de la facture {invoice_id} à rapprocher: {e}")
+            connection.rollback()
+            return False
+        finally:
+            cursor.close()
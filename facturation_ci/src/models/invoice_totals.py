@@ -0,0 +1,112 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+
+def to_decimal(value):
+    """Convertit un montant (Decimal, int, float ou chaîne) en Decimal sans erreur binaire."""
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        # repr d'un float : la décimale la plus courte qui le représente (1.1 et non 1.1000000000000000888)
+        return Decimal(repr(value))
+    return Decimal(str(value))
+
+
+def round_amount(value):
+    """Arrondi au centime, demi-unité à l'écart de zéro (comme ROUND() de MySQL sur un DECIMAL)."""
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def line_totals(item):
+    """
+    Montants d'une ligne d'article, arrondis au centime ligne par ligne.
+    :return: Tuple (taux de TVA, total HT, montant de TVA).
+    """
+    amount = to_decimal(item['quantity']) * to_decimal(item['unit_price'])
+    tax_rate = to_decimal(item['tax_rate']).quantize(CENT)
+    return tax_rate, round_amount(amount), round_amount(amount * tax_rate / 100)
+
+
+class InvoiceTotals:
+    """
+    Totaux d'une facture, ventilés par taux de TVA : seul moteur de calcul des montants
+    (création, éditeur, PDF, rapports). Chaque ligne est arrondie au centime, puis les
+    lignes sont additionnées par taux ; le total TTC est la somme HT + TVA.
+    Les lignes peuvent être ajoutées et retirées une à une : les montants étant des
+    Decimal déjà arrondis, le cumul reste exactement égal à un recalcul complet.
+    """
+
+    def __init__(self):
+        # {taux: [total HT, TVA]}
+        self.breakdown = {}
+        # Nombre de lignes par taux (un taux disparaît avec sa dernière ligne)
+        self._line_counts = {}
+
+    @classmethod
+    def from_items(cls, items):
+        totals = cls()
+        for item in items:
+            totals.add_item(item)
+        return totals
+
+    @classmethod
+    def from_breakdown(cls, rows):
+        """Reconstruit les totaux enregistrés (lignes de `invoice_vat_breakdown`)."""
+        totals = cls()
+        for row in rows:
+            totals.breakdown[to_decimal(row['tax_rate']).quantize(CENT)] = [
+                to_decimal(row['base_ht']), to_decimal(row['vat'])
+            ]
+        return totals
+
+    def add_item(self, item):
+        tax_rate, base_ht, vat = line_totals(item)
+        entry = self.breakdown.setdefault(tax_rate, [ZERO, ZERO])
+        entry[0] += base_ht
+        entry[1] += vat
+        self._line_counts[tax_rate] = self._line_counts.get(tax_rate, 0) + 1
+
+    def remove_item(self, item):
+        """Retire une ligne précédemment ajoutée par add_item."""
+        tax_rate, base_ht, vat = line_totals(item)
+        if self._line_counts.get(tax_rate) == 1:
+            del self._line_counts[tax_rate]
+            del self.breakdown[tax_rate]
+            return
+        entry = self.breakdown[tax_rate]
+        entry[0] -= base_ht
+        entry[1] -= vat
+        if tax_rate in self._line_counts:
+            self._line_counts[tax_rate] -= 1
+
+    @property
+    def subtotal(self):
+        return sum((entry[0] for entry in self.breakdown.values()), ZERO)
+
+    @property
+    def vat(self):
+        return sum((entry[1] for entry in self.breakdown.values()), ZERO)
+
+    @property
+    def total(self):
+        return self.subtotal + self.vat
+
+    def vat_rows(self):
+        """Ventilation par taux croissant : liste de dicts (tax_rate, base_ht, vat)."""
+        return [
+            {'tax_rate': tax_rate, 'base_ht': entry[0], 'vat': entry[1]}
+            for tax_rate, entry in sorted(self.breakdown.items())
+        ]
+
+
+def invoice_totals(invoice_data):
+    """
+    Totaux d'une facture lue par InvoiceModel.get_by_id : ceux enregistrés à la création
+    s'ils existent, sinon (facture antérieure aux colonnes de totaux) recalculés des lignes.
+    """
+    breakdown = invoice_data.get('vat_breakdown')
+    if breakdown:
+        return InvoiceTotals.from_breakdown(breakdown)
+    return InvoiceTotals.from_items(invoice_data.get('items') or [])
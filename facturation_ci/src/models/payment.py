@@ -0,0 +1,162 @@
+from decimal import Decimal
+from mysql.connector import Error
+from core.audit import audit_log
+from core.tracing import traced
+
+# Seules les factures certifiées (et pas encore soldées) peuvent recevoir un paiement
+PAYABLE_STATUSES = ('certified', 'partially_paid')
+
+PAYMENT_INSERT_QUERY = (
+    "INSERT INTO payments (invoice_id, payment_date, amount, payment_method, reference) "
+    "VALUES (%s, %s, %s, %s, %s)"
+)
+
+# MySQL évalue les affectations d'un UPDATE mono-table de gauche à droite :
+# le statut est calculé à partir du montant réglé déjà mis à jour.
+INVOICE_PAYMENT_UPDATE_QUERY = (
+    "UPDATE invoices SET amount_paid = amount_paid + %s, "
+    "status = IF(amount_paid >= total_amount, 'paid', 'partially_paid'), version = version + 1 "
+    "WHERE id = %s"
+)
+
+class PaymentModel:
+    """
+    Paiements des factures. Le montant réglé (`invoices.amount_paid`) et le solde
+    (`invoices.balance_due`, colonne calculée) sont tenus à jour dans la même transaction
+    que l'insertion du paiement : les lectures n'ont jamais à sommer la table `payments`.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        # Les paiements modifient les factures : leur cache doit être invalidé
+        self.invoice_cache = db_manager.cache('invoices')
+
+    @traced()
+    def get_by_invoice(self, invoice_id):
+        """Récupère les paiements d'une facture, du plus ancien au plus récent."""
+        try:
+            return self.db_manager.fetch_prepared(
+                "SELECT id, payment_date, amount, payment_method, reference FROM payments "
+                "WHERE invoice_id = %s ORDER BY payment_date, id",
+                (invoice_id,)
+            )
+        except Error as e:
+            print(f"Erreur lors de la récupération des paiements de la facture {invoice_id}: {e}")
+            return []
+
+    @traced()
+    def get_open_invoices(self):
+        """Récupère les factures en attente de paiement (solde restant dû positif)."""
+        connection = self.db_manager.get_connection()
+        if not connection:
+            return []
+
+        cursor = connection.cursor(dictionary=True)
+        query = """
+            SELECT i.id, i.issue_date, i.total_amount, i.amount_paid, i.balance_due, i.fne_nim,
+                   c.name as client_name
+            FROM invoices i
+            JOIN clients c ON i.client_id = c.id
+            WHERE i.status IN (%s, %s) AND i.balance_due > 0
+        """
+        try:
+            cursor.execute(query, PAYABLE_STATUSES)
+            return cursor.fetchall()
+        except Error as e:
+            print(f"Erreur lors de la récupération des factures à encaisser: {e}")
+            return []
+        finally:
+            cursor.close()
+
+    @traced()
+    def create(self, payment_data):
+        """
+        Enregistre un paiement et met à jour le montant réglé et le statut de la facture.
+        :param payment_data: dict avec invoice_id, payment_date, amount, payment_method, reference.
+        :return: Tuple (ID du paiement, message d'erreur).
+        """
+        return self._record([payment_data])
+
+    @traced()
+    def create_many(self, payments):
+        """
+        Enregistre un lot de paiements dans une seule transaction (import de relevé bancaire) :
+        si l'un est refusé, rien n'est enregistré.
+        :return: Tuple (nombre de paiements enregistrés, message d'erreur).
+        """
+        if not payments:
+            return 0, None
+        first_id, error = self._record(payments)
+        return (0 if error else len(payments)), error
+
+    def _record(self, payments):
+        """
+        Verrouille les factures concernées, contrôle chaque paiement (statut, dépassement
+        du solde), insère les paiements puis reporte les montants sur les factures.
+        :return: Tuple (ID du premier paiement inséré, message d'erreur).
+        """
+        connection = self.db_manager.get_connection()
+        if not connection:
+            return None, "Erreur de connexion à la BDD."
+
+        cursor = connection.cursor(dictionary=True)
+        try:
+            connection.start_transaction()
+
+            # 1. Verrouiller les factures et contrôler les paiements
+            totals = {}
+            for payment in payments:
+                amount = Decimal(str(payment['amount']))
+                if amount <= 0:
+                    raise ValueError(f"Montant invalide pour la facture #{payment['invoice_id']} : {amount}")
+                totals[payment['invoice_id']] = totals.get(payment['invoice_id'], Decimal('0')) + amount
+
+            invoice_ids = sorted(totals)
+            placeholders = ', '.join(['%s'] * len(invoice_ids))
+            cursor.execute(
+                f"SELECT id, status, balance_due FROM invoices WHERE id IN ({placeholders}) FOR UPDATE",
+                invoice_ids
+            )
+            invoices = {row['id']: row for row in cursor.fetchall()}
+            for invoice_id in invoice_ids:
+                invoice = invoices.get(invoice_id)
+                if not invoice:
+                    raise ValueError(f"Facture #{invoice_id} introuvable.")
+                if invoice['status'] not in PAYABLE_STATUSES:
+                    raise ValueError(f"La facture #{invoice_id} ne peut pas recevoir de paiement "
+                                     f"(statut: {invoice['status']}).")
+                if totals[invoice_id] > invoice['balance_due']:
+                    raise ValueError(f"Le paiement de {totals[invoice_id]:.2f} dépasse le solde de la facture "
+                                     f"#{invoice_id} ({invoice['balance_due']:.2f}).")
+
+            # 2. Insérer les paiements (requête multi-lignes)
+            cursor.executemany(PAYMENT_INSERT_QUERY, [
+                (p['invoice_id'], p['payment_date'], Decimal(str(p['amount'])),
+                 p.get('payment_method'), p.get('reference'))
+                for p in payments
+            ])
+            first_id = cursor.lastrowid
+
+            # 3. Reporter les montants sur les factures (une mise à jour par facture)
+            cursor.executemany(INVOICE_PAYMENT_UPDATE_QUERY, [
+                (totals[invoice_id], invoice_id) for invoice_id in invoice_ids
+            ])
+
+            connection.commit()
+            print(f"{len(payments)} paiement(s) enregistré(s) sur {len(invoice_ids)} facture(s).")
+            self.db_manager.mark_write()
+            self.invoice_cache.invalidate()
+            for payment in payments:
+                audit_log.record(self.db_manager, 'payment', 'invoice', payment['invoice_id'], {
+                    'amount': Decimal(str(payment['amount'])), 'method': payment.get('payment_method'),
+                    'reference': payment.get('reference'),
+                })
+            return first_id, None
+        except (Error, ValueError) as e:
+            connection.rollback()
+            error_message = f"Paiement refusé : {e}" if isinstance(e, ValueError) \
+                else f"Erreur transactionnelle lors de l'enregistrement des paiements: {e}"
+            print(error_message)
+            return None, error_message
+        finally:
+            cursor.close()
@@ -1,10 +1,47 @@
 from mysql.connector import Error, conversion
+from core.tracing import traced
+from models.fulltext import SEARCH_PAGE_SIZE, search_page
+
+# Requêtes partagées avec models.async_product
+PRODUCT_LIST_QUERY = "SELECT id, name, description, unit_price, tax_rate FROM products ORDER BY name"
+PRODUCT_BY_ID_QUERY = "SELECT id, name, description, unit_price, tax_rate FROM products WHERE id = %s"
+PRODUCT_INSERT_QUERY = "INSERT INTO products (name, description, unit_price, tax_rate) VALUES (%s, %s, %s, %s)"
+
+PRODUCT_SEARCH_QUERY = """
+    SELECT id, name, description, unit_price, tax_rate,
+           MATCH(name, description) AGAINST (%s IN BOOLEAN MODE) AS relevance
+    FROM products
+    WHERE MATCH(name, description) AGAINST (%s IN BOOLEAN MODE)
+    ORDER BY relevance DESC, id
+    LIMIT %s OFFSET %s
+"""
+
+
+def product_row(product_data):
+    """
+    Valeurs de PRODUCT_INSERT_QUERY pour un produit.
+    :raises ValueError: Prix ou taux invalide.
+    """
+    return (
+        product_data.get('name'),
+        product_data.get('description'),
+        float(product_data.get('unit_price', 0)),
+        float(product_data.get('tax_rate', 18.00))
+    )
+
 
 class ProductModel:
     def __init__(self, db_manager):
         self.db_manager = db_manager
+        # Cache partagé par toutes les instances du modèle (voir DBManager.cache)
+        self.cache = db_manager.cache('products')
 
+    @traced()
     def get_all(self):
+        """Récupère tous les produits (depuis le cache s'il est à jour). La liste ne doit pas être modifiée."""
+        return self.cache.get_or_load('all', self._fetch_all)
+
+    def _fetch_all(self):
         """Récupère tous les produits de la base de données."""
         connection = self.db_manager.get_connection()
         if not connection:
@@ -12,7 +49,7 @@ class ProductModel:
 
         cursor = connection.cursor(dictionary=True)
         try:
-            cursor.execute("SELECT id, name, description, unit_price, tax_rate FROM products ORDER BY name")
+            cursor.execute(PRODUCT_LIST_QUERY)
             products = cursor.fetchall()
             return products
         except Error as e:
@@ -21,23 +58,26 @@ class ProductModel:
         finally:
             cursor.close()
 
+    @traced()
+    def search(self, text, page=1, page_size=SEARCH_PAGE_SIZE):
+        """
+        Produits dont le nom ou la description contient tous les mots de `text` (index FULLTEXT),
+        les plus pertinents d'abord. :return: Tuple (produits de la page, True s'il existe une page suivante).
+        """
+        return search_page(self.db_manager, PRODUCT_SEARCH_QUERY, text, page, page_size, "des produits")
+
+    @traced()
     def get_by_id(self, product_id):
         """Récupère un produit par son ID."""
-        connection = self.db_manager.get_connection()
-        if not connection:
-            return None
-
-        cursor = connection.cursor(dictionary=True)
         try:
-            cursor.execute("SELECT id, name, description, unit_price, tax_rate FROM products WHERE id = %s", (product_id,))
-            product = cursor.fetchone()
-            return product
+            return self.db_manager.fetch_prepared(
+                PRODUCT_BY_ID_QUERY, (product_id,), one=True
+            )
         except Error as e:
             print(f"Erreur lors de la récupération du produit {product_id}: {e}")
             return None
-        finally:
-            cursor.close()
 
+    @traced()
     def create(self, product_data):
         """Crée un nouveau produit."""
         connection = self.db_manager.get_connection()
@@ -45,17 +85,11 @@ class ProductModel:
             return None, "Database connection error"
 
         cursor = connection.cursor()
-        query = "INSERT INTO products (name, description, unit_price, tax_rate) VALUES (%s, %s, %s, %s)"
         try:
-            values = (
-                product_data.get('name'),
-                product_data.get('description'),
-                float(product_data.get('unit_price', 0)),
-                float(product_data.get('tax_rate', 18.00))
-            )
-            cursor.execute(query, values)
+            cursor.execute(PRODUCT_INSERT_QUERY, product_row(product_data))
             connection.commit()
             print(f"Produit '{product_data.get('name')}' créé avec succès.")
+            self.cache.invalidate()
             return cursor.lastrowid, None
         except (Error, ValueError) as e:
             error_message = f"Erreur lors de la création du produit: {e}"
@@ -65,6 +99,36 @@ class ProductModel:
         finally:
             cursor.close()
 
+    @traced()
+    def create_many(self, products, batch_size=1000):
+        """
+        Crée des produits en masse (import), par requêtes multi-lignes de `batch_size` produits,
+        dans une seule transaction.
+        :return: Tuple (nombre de produits créés, message d'erreur).
+        """
+        connection = self.db_manager.get_connection()
+        if not connection:
+            return 0, "Database connection error"
+
+        cursor = connection.cursor()
+        try:
+            rows = [product_row(p) for p in products]
+            connection.start_transaction()
+            for start in range(0, len(rows), batch_size):
+                cursor.executemany(PRODUCT_INSERT_QUERY, rows[start:start + batch_size])
+            connection.commit()
+            print(f"{len(rows)} produit(s) créé(s).")
+            self.cache.invalidate()
+            return len(rows), None
+        except (Error, ValueError) as e:
+            error_message = f"Erreur lors de la création des produits: {e}"
+            print(error_message)
+            connection.rollback()
+            return 0, str(e)
+        finally:
+            cursor.close()
+
+    @traced()
     def update(self, product_id, product_data):
         """Met à jour un produit existant."""
         connection = self.db_manager.get_connection()
@@ -87,6 +151,7 @@ class ProductModel:
             cursor.execute(query, values)
             connection.commit()
             print(f"Produit ID {product_id} mis à jour avec succès.")
+            self.cache.invalidate()
             return True, None
         except (Error, ValueError) as e:
             error_message = f"Erreur lors de la mise à jour du produit {product_id}: {e}"
@@ -96,6 +161,7 @@ class ProductModel:
         finally:
             cursor.close()
 
+    @traced()
     def delete(self, product_id):
         """Supprime un produit."""
         connection = self.db_manager.get_connection()
@@ -114,6 +180,7 @@ class ProductModel:
             cursor.execute("DELETE FROM products WHERE id = %s", (product_id,))
             connection.commit()
             print(f"Produit ID {product_id} supprimé avec succès.")
+            self.cache.invalidate()
             return True, None
         except Error as e:
             error_message = f"Erreur lors de la suppression du produit {product_id}: {e}"
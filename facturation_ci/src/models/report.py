@@ -0,0 +1,65 @@
+import datetime
+from mysql.connector import Error
+from core.reports import aging_bucket_sql, build_aged_receivables_report, build_vat_report
+from core.tracing import traced
+from models.payment import PAYABLE_STATUSES
+from models.vat_rollup import VatRollupModel
+
+class ReportModel:
+    """Requêtes d'agrégation des rapports financiers (une requête groupée par rapport)."""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.vat_rollups = VatRollupModel(db_manager)
+
+    @traced()
+    def get_aged_receivables(self, as_of=None):
+        """
+        Balance âgée des créances au `as_of` (aujourd'hui par défaut) : solde restant dû
+        des factures ouvertes, par client et par tranche de retard sur la date d'échéance.
+        L'agrégation est faite par le serveur en un seul passage sur l'index
+        `idx_invoices_open` ; seules les lignes par client sont transférées.
+        Lue sur la réplique si elle est configurée.
+        :return: Un core.reports.Report, ou None en cas d'erreur.
+        """
+        as_of = as_of or datetime.date.today()
+        connection = self.db_manager.get_read_connection()
+        if not connection:
+            return None
+
+        cursor = connection.cursor(dictionary=True)
+        days = "DATEDIFF(%(as_of)s, COALESCE(due_date, issue_date))"
+        query = f"""
+            SELECT c.name AS client_name, a.*
+            FROM (
+                SELECT client_id, COUNT(*) AS invoice_count,
+                {aging_bucket_sql(days)},
+                SUM(balance_due) AS total
+                FROM invoices
+                WHERE status IN (%(status_1)s, %(status_2)s) AND balance_due > 0
+                GROUP BY client_id
+            ) a
+            JOIN clients c ON c.id = a.client_id
+            ORDER BY a.total DESC
+        """
+        params = {'as_of': as_of, 'status_1': PAYABLE_STATUSES[0], 'status_2': PAYABLE_STATUSES[1]}
+        try:
+            cursor.execute(query, params)
+            return build_aged_receivables_report(cursor.fetchall(), as_of)
+        except Error as e:
+            print(f"Erreur lors du calcul de la balance âgée: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    @traced()
+    def get_vat_report(self, start, end, by_client=False):
+        """
+        Récapitulatif de TVA (HT, TVA, TTC par mois et par taux, et par client si demandé)
+        du `start` au `end` inclus, à partir des cumuls mensuels (voir VatRollupModel).
+        :return: Un core.reports.Report, ou None en cas d'erreur.
+        """
+        rows = self.vat_rollups.get_summary(start, end, by_client)
+        if rows is None:
+            return None
+        return build_vat_report(rows, start, end, by_client)
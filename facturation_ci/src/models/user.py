@@ -0,0 +1,22 @@
+from mysql.connector import Error
+from core.tracing import traced
+
+# Utilisateur actif (sans son mot de passe), partagé avec le mode asynchrone de cli.py
+USER_BY_USERNAME_QUERY = (
+    "SELECT u.id, u.username, u.full_name, r.name as role "
+    "FROM users u JOIN roles r ON u.role_id = r.id "
+    "WHERE u.username = %s AND u.is_active"
+)
+
+class UserModel:
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    @traced()
+    def get_by_username(self, username):
+        """Récupère un utilisateur actif (sans son mot de passe), ex: l'opérateur des traitements par lots."""
+        try:
+            return self.db_manager.fetch_prepared(USER_BY_USERNAME_QUERY, (username,), one=True)
+        except Error as e:
+            print(f"Erreur lors de la récupération de l'utilisateur '{username}': {e}")
+            return None
@@ -0,0 +1,205 @@
+import time
+
+from mysql.connector import Error
+from core.reports import split_months
+from core.tracing import traced
+
+# Agrégation par mois, client et taux de la ventilation de TVA enregistrée avec chaque facture
+# (une ligne par facture et par taux, voir models/invoice_totals.py) : source de la table de
+# cumuls comme des balayages partiels.
+# Factures retenues : certifiées (payées ou non), hors achats ; les avoirs comptent en négatif.
+# Tables courantes ou archives (voir models.archive et scan_query).
+SCAN_QUERY = """
+    SELECT DATE_SUB(i.issue_date, INTERVAL DAYOFMONTH(i.issue_date) - 1 DAY) AS period,
+           i.client_id, b.tax_rate,
+           COUNT(*) AS invoice_count,
+           SUM(IF(i.document_type = 'refund', -b.base_ht, b.base_ht)) AS base_ht,
+           SUM(IF(i.document_type = 'refund', -b.vat, b.vat)) AS vat
+    FROM {invoices} i
+    JOIN {breakdown} b ON b.invoice_id = i.id
+    WHERE i.status IN ('certified', 'paid', 'partially_paid')
+      AND i.document_type IN ('sale', 'refund')
+      AND i.issue_date >= %s AND i.issue_date <= %s
+      {extra_condition}
+    GROUP BY period, i.client_id, b.tax_rate
+"""
+
+ROLLUP_COLUMNS = "period, client_id, tax_rate, invoice_count, base_ht, vat"
+
+
+def scan_query(extra_condition="", archive=False):
+    """SCAN_QUERY sur les tables courantes, ou sur les tables d'archive si `archive`."""
+    suffix = "_archive" if archive else ""
+    return SCAN_QUERY.format(invoices=f"invoices{suffix}", breakdown=f"invoice_vat_breakdown{suffix}",
+                             extra_condition=extra_condition)
+
+
+# Ajout aux cumuls existants (les factures archivées d'un mois s'ajoutent à celles encore courantes)
+ROLLUP_MERGE_QUERY = (
+    f"INSERT INTO vat_monthly_rollups ({ROLLUP_COLUMNS}) SELECT * FROM ({{scan}}) AS s "
+    "ON DUPLICATE KEY UPDATE invoice_count = vat_monthly_rollups.invoice_count + s.invoice_count, "
+    "base_ht = vat_monthly_rollups.base_ht + s.base_ht, vat = vat_monthly_rollups.vat + s.vat"
+)
+
+# Recalcul des cumuls du mois et du client d'une facture (partagé avec models.async_invoice)
+ROLLUP_PERIOD_QUERY = (
+    "SELECT client_id, "
+    "DATE_SUB(issue_date, INTERVAL DAYOFMONTH(issue_date) - 1 DAY) AS period, "
+    "LAST_DAY(issue_date) AS period_end "
+    "FROM invoices WHERE id = %s"
+)
+ROLLUP_DELETE_QUERY = "DELETE FROM vat_monthly_rollups WHERE period = %s AND client_id = %s"
+ROLLUP_REFRESH_QUERY = (
+    f"INSERT INTO vat_monthly_rollups ({ROLLUP_COLUMNS}) "
+    + scan_query("AND i.client_id = %s")
+)
+# Recalcul complet d'un (mois, client) : après ROLLUP_DELETE_QUERY, chacune avec (période, fin, client)
+ROLLUP_REFRESH_QUERIES = (
+    ROLLUP_REFRESH_QUERY,
+    ROLLUP_MERGE_QUERY.format(scan=scan_query("AND i.client_id = %s", archive=True)),
+)
+
+# Le recalcul d'un (mois, client) verrouille en lecture les factures du client sur le mois :
+# deux certifications concurrentes peuvent s'interbloquer (1213) ou attendre (1205), on réessaie.
+ROLLUP_RETRY_ERRNOS = (1205, 1213)
+ROLLUP_RETRY_ATTEMPTS = 3
+ROLLUP_RETRY_DELAY_SECONDS = 0.05
+
+class VatRollupModel:
+    """
+    Cumuls mensuels de TVA par client et par taux (table `vat_monthly_rollups`).
+
+    Une ligne résume, pour un mois, un client et un taux, les factures retenues pour la
+    déclaration. Les cumuls d'un (mois, client) sont recalculés dès qu'une facture de ce
+    couple est certifiée : le recalcul est idempotent et ne lit que les factures du client
+    sur le mois. Une période quelconque se calcule en lisant les cumuls des mois complets
+    et en balayant la ventilation des factures des seuls mois partiels aux bornes.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    @traced()
+    def refresh_for_invoice(self, invoice_id):
+        """
+        Recalcule les cumuls du mois et du client de la facture, dans sa propre transaction,
+        à appeler après la validation de la modification de la facture : un échec du recalcul
+        n'annule jamais la facture. Réessayé sur interblocage ou attente de verrou.
+        :return: True si les cumuls sont à jour ; sinon, `rebuild()` les rétablira.
+        """
+        connection = self.db_manager.get_connection()
+        if not connection:
+            return False
+
+        for attempt in range(1, ROLLUP_RETRY_ATTEMPTS + 1):
+            cursor = connection.cursor()
+            try:
+                connection.start_transaction()
+                cursor.execute(ROLLUP_PERIOD_QUERY, (invoice_id,))
+                row = cursor.fetchone()
+                if row:
+                    client_id, period, period_end = row
+                    cursor.execute(ROLLUP_DELETE_QUERY, (period, client_id))
+                    for query in ROLLUP_REFRESH_QUERIES:
+                        cursor.execute(query, (period, period_end, client_id))
+                connection.commit()
+                return True
+            except Error as e:
+                connection.rollback()
+                if e.errno in ROLLUP_RETRY_ERRNOS and attempt < ROLLUP_RETRY_ATTEMPTS:
+                    time.sleep(ROLLUP_RETRY_DELAY_SECONDS * attempt)
+                    continue
+                print(f"Erreur lors du recalcul des cumuls de TVA de la facture {invoice_id}: {e}")
+                return False
+            finally:
+                cursor.close()
+        return False
+
+    @traced()
+    def rebuild(self):
+        """Recalcule entièrement la table des cumuls (après un import ou une correction en masse)."""
+        connection = self.db_manager.get_connection()
+        if not connection:
+            return False
+
+        cursor = connection.cursor()
+        try:
+            connection.start_transaction()
+            cursor.execute("DELETE FROM vat_monthly_rollups")
+            cursor.execute(
+                f"INSERT INTO vat_monthly_rollups ({ROLLUP_COLUMNS}) " + scan_query(),
+                ('1000-01-01', '9999-12-31')
+            )
+            cursor.execute(ROLLUP_MERGE_QUERY.format(scan=scan_query(archive=True)), ('1000-01-01', '9999-12-31'))
+            cursor.execute("SELECT COUNT(*) FROM vat_monthly_rollups")
+            row_count = cursor.fetchone()[0]
+            connection.commit()
+            print(f"Cumuls de TVA recalculés ({row_count} lignes).")
+            return True
+        except Error as e:
+            connection.rollback()
+            print(f"Erreur lors du recalcul des cumuls de TVA: {e}")
+            return False
+        finally:
+            cursor.close()
+
+    @traced()
+    def get_summary(self, start, end, by_client=False):
+        """
+        Chiffre d'affaires HT, TVA et TTC du `start` au `end` inclus, par mois et par taux
+        (et par client si `by_client`).
+        :return: Liste de dicts (period, [client_id, client_name,] tax_rate, invoice_count,
+                 base_ht, vat, total_ttc) triée, ou None en cas d'erreur.
+        Lu sur la réplique si elle est configurée.
+        """
+        connection = self.db_manager.get_read_connection()
+        if not connection:
+            return None
+
+        full_months, partial_ranges = split_months(start, end)
+        cursor = connection.cursor(dictionary=True)
+        rows = []
+        try:
+            if full_months:
+                placeholders = ', '.join(['%s'] * len(full_months))
+                cursor.execute(
+                    f"SELECT {ROLLUP_COLUMNS} FROM vat_monthly_rollups WHERE period IN ({placeholders})",
+                    full_months
+                )
+                rows.extend(cursor.fetchall())
+            for range_start, range_end in partial_ranges:
+                for archive in (False, True):
+                    cursor.execute(scan_query(archive=archive), (range_start, range_end))
+                    rows.extend(cursor.fetchall())
+
+            client_names = {}
+            if by_client and rows:
+                client_ids = sorted({row['client_id'] for row in rows})
+                placeholders = ', '.join(['%s'] * len(client_ids))
+                cursor.execute(f"SELECT id, name FROM clients WHERE id IN ({placeholders})", client_ids)
+                client_names = {row['id']: row['name'] for row in cursor.fetchall()}
+        except Error as e:
+            print(f"Erreur lors du calcul du récapitulatif de TVA: {e}")
+            return None
+        finally:
+            cursor.close()
+
+        # Regroupement en mémoire (les lignes sont déjà agrégées par mois, client et taux)
+        summary = {}
+        for row in rows:
+            key = (row['period'], row['client_id'] if by_client else None, row['tax_rate'])
+            entry = summary.get(key)
+            if entry is None:
+                entry = summary[key] = {'period': row['period'], 'tax_rate': row['tax_rate'],
+                                        'invoice_count': 0, 'base_ht': 0, 'vat': 0}
+                if by_client:
+                    entry['client_id'] = row['client_id']
+                    entry['client_name'] = client_names.get(row['client_id'], f"Client #{row['client_id']}")
+            entry['invoice_count'] += row['invoice_count']
+            entry['base_ht'] += row['base_ht']
+            entry['vat'] += row['vat']
+
+        result = sorted(summary.values(), key=lambda e: (e['period'], e.get('client_name', ''), e['tax_rate']))
+        for entry in result:
+            entry['total_ttc'] = entry['base_ht'] + entry['vat']
+        return result
@@ -1,5 +1,5 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QGridLayout, QGroupBox, QLabel
+    QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QGroupBox, QLabel
 )
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import Qt
@@ -88,3 +88,10 @@ class DashboardView(QWidget):
         self.summary_certified_label.setText(f"Certifiées: {summary.get('certified', 0)}")
         self.summary_paid_label.setText(f"Payées: {summary.get('paid', 0) + summary.get('partially_paid', 0)}")
         self.summary_cancelled_label.setText(f"Annulées: {summary.get('cancelled', 0)}")
+
+    def set_loading(self, loading):
+        """Affiche un curseur d'attente pendant le chargement des statistiques."""
+        if loading:
+            self.setCursor(Qt.CursorShape.BusyCursor)
+        else:
+            self.unsetCursor()
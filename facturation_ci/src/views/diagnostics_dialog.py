@@ -0,0 +1,74 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton,
+    QFileDialog, QMessageBox
+)
+from PyQt6.QtGui import QFont
+
+from core.query_stats import query_stats
+from core.tracing import tracer
+
+class DiagnosticsDialog(QDialog):
+    """Panneau de diagnostic (caché) : statistiques SQL et traces de la session."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.setMinimumSize(1000, 500)
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        main_layout = QVBoxLayout(self)
+
+        self.stats_text = QPlainTextEdit()
+        self.stats_text.setReadOnly(True)
+        self.stats_text.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.stats_text.setFont(QFont("Courier New", 9))
+        main_layout.addWidget(self.stats_text)
+
+        button_layout = QHBoxLayout()
+        self.refresh_button = QPushButton("Rafraîchir")
+        self.reset_button = QPushButton("Réinitialiser")
+        self.print_button = QPushButton("Afficher dans la console")
+        self.trace_button = QPushButton("Exporter la trace...")
+        self.close_button = QPushButton("Fermer")
+        self.refresh_button.clicked.connect(self.refresh)
+        self.reset_button.clicked.connect(self.reset_stats)
+        self.print_button.clicked.connect(lambda: print(query_stats.summary()))
+        self.trace_button.clicked.connect(self.export_trace)
+        self.close_button.clicked.connect(self.accept)
+        button_layout.addWidget(self.refresh_button)
+        button_layout.addWidget(self.reset_button)
+        button_layout.addWidget(self.print_button)
+        button_layout.addWidget(self.trace_button)
+        button_layout.addStretch()
+        button_layout.addWidget(self.close_button)
+        main_layout.addLayout(button_layout)
+
+    def refresh(self):
+        """Recharge le résumé des statistiques SQL."""
+        trace_state = f"activé, {len(tracer.spans())} spans" if tracer.enabled else "désactivé"
+        header = (f"Seuil des requêtes lentes : {query_stats.slow_query_ms} ms\n"
+                  f"Traçage : {trace_state}\n\n")
+        self.stats_text.setPlainText(header + query_stats.summary())
+        self.trace_button.setText("Exporter la trace..." if tracer.enabled else "Activer le traçage")
+
+    def reset_stats(self):
+        query_stats.reset()
+        self.refresh()
+
+    def export_trace(self):
+        """Active le traçage s'il ne l'est pas, ou exporte les spans collectés."""
+        if not tracer.enabled:
+            tracer.enabled = True
+            QMessageBox.information(self, "Traçage", "Traçage activé : reproduisez l'action puis exportez la trace.")
+            self.refresh()
+            return
+
+        filepath, _ = QFileDialog.getSaveFileName(
+            self, "Exporter la trace", "trace.json",
+            "Chrome Trace (*.json);;JSON Lines (*.jsonl)"
+        )
+        if filepath:
+            tracer.export(filepath)
+            QMessageBox.information(self, "Traçage", f"{len(tracer.spans())} spans exportés vers :\n{filepath}")
@@ -5,6 +5,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QStandardItemModel, QStandardItem
 from PyQt6.QtCore import QDate, Qt
+from models.invoice_totals import InvoiceTotals, invoice_totals, line_totals
 
 class InvoiceEditorDialog(QDialog):
     def __init__(self, client_model, product_model, mode='new', invoice_data=None, parent=None):
@@ -19,6 +20,8 @@ class InvoiceEditorDialog(QDialog):
         self.setMinimumSize(800, 600)
 
         self.line_items = [] # Liste de dictionnaires pour les lignes d'articles
+        # Totaux tenus à jour ligne par ligne (voir add_item / remove_item)
+        self.totals = InvoiceTotals()
 
         self.setup_ui()
         self.populate_combos()
@@ -123,7 +126,9 @@ class InvoiceEditorDialog(QDialog):
                         'tax_rate': product['tax_rate']
                     }
                     self.line_items.append(item_data)
-                    self.update_table_and_totals()
+                    self.items_model.appendRow(self._item_row(item_data))
+                    self.totals.add_item(item_data)
+                    self.update_totals_labels()
 
     def remove_item(self):
         selected_rows = self.items_table.selectionModel().selectedRows()
@@ -132,32 +137,37 @@ class InvoiceEditorDialog(QDialog):
             return
 
         row_to_remove = selected_rows[0].row()
+        self.totals.remove_item(self.line_items[row_to_remove])
         del self.line_items[row_to_remove]
-        self.update_table_and_totals()
-
-    def update_table_and_totals(self):
-        """Met à jour le tableau des articles et les totaux."""
+        self.items_model.removeRow(row_to_remove)
+        self.update_totals_labels()
+
+    def _item_row(self, item):
+        """Cellules du tableau pour une ligne d'article."""
+        _, total_ht, _ = line_totals(item)
+        return [
+            QStandardItem(item['description']),
+            QStandardItem(str(item['quantity'])),
+            QStandardItem(f"{item['unit_price']:.2f}"),
+            QStandardItem(f"{total_ht:.2f}")
+        ]
+
+    def update_totals_labels(self):
+        self.subtotal_label.setText(f"{self.totals.subtotal:.2f} €")
+        self.vat_label.setText(f"{self.totals.vat:.2f} €")
+        self.total_label.setText(f"{self.totals.total:.2f} €")
+
+    def update_table_and_totals(self, totals=None):
+        """
+        Reconstruit entièrement le tableau des articles et les totaux (chargement d'une facture).
+        :param totals: Totaux déjà connus (facture enregistrée) ; recalculés des lignes sinon.
+        """
         self.items_model.setRowCount(0) # Vide le tableau
-        subtotal = 0
-        total_vat = 0
-
         for item in self.line_items:
-            total_ht = item['quantity'] * item['unit_price']
-            subtotal += total_ht
-            total_vat += total_ht * (item['tax_rate'] / 100.0)
-
-            row = [
-                QStandardItem(item['description']),
-                QStandardItem(str(item['quantity'])),
-                QStandardItem(f"{item['unit_price']:.2f}"),
-                QStandardItem(f"{total_ht:.2f}")
-            ]
-            self.items_model.appendRow(row)
-
-        grand_total = subtotal + total_vat
-        self.subtotal_label.setText(f"{subtotal:.2f} €")
-        self.vat_label.setText(f"{total_vat:.2f} €")
-        self.total_label.setText(f"{grand_total:.2f} €")
+            self.items_model.appendRow(self._item_row(item))
+
+        self.totals = totals or InvoiceTotals.from_items(self.line_items)
+        self.update_totals_labels()
 
     def load_invoice_data(self):
         """Charge les données d'une facture existante dans le formulaire."""
@@ -176,7 +186,7 @@ class InvoiceEditorDialog(QDialog):
 
         # Lignes d'articles
         self.line_items = items
-        self.update_table_and_totals()
+        self.update_table_and_totals(invoice_totals(self.invoice_data))
 
     def set_read_only(self):
         """Passe tous les contrôles en mode lecture seule."""
@@ -199,17 +209,12 @@ class InvoiceEditorDialog(QDialog):
         if not client_id:
             return None
 
-        # Recalculer les totaux une dernière fois pour s'assurer qu'ils sont corrects
-        subtotal = sum(item['quantity'] * item['unit_price'] for item in self.line_items)
-        total_vat = sum((item['quantity'] * item['unit_price']) * (item['tax_rate'] / 100.0) for item in self.line_items)
-        grand_total = subtotal + total_vat
-
+        # Les totaux sont calculés et enregistrés par InvoiceModel.create
         return {
             "details": {
                 "client_id": client_id,
                 "issue_date": self.issue_date_edit.date().toString("yyyy-MM-dd"),
                 "due_date": self.due_date_edit.date().toString("yyyy-MM-dd"),
-                "total_amount": grand_total,
                 # user_id sera ajouté par le contrôleur
             },
             "items": self.line_items
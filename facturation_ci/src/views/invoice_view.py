@@ -1,11 +1,28 @@
+from decimal import Decimal, InvalidOperation
+
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QLineEdit, QComboBox, QCheckBox, QDateEdit,
     QTableView, QAbstractItemView, QHeaderView
 )
 from PyQt6.QtGui import QStandardItemModel, QStandardItem, QColor
-from PyQt.QtCore import Qt
+from PyQt6.QtCore import Qt, QDate, QTimer, pyqtSignal
+
+# Délai sans saisie avant de lancer la recherche : une requête par pause, pas par touche
+SEARCH_DEBOUNCE_MS = 300
+
+STATUS_LABELS = [
+    ('draft', "Brouillon"), ('certified', "Certifiée"), ('partially_paid', "Partiellement payée"),
+    ('paid', "Payée"), ('cancelled', "Annulée"),
+]
+FNE_STATUS_LABELS = [
+    ('pending', "En attente"), ('processing', "En cours"), ('success', "Certifiée"), ('failed', "Échec"),
+    ('needs_reconciliation', "À rapprocher"),
+]
 
 class InvoiceView(QWidget):
+    # Émis quand les filtres changent (après SEARCH_DEBOUNCE_MS sans nouvelle modification)
+    filters_changed = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setup_ui()
@@ -18,14 +35,20 @@ class InvoiceView(QWidget):
         self.view_button = QPushButton("Consulter / Détailler")
         self.certify_button = QPushButton("Certifier FNE")
         self.pdf_button = QPushButton("Imprimer en PDF")
+        self.payment_button = QPushButton("Enregistrer un paiement")
+        self.reconcile_button = QPushButton("Rapprochement bancaire")
 
         button_layout.addWidget(self.new_button)
         button_layout.addWidget(self.view_button)
         button_layout.addWidget(self.certify_button)
         button_layout.addWidget(self.pdf_button)
+        button_layout.addWidget(self.payment_button)
+        button_layout.addWidget(self.reconcile_button)
         button_layout.addStretch()
         main_layout.addLayout(button_layout)
 
+        self.setup_filters(main_layout)
+
         self.table_view = QTableView()
         self.table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
@@ -38,18 +61,157 @@ class InvoiceView(QWidget):
 
         main_layout.addWidget(self.table_view)
 
+        page_layout = QHBoxLayout()
+        self.previous_button = QPushButton("< Précédente")
+        self.next_button = QPushButton("Suivante >")
+        self.page_label = QLabel()
+        page_layout.addStretch()
+        page_layout.addWidget(self.previous_button)
+        page_layout.addWidget(self.page_label)
+        page_layout.addWidget(self.next_button)
+        main_layout.addLayout(page_layout)
+        self.set_page(1, False)
+
         self.model = QStandardItemModel()
         self.table_view.setModel(self.model)
 
+    def setup_filters(self, main_layout):
+        """Barre de filtres : chaque modification relance le minuteur de recherche."""
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.filters_changed)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("NIM, client ou n° de facture")
+        self.search_edit.setClearButtonEnabled(True)
+        self.status_combo = self._choice_combo("Tous les statuts", STATUS_LABELS)
+        self.fne_status_combo = self._choice_combo("Tous statuts FNE", FNE_STATUS_LABELS)
+        self.client_combo = self._choice_combo("Tous les clients", [])
+
+        self.period_check = QCheckBox("Du")
+        self.date_from_edit = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.date_to_edit = QDateEdit(QDate.currentDate())
+        for date_edit in (self.date_from_edit, self.date_to_edit):
+            date_edit.setCalendarPopup(True)
+            date_edit.setEnabled(False)
+            self.period_check.toggled.connect(date_edit.setEnabled)
+        self.amount_min_edit = QLineEdit()
+        self.amount_min_edit.setPlaceholderText("min")
+        self.amount_max_edit = QLineEdit()
+        self.amount_max_edit.setPlaceholderText("max")
+        self.archive_check = QCheckBox("Inclure les archives")
+        self.archive_check.setToolTip("Factures closes des années archivées (recherche plus lente)")
+        self.reset_button = QPushButton("Réinitialiser")
+        self.reset_button.clicked.connect(self.reset_filters)
+
+        text_layout = QHBoxLayout()
+        text_layout.addWidget(QLabel("Rechercher:"))
+        text_layout.addWidget(self.search_edit, 1)
+        text_layout.addWidget(self.status_combo)
+        text_layout.addWidget(self.fne_status_combo)
+        text_layout.addWidget(self.client_combo)
+        main_layout.addLayout(text_layout)
+
+        range_layout = QHBoxLayout()
+        range_layout.addWidget(self.period_check)
+        range_layout.addWidget(self.date_from_edit)
+        range_layout.addWidget(QLabel("au"))
+        range_layout.addWidget(self.date_to_edit)
+        range_layout.addWidget(QLabel("Montant TTC:"))
+        range_layout.addWidget(self.amount_min_edit)
+        range_layout.addWidget(QLabel("à"))
+        range_layout.addWidget(self.amount_max_edit)
+        range_layout.addStretch()
+        range_layout.addWidget(self.archive_check)
+        range_layout.addWidget(self.reset_button)
+        main_layout.addLayout(range_layout)
+
+        for line_edit in (self.search_edit, self.amount_min_edit, self.amount_max_edit):
+            line_edit.textChanged.connect(self.search_timer.start)
+        for combo in (self.status_combo, self.fne_status_combo, self.client_combo):
+            combo.currentIndexChanged.connect(self.search_timer.start)
+        for date_edit in (self.date_from_edit, self.date_to_edit):
+            date_edit.dateChanged.connect(self.search_timer.start)
+        self.period_check.toggled.connect(self.search_timer.start)
+        self.archive_check.toggled.connect(self.search_timer.start)
+
+    def _choice_combo(self, all_label, choices):
+        combo = QComboBox()
+        combo.addItem(all_label, None)
+        for value, label in choices:
+            combo.addItem(label, value)
+        return combo
+
+    def set_clients(self, clients):
+        """Remplit la liste des clients du filtre en conservant la sélection."""
+        selected = self.client_combo.currentData()
+        self.client_combo.blockSignals(True)
+        self.client_combo.clear()
+        self.client_combo.addItem("Tous les clients", None)
+        for client in clients:
+            self.client_combo.addItem(client['name'], client['id'])
+        self.client_combo.setCurrentIndex(max(self.client_combo.findData(selected), 0))
+        self.client_combo.blockSignals(False)
+
+    def get_filters(self):
+        """Filtres saisis, pour InvoiceModel.search (montants illisibles ignorés)."""
+        filters = {
+            'text': self.search_edit.text().strip(),
+            'status': self.status_combo.currentData(),
+            'fne_status': self.fne_status_combo.currentData(),
+            'client_id': self.client_combo.currentData(),
+            'amount_min': self._amount(self.amount_min_edit),
+            'amount_max': self._amount(self.amount_max_edit),
+        }
+        if self.period_check.isChecked():
+            filters['date_from'] = self.date_from_edit.date().toPyDate()
+            filters['date_to'] = self.date_to_edit.date().toPyDate()
+        return filters
+
+    def include_archive(self):
+        return self.archive_check.isChecked()
+
+    def _amount(self, line_edit):
+        try:
+            return Decimal(line_edit.text().replace(' ', '').replace(',', '.')) if line_edit.text().strip() else None
+        except InvalidOperation:
+            return None
+
+    def reset_filters(self):
+        for widget in (self.search_edit, self.amount_min_edit, self.amount_max_edit, self.status_combo,
+                       self.fne_status_combo, self.client_combo, self.period_check):
+            widget.blockSignals(True)
+        self.search_edit.clear()
+        self.amount_min_edit.clear()
+        self.amount_max_edit.clear()
+        for combo in (self.status_combo, self.fne_status_combo, self.client_combo):
+            combo.setCurrentIndex(0)
+        self.period_check.setChecked(False)
+        for widget in (self.search_edit, self.amount_min_edit, self.amount_max_edit, self.status_combo,
+                       self.fne_status_combo, self.client_combo, self.period_check):
+            widget.blockSignals(False)
+        for date_edit in (self.date_from_edit, self.date_to_edit):
+            date_edit.setEnabled(False)
+        self.search_timer.stop()
+        self.filters_changed.emit()
+
+    def set_page(self, page, has_next):
+        """Met à jour la pagination (page courante à partir de 1)."""
+        self.page_label.setText(f"Page {page}")
+        self.previous_button.setEnabled(page > 1)
+        self.next_button.setEnabled(has_next)
+
     def set_invoices(self, invoices):
         """Remplit le tableau avec la liste des factures."""
         self.model.clear()
-        self.model.setHorizontalHeaderLabels(['ID', 'Date', 'Client', 'Montant Total', 'Statut', 'Statut FNE', 'NIM FNE'])
+        self.model.setHorizontalHeaderLabels(['ID', 'Date', 'Client', 'Montant Total', 'Solde Dû', 'Statut', 'Statut FNE', 'NIM FNE'])
 
         status_colors = {
             'draft': QColor('gray'),
             'certified': QColor('orange'),
             'paid': QColor('lightgreen'),
+            'partially_paid': QColor('khaki'),
             'cancelled': QColor('lightcoral')
         }
 
@@ -59,6 +221,7 @@ class InvoiceView(QWidget):
                 QStandardItem(invoice['issue_date'].strftime('%d-%m-%Y')),
                 QStandardItem(invoice['client_name']),
                 QStandardItem(f"{invoice['total_amount']:.2f} €"),
+                QStandardItem(f"{invoice['balance_due']:.2f} €"),
                 QStandardItem(invoice['status']),
                 QStandardItem(invoice.get('fne_status', 'N/A')),
                 QStandardItem(invoice.get('fne_nim', ''))
@@ -75,6 +238,13 @@ class InvoiceView(QWidget):
         self.table_view.resizeColumnsToContents()
         self.table_view.setColumnHidden(0, True) # Cacher l'ID
 
+    def set_loading(self, loading):
+        """Affiche un curseur d'attente sur le tableau pendant un chargement."""
+        if loading:
+            self.table_view.viewport().setCursor(Qt.CursorShape.BusyCursor)
+        else:
+            self.table_view.viewport().unsetCursor()
+
     def get_selected_invoice_id(self):
         """Retourne l'ID de la facture sélectionnée."""
         selected_indexes = self.table_view.selectionModel().selectedRows()
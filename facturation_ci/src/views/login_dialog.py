@@ -2,9 +2,12 @@ from PyQt6.QtWidgets import (
     QDialog, QLineEdit, QPushButton, QVBoxLayout,
     QFormLayout, QLabel, QMessageBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 
 class LoginDialog(QDialog):
+    # Émis à la validation ; la vérification se fait hors du thread de l'interface
+    login_requested = pyqtSignal(str, str)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Connexion")
@@ -30,7 +33,7 @@ class LoginDialog(QDialog):
         self.cancel_button = QPushButton("Annuler")
 
         # Connecter les signaux aux slots
-        self.login_button.clicked.connect(self.accept)
+        self.login_button.clicked.connect(self.submit)
         self.cancel_button.clicked.connect(self.reject)
 
         # Ajouter les boutons au layout
@@ -42,6 +45,29 @@ class LoginDialog(QDialog):
         # Rendre le bouton de connexion par défaut
         self.login_button.setDefault(True)
 
+    def submit(self):
+        """Demande la vérification des identifiants et passe le dialogue en attente."""
+        username, password = self.get_credentials()
+        if not username or not password:
+            QMessageBox.warning(self, "Champs requis", "Veuillez saisir le nom d'utilisateur et le mot de passe.")
+            return
+        self.set_busy(True)
+        self.login_requested.emit(username, password)
+
+    def set_busy(self, busy):
+        """Désactive le formulaire pendant la vérification des identifiants."""
+        self.username_input.setEnabled(not busy)
+        self.password_input.setEnabled(not busy)
+        self.login_button.setEnabled(not busy)
+        self.login_button.setText("Vérification..." if busy else "Connexion")
+
+    def show_login_error(self, message):
+        """Réactive le formulaire après un échec et affiche le message."""
+        self.set_busy(False)
+        QMessageBox.warning(self, "Échec de la connexion", message)
+        self.password_input.clear()
+        self.password_input.setFocus()
+
     def get_credentials(self):
         """Retourne le nom d'utilisateur et le mot de passe saisis."""
         return self.username_input.text().strip(), self.password_input.text()
@@ -53,6 +79,7 @@ if __name__ == '__main__':
 
     app = QApplication(sys.argv)
     dialog = LoginDialog()
+    dialog.login_requested.connect(lambda username, password: dialog.accept())
 
     # exec() retourne QDialog.DialogCode.Accepted ou QDialog.DialogCode.Rejected
     if dialog.exec():
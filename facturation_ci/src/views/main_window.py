@@ -1,15 +1,22 @@
 from PyQt6.QtWidgets import (
-    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QListWidget, QStackedWidget, QLabel, QListWidgetItem
 )
-from PyQt6.QtGui import QIcon
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtGui import QIcon, QShortcut, QKeySequence
+from PyQt6.QtCore import Qt, QSize, QTimer, pyqtSignal
 
 class MainWindow(QMainWindow):
+    # Émis une seule fois, lors du premier affichage effectif de la fenêtre
+    first_painted = pyqtSignal()
+
     def __init__(self, user_data, parent=None):
         super().__init__(parent)
 
         self.user_data = user_data
+        # Modules (contrôleurs) créés à la première visite de leur onglet
+        self._module_factories = {}
+        self._modules = {}
+        self._first_paint_done = False
         self.setWindowTitle("Logiciel de Facturation")
         self.setGeometry(100, 100, 1200, 700)
 
@@ -45,6 +52,10 @@ class MainWindow(QMainWindow):
         # Sélectionner le premier élément par défaut
         self.nav_menu.setCurrentRow(0)
 
+        # Raccourci caché vers le panneau de diagnostic (statistiques SQL)
+        self.diagnostics_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self.diagnostics_shortcut.activated.connect(self.open_diagnostics)
+
     def add_view(self, name, widget):
         """Ajoute une vue au menu de navigation et au QStackedWidget."""
         # Pour l'instant, on utilise le widget passé. Plus tard, ce sera une classe de vue.
@@ -55,18 +66,58 @@ class MainWindow(QMainWindow):
         # item.setIcon(QIcon("path/to/icon.png"))
         self.nav_menu.addItem(item)
 
+    def set_user(self, user_data):
+        """Associe l'utilisateur connecté (la fenêtre peut être construite avant l'authentification)."""
+        self.user_data = user_data
+        self.statusBar().showMessage(f"Connecté en tant que: {user_data['full_name']} ({user_data['role']})")
+
+    def register_module(self, index, factory):
+        """
+        Enregistre le constructeur du module affiché à l'index `index`.
+        Le module (contrôleur + vue) n'est créé, et ses données chargées,
+        qu'à la première navigation vers son onglet.
+        :param factory: Callable sans argument retournant le contrôleur.
+        """
+        self._module_factories[index] = factory
+
+    def ensure_module(self, index):
+        """Crée le module de l'onglet `index` s'il ne l'est pas encore et le retourne."""
+        if index in self._modules or index not in self._module_factories:
+            return self._modules.get(index)
+
+        self.statusBar().showMessage("Chargement du module...")
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            self._modules[index] = self._module_factories[index]()
+        finally:
+            QApplication.restoreOverrideCursor()
+        return self._modules[index]
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_paint_done:
+            self._first_paint_done = True
+            self.first_painted.emit()
+            # La fenêtre est visible : on peut maintenant charger le module courant
+            QTimer.singleShot(0, self.change_view)
+
     def change_view(self):
         """Change la vue affichée dans le QStackedWidget en fonction du menu."""
         selected_row = self.nav_menu.currentRow()
+        self.ensure_module(selected_row)
         self.stacked_widget.setCurrentIndex(selected_row)
 
         # Mettre à jour la barre de statut
         selected_item = self.nav_menu.item(selected_row)
         self.statusBar().showMessage(f"Module : {selected_item.text()}")
 
+    def open_diagnostics(self):
+        """Ouvre le panneau de diagnostic."""
+        from views.diagnostics_dialog import DiagnosticsDialog
+        DiagnosticsDialog(self).exec()
+
 # Pour tester cette fenêtre seule
 if __name__ == '__main__':
-    from PyQt6.QtWidgets import QApplication
     import sys
 
     app = QApplication(sys.argv)
@@ -0,0 +1,94 @@
+from decimal import Decimal, InvalidOperation
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QFormLayout, QLineEdit, QComboBox, QDateEdit,
+    QLabel, QTableView, QDialogButtonBox, QMessageBox, QAbstractItemView, QHeaderView
+)
+from PyQt6.QtGui import QStandardItemModel, QStandardItem, QDoubleValidator
+from PyQt6.QtCore import QDate
+
+PAYMENT_METHODS = ['Virement', 'Espèces', 'Chèque', 'Mobile Money', 'Carte bancaire']
+
+class PaymentDialog(QDialog):
+    """Saisie d'un paiement sur une facture, avec l'historique des paiements déjà reçus."""
+
+    def __init__(self, invoice_details, payments, parent=None):
+        super().__init__(parent)
+        self.invoice_details = invoice_details
+        self.balance_due = Decimal(invoice_details['balance_due'])
+
+        self.setWindowTitle(f"Paiement de la facture #{invoice_details['id']}")
+        self.setMinimumWidth(500)
+        self.setup_ui(payments)
+
+    def setup_ui(self, payments):
+        main_layout = QVBoxLayout(self)
+
+        summary_layout = QFormLayout()
+        summary_layout.addRow("Montant total:", QLabel(f"{self.invoice_details['total_amount']:.2f} €"))
+        summary_layout.addRow("Déjà réglé:", QLabel(f"{self.invoice_details['amount_paid']:.2f} €"))
+        summary_layout.addRow("Solde restant dû:", QLabel(f"{self.balance_due:.2f} €"))
+        main_layout.addLayout(summary_layout)
+
+        if payments:
+            history_table = QTableView()
+            history_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+            history_table.verticalHeader().setVisible(False)
+            history_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+            history_model = QStandardItemModel()
+            history_model.setHorizontalHeaderLabels(['Date', 'Montant', 'Mode', 'Référence'])
+            for payment in payments:
+                history_model.appendRow([
+                    QStandardItem(payment['payment_date'].strftime('%d-%m-%Y')),
+                    QStandardItem(f"{payment['amount']:.2f} €"),
+                    QStandardItem(payment['payment_method'] or ''),
+                    QStandardItem(payment['reference'] or ''),
+                ])
+            history_table.setModel(history_model)
+            main_layout.addWidget(history_table)
+
+        form_layout = QFormLayout()
+        self.date_edit = QDateEdit(QDate.currentDate())
+        self.date_edit.setCalendarPopup(True)
+        self.amount_edit = QLineEdit(f"{self.balance_due:.2f}")
+        self.amount_edit.setValidator(QDoubleValidator(0.01, float(self.balance_due), 2))
+        self.method_combo = QComboBox()
+        self.method_combo.addItems(PAYMENT_METHODS)
+        self.reference_edit = QLineEdit()
+        self.reference_edit.setMaxLength(100)
+        form_layout.addRow("Date du paiement:", self.date_edit)
+        form_layout.addRow("Montant:", self.amount_edit)
+        form_layout.addRow("Mode de paiement:", self.method_combo)
+        form_layout.addRow("Référence:", self.reference_edit)
+        main_layout.addLayout(form_layout)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        main_layout.addWidget(button_box)
+
+    def _amount(self):
+        try:
+            return Decimal(self.amount_edit.text().replace(',', '.')).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            return None
+
+    def accept(self):
+        amount = self._amount()
+        if amount is None or amount <= 0:
+            QMessageBox.warning(self, "Montant invalide", "Veuillez saisir un montant positif.")
+            return
+        if amount > self.balance_due:
+            QMessageBox.warning(self, "Montant invalide",
+                                f"Le montant dépasse le solde restant dû ({self.balance_due:.2f} €).")
+            return
+        super().accept()
+
+    def get_data(self):
+        """Retourne le paiement saisi, au format de PaymentModel.create."""
+        return {
+            'invoice_id': self.invoice_details['id'],
+            'payment_date': self.date_edit.date().toPyDate(),
+            'amount': self._amount(),
+            'payment_method': self.method_combo.currentText(),
+            'reference': self.reference_edit.text().strip() or None,
+        }
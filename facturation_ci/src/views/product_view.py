@@ -3,6 +3,7 @@ from PyQt6.QtWidgets import (
     QTableView, QAbstractItemView, QHeaderView
 )
 from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from PyQt6.QtCore import Qt
 
 class ProductView(QWidget):
     def __init__(self, parent=None):
@@ -57,6 +58,13 @@ class ProductView(QWidget):
 
         self.table_view.setColumnHidden(0, True)
 
+    def set_loading(self, loading):
+        """Affiche un curseur d'attente sur le tableau pendant un chargement."""
+        if loading:
+            self.table_view.viewport().setCursor(Qt.CursorShape.BusyCursor)
+        else:
+            self.table_view.viewport().unsetCursor()
+
     def get_selected_product_id(self):
         """Retourne l'ID du produit sélectionné dans le tableau."""
         selected_indexes = self.table_view.selectionModel().selectedRows()
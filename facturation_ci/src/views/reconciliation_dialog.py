@@ -0,0 +1,62 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QLabel, QTabWidget, QTableView,
+    QDialogButtonBox, QAbstractItemView, QHeaderView
+)
+from PyQt6.QtGui import QStandardItemModel, QStandardItem
+
+class ReconciliationDialog(QDialog):
+    """Aperçu d'un rapprochement bancaire avant l'enregistrement des paiements."""
+
+    def __init__(self, payments, unmatched, errors, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Rapprochement bancaire")
+        self.setMinimumSize(800, 500)
+        self.setup_ui(payments, unmatched, errors)
+
+    def _create_table(self, headers, rows):
+        table = QTableView()
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        model = QStandardItemModel()
+        model.setHorizontalHeaderLabels(headers)
+        for row in rows:
+            model.appendRow([QStandardItem(str(value)) for value in row])
+        table.setModel(model)
+        return table
+
+    def setup_ui(self, payments, unmatched, errors):
+        main_layout = QVBoxLayout(self)
+
+        total = sum(p['amount'] for p in payments)
+        main_layout.addWidget(QLabel(
+            f"{len(payments)} paiement(s) rapproché(s) pour {total:.2f} €, "
+            f"{len(unmatched)} ligne(s) à traiter manuellement, {len(errors)} ligne(s) illisible(s)."
+        ))
+
+        tabs = QTabWidget()
+        tabs.addTab(self._create_table(
+            ['Ligne', 'Date', 'Montant', 'Facture', 'Client', 'Rapprochement', 'Libellé'],
+            [(p['line_number'], p['payment_date'].strftime('%d-%m-%Y'), f"{p['amount']:.2f} €",
+              f"#{p['invoice_id']}", p.get('client_name') or '', p['match'], p['reference'] or '')
+             for p in payments]
+        ), f"Rapprochés ({len(payments)})")
+        tabs.addTab(self._create_table(
+            ['Ligne', 'Date', 'Montant', 'Motif', 'Libellé'],
+            [(line['line_number'], line['date'].strftime('%d-%m-%Y'), f"{line['amount']:.2f} €",
+              line['reason'], line['label']) for line in unmatched]
+        ), f"Non rapprochés ({len(unmatched)})")
+        if errors:
+            tabs.addTab(self._create_table(['Erreur'], [(error,) for error in errors]),
+                        f"Erreurs ({len(errors)})")
+        main_layout.addWidget(tabs)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        ok_button = button_box.button(QDialogButtonBox.StandardButton.Ok)
+        ok_button.setText("Enregistrer les paiements")
+        ok_button.setEnabled(bool(payments))
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        main_layout.addWidget(button_box)
@@ -0,0 +1,103 @@
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QDateEdit, QCheckBox,
+    QTabWidget, QTableView, QAbstractItemView, QHeaderView
+)
+from PyQt6.QtGui import QStandardItemModel, QStandardItem, QFont
+from PyQt6.QtCore import QDate, Qt
+
+class ReportTab(QWidget):
+    """Onglet générique d'un rapport : paramètres, boutons Actualiser / Exporter et tableau."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        main_layout = QVBoxLayout(self)
+
+        self.parameters_layout = QHBoxLayout()
+        self.refresh_button = QPushButton("Actualiser")
+        self.export_button = QPushButton("Exporter en CSV")
+        self.export_button.setEnabled(False)
+        self.parameters_layout.addStretch()
+        self.parameters_layout.addWidget(self.refresh_button)
+        self.parameters_layout.addWidget(self.export_button)
+        main_layout.addLayout(self.parameters_layout)
+
+        self.title_label = QLabel()
+        self.title_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        main_layout.addWidget(self.title_label)
+
+        self.table_view = QTableView()
+        self.table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.verticalHeader().setVisible(False)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table_view.horizontalHeader().setStretchLastSection(True)
+        main_layout.addWidget(self.table_view)
+
+        self.model = QStandardItemModel()
+        self.table_view.setModel(self.model)
+
+    def add_parameter(self, label, widget):
+        """Ajoute un champ de paramètre avant les boutons."""
+        # Les trois derniers éléments sont l'espacement et les deux boutons
+        index = self.parameters_layout.count() - 3
+        self.parameters_layout.insertWidget(index, QLabel(label))
+        self.parameters_layout.insertWidget(index + 1, widget)
+
+    def set_report(self, report):
+        """Affiche un core.reports.Report (la dernière ligne est le total, en gras)."""
+        self.model.clear()
+        self.model.setHorizontalHeaderLabels([label for _, label in report.columns])
+        bold = QFont()
+        bold.setBold(True)
+        table = report.to_table()
+        for index, values in enumerate(table):
+            row = [QStandardItem(value) for value in values]
+            for column, item in enumerate(row):
+                if column > 0:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                if report.totals and index == len(table) - 1:
+                    item.setFont(bold)
+            self.model.appendRow(row)
+        self.title_label.setText(report.title)
+        self.export_button.setEnabled(True)
+
+    def set_loading(self, loading):
+        """Désactive le bouton Actualiser et affiche un curseur d'attente pendant le calcul."""
+        self.refresh_button.setEnabled(not loading)
+        if loading:
+            self.table_view.viewport().setCursor(Qt.CursorShape.BusyCursor)
+        else:
+            self.table_view.viewport().unsetCursor()
+
+
+class ReportsView(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setup_ui()
+
+    def setup_ui(self):
+        main_layout = QVBoxLayout(self)
+        self.tabs = QTabWidget()
+
+        # --- Balance âgée ---
+        self.aged_tab = ReportTab()
+        self.aged_date_edit = QDateEdit(QDate.currentDate())
+        self.aged_date_edit.setCalendarPopup(True)
+        self.aged_tab.add_parameter("Au:", self.aged_date_edit)
+        self.tabs.addTab(self.aged_tab, "Balance âgée")
+
+        # --- Récapitulatif de TVA (mois précédent par défaut) ---
+        self.vat_tab = ReportTab()
+        first_of_month = QDate.currentDate().addDays(1 - QDate.currentDate().day())
+        self.vat_start_edit = QDateEdit(first_of_month.addMonths(-1))
+        self.vat_start_edit.setCalendarPopup(True)
+        self.vat_end_edit = QDateEdit(first_of_month.addDays(-1))
+        self.vat_end_edit.setCalendarPopup(True)
+        self.vat_by_client_check = QCheckBox("Par client")
+        self.vat_tab.add_parameter("Du:", self.vat_start_edit)
+        self.vat_tab.add_parameter("Au:", self.vat_end_edit)
+        self.vat_tab.parameters_layout.insertWidget(self.vat_tab.parameters_layout.count() - 3,
+                                                    self.vat_by_client_check)
+        self.tabs.addTab(self.vat_tab, "TVA")
+
+        main_layout.addWidget(self.tabs)
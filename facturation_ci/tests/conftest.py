@@ -0,0 +1,196 @@
+"""
+Tests sans base de données ni interface : les modules de `src` sont importés
+comme par l'application (voir aussi benchmarks/harness.py), et MySQL est remplacé
+par un bouchon en mémoire (fixture `mysql_stub`).
+
+    python -m pytest -q tests
+"""
+import itertools
+import os
+import sys
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+import mysql.connector
+from mysql.connector import pooling
+
+from core.db_manager import DBManager
+
+
+class StubCursor:
+    """Curseur du bouchon : journalise chaque requête et rend les lignes prévues par le serveur."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = -1
+        self.lastrowid = None
+        self.closed = False
+        self._rows = []
+
+    def execute(self, query, params=()):
+        server = self.connection.server
+        self.connection.in_transaction = True
+        server.log.append((self.connection.host, ' '.join(query.split()), tuple(params or ())))
+        error = server.error_for(query, params)
+        if error is not None:
+            server.rejected.add(len(server.log) - 1)
+            raise error
+        self._rows = list(server.rows_for(query))
+        if query.lstrip().upper().startswith('INSERT'):
+            self.lastrowid = next(server.ids)
+        self.rowcount = len(self._rows) if query.lstrip().upper().startswith('SELECT') else server.rowcount
+
+    def executemany(self, query, seq_params):
+        seq_params = list(seq_params)
+        self.connection.server.batches.append((' '.join(query.split()), len(seq_params)))
+        for params in seq_params:
+            self.execute(query, params)
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def close(self):
+        self.closed = True
+
+
+class StubConnection:
+    """Connexion du bouchon : transactions et fermeture journalisées par le serveur."""
+
+    def __init__(self, server, host, database, pooled=False):
+        self.server = server
+        self.host = host
+        self.database = database
+        self.pooled = pooled
+        self.connected = True
+        self.in_transaction = False
+
+    def is_connected(self):
+        return self.connected
+
+    def cursor(self, *args, **kwargs):
+        return StubCursor(self)
+
+    def start_transaction(self):
+        self.in_transaction = True
+
+    def commit(self):
+        self.in_transaction = False
+        self.server.events.append((self.host, 'commit'))
+
+    def rollback(self):
+        self.in_transaction = False
+        self.server.events.append((self.host, 'rollback'))
+
+    def close(self):
+        # Une connexion de pool retourne au pool avec l'état de sa session (pool_reset_session=False)
+        self.server.events.append((self.host, 'release' if self.pooled else 'close'))
+        if not self.pooled:
+            self.connected = False
+
+
+class StubServer:
+    """
+    Serveurs MySQL simulés, identifiés par leur hôte. `rules` associe un fragment de
+    requête aux lignes rendues ; `errors` à l'exception levée (éventuellement pour certains
+    paramètres seulement), `rejected` les index du journal des requêtes refusées ;
+    `down` liste les hôtes injoignables ; `batches` les appels à executemany.
+    """
+
+    def __init__(self):
+        self.rules = []
+        self.errors = []
+        self.down = set()
+        self.rowcount = 1
+        self.ids = itertools.count(1)
+        self.log = []
+        self.rejected = set()
+        self.batches = []
+        self.events = []
+        self.connections = []
+
+    def on(self, fragment, rows):
+        self.rules.insert(0, (fragment, rows))
+
+    def fail(self, fragment, error, times=1, when=None):
+        self.errors.append([fragment, error, times, when])
+
+    def rows_for(self, query):
+        for fragment, rows in self.rules:
+            if fragment in query:
+                return rows
+        return []
+
+    def error_for(self, query, params=()):
+        for rule in self.errors:
+            fragment, error, times, when = rule
+            if fragment in query and times > 0 and (when is None or when(params)):
+                rule[2] -= 1
+                return error
+        return None
+
+    def connect(self, host=None, database=None, pooled=False, **kwargs):
+        if host in self.down:
+            raise mysql.connector.InterfaceError(f"Can't connect to MySQL server on '{host}'")
+        connection = StubConnection(self, host, database, pooled)
+        self.connections.append(connection)
+        return connection
+
+    def queries(self, host=None, fragment=''):
+        """Requêtes reçues (par l'hôte `host` si indiqué) contenant `fragment`."""
+        return [query for query_host, query, _ in self.log
+                if (host is None or query_host == host) and fragment in query]
+
+    def executed(self, prefix):
+        """Paramètres des requêtes commençant par `prefix` exécutées sans erreur."""
+        return [params for index, (_, query, params) in enumerate(self.log)
+                if query.startswith(prefix) and index not in self.rejected]
+
+
+class StubPool:
+    """Remplace MySQLConnectionPool : une connexion « de pool » neuve par emprunt."""
+
+    def __init__(self, server, pool_size=5, pool_name=None, pool_reset_session=True, **connect_args):
+        self.server = server
+        self.connect_args = connect_args
+
+    def get_connection(self):
+        return self.server.connect(pooled=True, **self.connect_args)
+
+    def _remove_connections(self):
+        pass
+
+
+@pytest.fixture
+def mysql_stub(monkeypatch):
+    """Serveur simulé branché sur mysql.connector ; les DBManager créés sont oubliés en fin de test."""
+    server = StubServer()
+    monkeypatch.setattr(mysql.connector, 'connect', server.connect)
+    monkeypatch.setattr(pooling, 'MySQLConnectionPool', lambda **kwargs: StubPool(server, **kwargs))
+    known = dict(DBManager._instances)
+    yield server
+    for tenant, instance in list(DBManager._instances.items()):
+        if tenant not in known:
+            instance.close()
+            del DBManager._instances[tenant]
+
+
+@pytest.fixture
+def db_manager(mysql_stub):
+    """Gestionnaire d'une entité de test (hôte 'primary'), sans réplique."""
+    return DBManager('primary', 'facturation_test', 'test', 'secret', tenant='test')
+
+
+@pytest.fixture(autouse=True)
+def no_audit(monkeypatch):
+    """Le journal d'audit partagé n'écrit rien pendant les tests (voir test_audit pour ses propres instances)."""
+    from core.audit import audit_log
+    monkeypatch.setattr(audit_log, 'enabled', False)
@@ -0,0 +1,193 @@
+"""
+Certification asynchrone (AsyncCertificationService, run_bounded) sur des bouchons :
+pool aiomysql et client httpx simulés, sans les dépendances facultatives.
+"""
+import asyncio
+import datetime
+from contextlib import asynccontextmanager
+
+import pytest
+
+import core.async_certification as async_certification
+from core.async_certification import AsyncCertificationService, run_bounded
+from core.certification import CertificationError, CertificationNotSavedError
+from core.fne_client import FNEClientError
+
+OPERATOR = {'id': 1, 'username': 'admin'}
+
+
+class StubAsyncCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rowcount = -1
+        self._rows = []
+
+    async def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+
+class StubAsyncDB:
+    """Remplace AsyncDBManager : brouillons en mémoire, requêtes journalisées."""
+
+    tenant = 'test'
+
+    def __init__(self, invoice_count):
+        self.invoices = {invoice_id: {'id': invoice_id, 'client_id': 1, 'status': 'draft', 'version': 0,
+                                      'fne_status': 'pending', 'issue_date': datetime.date(2026, 1, 5)}
+                         for invoice_id in range(1, invoice_count + 1)}
+        self.log = []
+        self.fail_success_update = False
+
+    async def fetch_all(self, query, params=()):
+        await asyncio.sleep(0)
+        if query.startswith("SELECT * FROM invoices WHERE id"):
+            invoice = self.invoices.get(params[0])
+            return [dict(invoice)] if invoice else []
+        if "FROM clients" in query:
+            return [{'id': 1, 'name': 'Client'}]
+        return []
+
+    async def fetch_one(self, query, params=()):
+        rows = await self.fetch_all(query, params)
+        return rows[0] if rows else None
+
+    async def execute(self, cursor, query, params=()):
+        await asyncio.sleep(0)
+        statement = ' '.join(query.split())
+        self.log.append((statement, tuple(params)))
+        invoice = self.invoices.get(params[0]) if params else None
+        cursor.rowcount = 0
+        if "SET fne_status = 'processing'" in statement:
+            if invoice and invoice['version'] == params[1] and invoice['fne_status'] != 'processing':
+                invoice.update(fne_status='processing', version=invoice['version'] + 1)
+                cursor.rowcount = 1
+        elif statement.startswith("UPDATE invoices SET fne_status = %s"):
+            fne_status, nim, invoice_id, version = params[0], params[1], params[5], params[6]
+            invoice = self.invoices[invoice_id]
+            if invoice['version'] == version and not (fne_status == 'success' and self.fail_success_update):
+                invoice.update(fne_status=fne_status, fne_nim=nim, version=version + 1,
+                               status='certified' if fne_status == 'success' else invoice['status'])
+                cursor.rowcount = 1
+        elif "'needs_reconciliation'," in statement:
+            invoice = self.invoices[params[3]]
+            invoice.update(fne_status='needs_reconciliation', fne_nim=params[0])
+            cursor.rowcount = 1
+        elif "LAST_DAY(issue_date)" in statement:
+            cursor._rows = [{'client_id': 1, 'period': datetime.date(2026, 1, 1),
+                             'period_end': datetime.date(2026, 1, 31)}]
+        return cursor
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield StubAsyncCursor(self)
+
+
+class StubFNEClient:
+    """Remplace AsyncFNEClient : NIM déterministe, latence simulée, appels simultanés comptés."""
+
+    latency = 0.01
+    refuse = ()
+
+    def __init__(self, api_key, base_url=None, timeout=None, max_connections=20):
+        self.calls = []
+        self.in_flight = self.max_in_flight = 0
+
+    async def certify_document(self, invoice_data, company_info, client_info, user_info):
+        invoice_id = invoice_data['details']['id']
+        self.calls.append(invoice_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if invoice_id in self.refuse:
+            raise FNEClientError("Erreur API FNE (400): refusé", 400)
+        return {'nim': f"NIM-{invoice_id:04d}", 'qr_code': f"QR-{invoice_id}"}
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def stub_fne(monkeypatch):
+    monkeypatch.setattr(async_certification, 'AsyncFNEClient', StubFNEClient)
+    monkeypatch.setattr(StubFNEClient, 'refuse', ())
+
+
+def certify_all(db, invoice_ids, concurrency):
+    """Certifie `invoice_ids` comme `cli.py certify --async` : (service, {id: (résultat, erreur)})."""
+    async def run():
+        service = AsyncCertificationService(db, {'tax_id': 'CI-1'}, 'cle-test', max_connections=concurrency)
+        results = {}
+        async for invoice_id, result, error in run_bounded(invoice_ids, lambda i: service.certify(i, OPERATOR),
+                                                           concurrency):
+            results[invoice_id] = (result, error)
+        return service, results
+    return asyncio.run(run())
+
+
+def test_run_bounded_limits_concurrency_and_collects_errors():
+    running, peak = 0, 0
+
+    async def task(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001 * (item % 3))
+        running -= 1
+        if item == 5:
+            raise ValueError("échec")
+        return item * 2
+
+    async def run():
+        return [result async for result in run_bounded(range(20), task, 4)]
+
+    results = asyncio.run(run())
+    assert peak == 4
+    assert sorted(item for item, _, _ in results) == list(range(20))
+    errors = {item: error for item, _, error in results if error is not None}
+    assert list(errors) == [5] and isinstance(errors[5], ValueError)
+    assert all(result == item * 2 for item, result, error in results if error is None)
+
+
+def test_batch_is_certified_concurrently(stub_fne):
+    db = StubAsyncDB(30)
+    service, results = certify_all(db, list(db.invoices), concurrency=8)
+
+    assert all(error is None for _, error in results.values())
+    assert {invoice_id: result['nim'] for invoice_id, (result, _) in results.items()} == \
+        {invoice_id: f"NIM-{invoice_id:04d}" for invoice_id in db.invoices}
+    assert all(invoice['status'] == 'certified' for invoice in db.invoices.values())
+    assert service.fne_client.max_in_flight == 8
+    # Cumuls recalculés une fois par facture, après l'enregistrement du NIM
+    assert sum(statement.startswith("DELETE FROM vat_monthly_rollups") for statement, _ in db.log) == 30
+
+
+def test_invoice_is_sent_to_fne_only_once(stub_fne):
+    db = StubAsyncDB(3)
+    service, results = certify_all(db, [1, 2, 1, 3, 1], concurrency=5)
+
+    assert sorted(service.fne_client.calls) == [1, 2, 3]
+    errors = [error for _, error in results.values() if error is not None]
+    assert all(isinstance(error, CertificationError) for error in errors)
+
+
+def test_refusal_is_recorded_and_other_invoices_continue(stub_fne, monkeypatch):
+    monkeypatch.setattr(StubFNEClient, 'refuse', (2,))
+    db = StubAsyncDB(3)
+    _, results = certify_all(db, [1, 2, 3], concurrency=3)
+
+    assert isinstance(results[2][1], FNEClientError)
+    assert db.invoices[2]['fne_status'] == 'failed' and db.invoices[2]['status'] == 'draft'
+    assert db.invoices[1]['status'] == db.invoices[3]['status'] == 'certified'
+
+
+def test_unsaved_nim_is_kept_for_reconciliation(stub_fne):
+    db = StubAsyncDB(1)
+    db.fail_success_update = True
+    _, results = certify_all(db, [1], concurrency=1)
+
+    assert isinstance(results[1][1], CertificationNotSavedError)
+    assert db.invoices[1]['fne_status'] == 'needs_reconciliation'
+    assert db.invoices[1]['fne_nim'] == "NIM-0001"
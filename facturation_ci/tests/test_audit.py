@@ -0,0 +1,122 @@
+"""Journal d'audit (AuditLog) : tampon, écritures groupées, reprise et rejet des lignes invalides (bouchon MySQL)."""
+import time
+
+import pytest
+from mysql.connector import DataError, OperationalError
+
+from core.audit import AuditLog, USERNAME_MAX_LENGTH
+
+INSERT = "INSERT INTO audit_log"
+OPERATOR = {'id': 1, 'username': 'admin'}
+
+
+def inserted(mysql_stub):
+    """Lignes insérées dans audit_log (paramètres de chaque INSERT réussi)."""
+    return mysql_stub.executed(INSERT)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def audit():
+    log = AuditLog(flush_interval=60, buffer_size=3)
+    log.set_actor(OPERATOR)
+    yield log
+    log.close()
+
+
+def test_record_is_buffered_until_flush(mysql_stub, db_manager, audit):
+    for invoice_id in (1, 2):
+        audit.record(db_manager, 'create', 'invoice', invoice_id, {'total': 10})
+    assert not mysql_stub.queries(fragment=INSERT)
+
+    assert audit.flush() == 2
+    rows = inserted(mysql_stub)
+    assert [(row[2], row[4], row[5], row[6]) for row in rows] == [('admin', 'create', 'invoice', 1),
+                                                                   ('admin', 'create', 'invoice', 2)]
+    assert rows[0][7] == '{"total": 10}'
+    # Une seule instruction multi-lignes, validée une fois
+    assert [size for _, size in mysql_stub.batches] == [2]
+    assert mysql_stub.events.count(('primary', 'commit')) == 1
+
+
+def test_flush_writes_one_batch_per_buffer_size(mysql_stub, db_manager, audit):
+    for invoice_id in range(7):
+        audit.record(db_manager, 'print', 'invoice', invoice_id)
+    audit.flush()
+
+    assert [size for _, size in mysql_stub.batches] == [3, 3, 1]
+
+
+def test_full_buffer_is_written_by_the_background_thread(mysql_stub, db_manager, audit):
+    for invoice_id in range(3):
+        audit.record(db_manager, 'print', 'invoice', invoice_id)
+
+    assert wait_for(lambda: len(inserted(mysql_stub)) == 3)
+    # Le thread d'écriture rend sa connexion au pool sans transaction ouverte
+    assert wait_for(lambda: ('primary', 'release') in mysql_stub.events)
+    assert ('primary', 'rollback') in mysql_stub.events
+
+
+def test_timer_flushes_a_partial_buffer(mysql_stub, db_manager):
+    audit = AuditLog(flush_interval=0.05, buffer_size=100)
+    try:
+        audit.record(db_manager, 'login', 'user', 1, user=OPERATOR)
+        assert wait_for(lambda: len(inserted(mysql_stub)) == 1)
+    finally:
+        audit.close()
+
+
+def test_lost_connection_requeues_events(mysql_stub, db_manager, audit):
+    mysql_stub.fail(INSERT, OperationalError(msg="Lost connection", errno=2013))
+    audit.record(db_manager, 'create', 'invoice', 1)
+    audit.record(db_manager, 'create', 'invoice', 2)
+
+    assert audit.flush() == 0
+    assert not inserted(mysql_stub)
+    assert audit.flush() == 2
+    assert [row[6] for row in inserted(mysql_stub)] == [1, 2]
+
+
+def test_rejected_batch_is_retried_row_by_row(mysql_stub, db_manager, audit):
+    # La ligne de la facture 2 est invalide : le lot échoue, puis seule cette ligne est écartée
+    mysql_stub.fail(INSERT, DataError(msg="Data too long", errno=1406), times=2, when=lambda params: params[6] == 2)
+    for invoice_id in (1, 2, 3):
+        audit.record(db_manager, 'create', 'invoice', invoice_id)
+
+    assert audit.flush() == 3
+    assert not audit._buffer
+    # Lot : 1 puis 2 refusée ; ligne à ligne : 1, 2 refusée, 3
+    assert [row[6] for row in inserted(mysql_stub)] == [1, 1, 3]
+    assert ('primary', 'rollback') in mysql_stub.events
+    assert audit.flush() == 0
+
+
+def test_long_values_are_truncated(mysql_stub, db_manager, audit):
+    audit.record(db_manager, 'login_failed', 'user', user={'username': 'x' * 500})
+    audit.flush()
+
+    assert inserted(mysql_stub)[0][2] == 'x' * USERNAME_MAX_LENGTH
+
+
+def test_closed_database_is_not_reopened(mysql_stub, db_manager, audit):
+    audit.record(db_manager, 'print', 'invoice', 1)
+    db_manager.close()
+    connections = len(mysql_stub.connections)
+
+    assert audit.flush() == 0
+    assert len(mysql_stub.connections) == connections
+    assert len(audit._buffer) == 1
+
+
+def test_disabled_log_records_nothing(mysql_stub, db_manager, audit):
+    audit.enabled = False
+    audit.record(db_manager, 'print', 'invoice', 1)
+    assert audit.flush() == 0
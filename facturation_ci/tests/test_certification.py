@@ -0,0 +1,91 @@
+"""Certification FNE (CertificationService) : réservation, enregistrement du NIM et échecs (bouchon MySQL)."""
+import datetime
+
+import pytest
+from mysql.connector import Error
+
+import core.certification as certification
+from core.certification import CertificationService, CertificationError, CertificationNotSavedError
+from core.fne_client import FNEClientError
+from models.invoice import FNE_CLAIM_TIMEOUT_SECONDS
+
+DRAFT = {'id': 7, 'client_id': 1, 'status': 'draft', 'version': 3, 'fne_status': 'pending'}
+OPERATOR = {'id': 1, 'username': 'admin'}
+FNE_RESPONSE = {'nim': 'NIM-0007', 'qr_code': 'QR-0007'}
+
+
+@pytest.fixture
+def service(mysql_stub, db_manager, monkeypatch):
+    mysql_stub.on('SELECT * FROM invoices WHERE id', [dict(DRAFT)])
+    mysql_stub.on('FROM clients', [{'id': 1, 'name': 'Client'}])
+    monkeypatch.setattr(certification, 'certify_document', lambda *args, **kwargs: dict(FNE_RESPONSE))
+    return CertificationService(db_manager, {'tax_id': 'CI-1'}, 'cle-test')
+
+
+def fne_updates(mysql_stub):
+    """(fne_status, nim) de chaque FNE_UPDATE_QUERY reçue."""
+    return [(params[0], params[1]) for _, query, params in mysql_stub.log
+            if query.startswith('UPDATE invoices SET fne_status = %s')]
+
+
+def test_certified_invoice_is_claimed_then_saved(mysql_stub, service):
+    mysql_stub.on('LAST_DAY(issue_date)', [(1, datetime.date(2026, 1, 1), datetime.date(2026, 1, 31))])
+    assert service.certify(7, OPERATOR) == FNE_RESPONSE
+
+    claim = next(params for _, query, params in mysql_stub.log if "fne_status = 'processing'" in query)
+    assert claim[:2] == (7, DRAFT['version'])
+    assert fne_updates(mysql_stub) == [('success', 'NIM-0007')]
+    # Cumuls de TVA recalculés après la validation du NIM, dans leur propre transaction
+    statements = [query for _, query, _ in mysql_stub.log]
+    nim_saved = next(i for i, query in enumerate(statements) if query.startswith('UPDATE invoices SET fne_status = %s'))
+    rollup = next(i for i, query in enumerate(statements) if query.startswith('DELETE FROM vat_monthly_rollups'))
+    assert nim_saved < rollup
+    assert mysql_stub.events.count(('primary', 'commit')) >= 3
+
+
+def test_lost_claim_never_reaches_fne(mysql_stub, service, monkeypatch):
+    mysql_stub.rowcount = 0
+    monkeypatch.setattr(certification, 'certify_document', pytest.fail)
+
+    with pytest.raises(CertificationError):
+        service.certify(7, OPERATOR)
+
+
+def test_fne_refusal_is_recorded_as_failed(mysql_stub, service, monkeypatch):
+    def refuse(*args, **kwargs):
+        raise FNEClientError("Erreur API FNE (400): refusé", 400)
+    monkeypatch.setattr(certification, 'certify_document', refuse)
+
+    with pytest.raises(FNEClientError):
+        service.certify(7, OPERATOR)
+    assert fne_updates(mysql_stub) == [('failed', None)]
+
+
+def test_unsaved_nim_is_kept_for_reconciliation(mysql_stub, service):
+    mysql_stub.fail('SET fne_status = %s, fne_nim', Error(msg="Lost connection", errno=2013))
+
+    with pytest.raises(CertificationNotSavedError) as raised:
+        service.certify(7, OPERATOR)
+
+    assert raised.value.fne_response == FNE_RESPONSE
+    # Jamais marquée 'failed' (qui la rendrait réservable) : NIM conservé, facture à rapprocher
+    assert [status for status, _ in fne_updates(mysql_stub)] == ['success']
+    reconcile = next(params for _, query, params in mysql_stub.log if "'needs_reconciliation'," in query)
+    assert reconcile == ('NIM-0007', 'QR-0007', certification.UNSAVED_CERTIFICATION_MESSAGE, 7)
+
+
+def test_claim_outlives_the_slowest_fne_call(mysql_stub, db_manager, monkeypatch):
+    mysql_stub.on('SELECT * FROM invoices WHERE id', [dict(DRAFT)])
+    monkeypatch.setattr(certification, 'certify_document', lambda *args, **kwargs: dict(FNE_RESPONSE))
+    slow = CertificationService(db_manager, {'tax_id': 'CI-1'}, 'cle-test', timeout=120)
+    slow.certify(7, OPERATOR)
+
+    claim = next(params for _, query, params in mysql_stub.log if "fne_status = 'processing'" in query)
+    assert claim[2] == 120 * certification.FNE_CLAIM_TIMEOUT_FACTOR
+    # Délai court ou par défaut : jamais moins que le minimum du modèle
+    assert certification.fne_claim_timeout(1) == certification.fne_claim_timeout() == FNE_CLAIM_TIMEOUT_SECONDS
+
+
+def test_claim_query_skips_invoices_to_reconcile():
+    from models.invoice import FNE_CLAIM_QUERY
+    assert "fne_status <> 'needs_reconciliation'" in FNE_CLAIM_QUERY
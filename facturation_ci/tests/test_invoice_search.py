@@ -0,0 +1,33 @@
+"""Requête de recherche de la liste des factures (invoice_search_query)."""
+from models.invoice import invoice_search_query
+
+
+def test_text_filter_is_a_union_of_indexed_lookups():
+    query, params = invoice_search_query({'text': '42', 'status': 'draft'}, 101, 100)
+
+    # Aucun OR entre colonnes de tables différentes : une branche d'UNION par index
+    assert " OR " not in query
+    assert "fne_nim LIKE %s UNION SELECT t.id FROM clients tc" in query
+    assert "WHERE id = %s) AS text_match" in query
+    assert params == ['42%', '42%', 42, 'draft', 101, 100]
+    assert query.count('%s') == len(params)
+
+
+def test_text_is_escaped_for_like():
+    _, params = invoice_search_query({'text': ' 5%_a '}, 10)
+    assert params[:2] == ['5\\%\\_a%', '5\\%\\_a%']
+
+
+def test_archive_search_matches_each_table_separately():
+    query, params = invoice_search_query({'text': 'ACME', 'client_id': 3}, 51, 50, include_archive=True)
+
+    assert "JOIN invoices t ON" in query and "JOIN invoices_archive t ON" in query
+    assert "SELECT id FROM invoices_archive WHERE fne_nim LIKE %s" in query
+    assert params == ['ACME%', 'ACME%', 3, 101, 'ACME%', 'ACME%', 3, 101, 51, 50]
+    assert query.count('%s') == len(params)
+
+
+def test_without_text_no_join_is_added():
+    query, params = invoice_search_query({}, 101)
+    assert "text_match" not in query
+    assert params == [101, 0]
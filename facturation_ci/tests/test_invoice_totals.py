@@ -0,0 +1,73 @@
+"""Les totaux tenus ligne à ligne (éditeur de facture) restent égaux à un recalcul complet."""
+import random
+from decimal import Decimal
+
+import pytest
+
+from models.invoice_totals import InvoiceTotals
+
+TAX_RATES = (0, 5.5, '10', Decimal('18.00'), 20)
+
+
+def random_item(rng):
+    """Ligne d'article aux montants de types variés (Decimal, float, chaîne), comme l'éditeur et l'import."""
+    quantity = rng.choice([1, 2, 3, Decimal('0.5'), 1.25, '7', rng.randint(1, 500)])
+    unit_price = rng.choice([
+        Decimal(rng.randint(1, 10_000_000)) / 100,
+        round(rng.uniform(0.01, 5000), 2),
+        f"{rng.randint(0, 99999)}.{rng.randint(0, 999):03d}",
+    ])
+    return {'quantity': quantity, 'unit_price': unit_price, 'tax_rate': rng.choice(TAX_RATES)}
+
+
+def assert_same_totals(running, items):
+    expected = InvoiceTotals.from_items(items)
+    assert running.subtotal == expected.subtotal
+    assert running.vat == expected.vat
+    assert running.total == expected.total
+    assert running.vat_rows() == expected.vat_rows()
+    for amount in (running.subtotal, running.vat, running.total):
+        assert isinstance(amount, Decimal)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_running_totals_match_full_recomputation(seed):
+    rng = random.Random(seed)
+    items, totals = [], InvoiceTotals()
+
+    for _ in range(300):
+        operation = rng.choice(('add', 'add', 'remove', 'edit')) if items else 'add'
+        if operation == 'add':
+            item = random_item(rng)
+            items.append(item)
+            totals.add_item(item)
+        elif operation == 'remove':
+            totals.remove_item(items.pop(rng.randrange(len(items))))
+        else:
+            # Modification d'une ligne dans l'éditeur : retrait de l'ancienne, ajout de la nouvelle
+            index = rng.randrange(len(items))
+            totals.remove_item(items[index])
+            items[index] = random_item(rng)
+            totals.add_item(items[index])
+        assert_same_totals(totals, items)
+
+
+def test_removing_every_line_leaves_no_rate():
+    rng = random.Random(0)
+    items = [random_item(rng) for _ in range(50)]
+    totals = InvoiceTotals.from_items(items)
+    for item in reversed(items):
+        totals.remove_item(item)
+
+    assert totals.vat_rows() == []
+    assert totals.total == Decimal('0.00')
+
+
+def test_lines_are_rounded_before_being_added():
+    # 3 × 0,333 = 0,999 → 1,00 HT par ligne ; TVA 18 % de 0,999 = 0,17982 → 0,18
+    items = [{'quantity': 3, 'unit_price': '0.333', 'tax_rate': 18}] * 3
+    totals = InvoiceTotals.from_items(items)
+
+    assert totals.subtotal == Decimal('3.00')
+    assert totals.vat == Decimal('0.54')
+    assert totals.total == Decimal('3.54')
@@ -0,0 +1,65 @@
+"""Cache des curseurs préparés de DBManager : durée de vie par connexion et accès concurrents (bouchon MySQL)."""
+import threading
+
+QUERY = "SELECT id, name FROM clients WHERE id = %s"
+
+
+def in_thread(func):
+    """Exécute `func` dans un thread de fond (connexion empruntée au pool) et retourne son résultat."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_cursor_is_reused_on_the_same_connection(db_manager):
+    assert db_manager.get_prepared_cursor(QUERY) is db_manager.get_prepared_cursor(QUERY)
+    assert db_manager.get_prepared_cursor(QUERY, dictionary=True) is not db_manager.get_prepared_cursor(QUERY)
+
+
+def test_pooled_connection_keeps_its_cursors_after_release(db_manager):
+    def borrow():
+        cursor = db_manager.get_prepared_cursor(QUERY)
+        db_manager.release_connection()
+        return cursor
+
+    cursor = in_thread(borrow)
+    assert not cursor.closed
+    assert len(db_manager._prepared_cursors) == 1
+
+
+def test_reconnecting_only_drops_the_main_connection_cursors(db_manager):
+    pooled = in_thread(lambda: db_manager.get_prepared_cursor(QUERY))
+    main = db_manager.get_prepared_cursor(QUERY)
+
+    db_manager.connection.raw.connected = False
+    assert db_manager.get_prepared_cursor(QUERY) is not main
+    assert main.closed
+    assert not pooled.closed
+
+    db_manager.close()
+    assert pooled.closed
+    assert not db_manager._prepared_cursors
+
+
+def test_concurrent_workers_and_close_do_not_race(db_manager):
+    errors = []
+
+    def work():
+        try:
+            for _ in range(200):
+                db_manager.get_prepared_cursor(QUERY)
+                db_manager.release_connection()
+        except Exception as e:  # toute exception fait échouer le test
+            errors.append(e)
+
+    workers = [threading.Thread(target=work) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for _ in range(200):
+        db_manager._close_prepared_cursors()
+    for worker in workers:
+        worker.join()
+
+    assert not errors
@@ -0,0 +1,78 @@
+"""Répartition lectures / écritures de DBManager entre la base principale et la réplique (bouchon MySQL)."""
+import datetime
+
+import pytest
+
+from core.config import parse_dsn
+from core.db_manager import DBManager
+from models.invoice import InvoiceModel
+
+NEW_INVOICE = {
+    'details': {'client_id': 1, 'user_id': 1, 'issue_date': datetime.date(2026, 1, 5),
+                'due_date': datetime.date(2026, 2, 5)},
+    'items': [{'product_id': 1, 'description': 'Vis inox', 'quantity': 2, 'unit_price': '10.00', 'tax_rate': 18}],
+}
+
+
+@pytest.fixture
+def replicated(mysql_stub):
+    """Entité avec réplique (parties absentes du DSN : celles de la principale) et fenêtre read-your-writes."""
+    return DBManager('primary', 'facturation_test', 'test', 'secret', tenant='test',
+                     replica=parse_dsn('mysql://lecteur@replica/'), read_your_writes=5)
+
+
+def test_reads_go_to_replica_and_writes_to_primary(mysql_stub, replicated):
+    model = InvoiceModel(replicated)
+
+    model.get_all_with_client_info()
+    model.create(NEW_INVOICE)
+
+    assert mysql_stub.queries('replica', 'FROM invoices i')
+    assert not mysql_stub.queries('primary', 'FROM invoices i')
+    assert mysql_stub.queries('primary', 'INSERT INTO invoices')
+    assert not mysql_stub.queries('replica', 'INSERT')
+    replica = next(c for c in mysql_stub.connections if c.host == 'replica')
+    assert replica.database == 'facturation_test'
+
+
+def test_reads_stay_on_primary_after_a_write(mysql_stub, replicated):
+    mysql_stub.on('SUM(total_amount)', [{'revenue': 100}])
+    mysql_stub.on('COUNT(id) as count', [{'count': 1}])
+    mysql_stub.on('GROUP BY status', [{'status': 'draft', 'count': 1}])
+    model = InvoiceModel(replicated)
+    model.create(NEW_INVOICE)
+
+    model.get_dashboard_stats()
+    assert mysql_stub.queries('primary', 'SUM(total_amount)')
+    assert not mysql_stub.queries('replica')
+
+    # Fenêtre read-your-writes écoulée : retour à la réplique
+    replicated._last_write_at -= replicated.read_your_writes
+    model.cache.invalidate()
+    model.get_dashboard_stats()
+    assert mysql_stub.queries('replica', 'SUM(total_amount)')
+
+
+def test_unreachable_replica_falls_back_to_primary(mysql_stub, replicated):
+    mysql_stub.down.add('replica')
+    model = InvoiceModel(replicated)
+
+    model.get_all_with_client_info()
+    assert mysql_stub.queries('primary', 'FROM invoices i')
+
+    # La réplique revenue n'est réessayée qu'après REPLICA_RETRY_SECONDS
+    mysql_stub.down.clear()
+    model.cache.invalidate()
+    model.get_all_with_client_info()
+    assert not mysql_stub.queries('replica')
+
+    replicated._replica_retry_at = 0
+    model.cache.invalidate()
+    model.get_all_with_client_info()
+    assert mysql_stub.queries('replica', 'FROM invoices i')
+
+
+def test_without_replica_reads_use_primary(mysql_stub, db_manager):
+    assert db_manager.get_read_connection() is db_manager.get_connection()
+    InvoiceModel(db_manager).get_all_with_client_info()
+    assert mysql_stub.queries('primary', 'FROM invoices i')